@@ -0,0 +1,63 @@
+import builtins
+import contextlib
+import io
+import sys
+import tracemalloc
+
+from Lexer.exchange_rate_analyser import load_exchange_rates
+from Interpreter.reference import Reference
+from Benchmarks.bench_engines import parse, execute
+from main import ENGINES
+
+
+ARITHMETIC_PROGRAM = """
+void main() {
+    int total = 0;
+    float ratio = 0.0;
+    int i = 0;
+    while i < %d {
+        total = total + i * 3 - i;
+        ratio = ratio + 1.5 * 2.0;
+        i += 1;
+    }
+    print(total);
+}
+"""
+
+
+@contextlib.contextmanager
+def count_references():
+    counter = [0]
+    init = Reference.__init__
+
+    def counting_init(self, value):
+        counter[0] += 1
+        init(self, value)
+
+    Reference.__init__ = counting_init
+    try:
+        yield counter
+    finally:
+        Reference.__init__ = init
+
+
+def measure(program, engine, currencies):
+    with count_references() as references:
+        tracemalloc.start()
+        execute(program, engine, currencies)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return references[0], peak
+
+
+if __name__ == '__main__':
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    currencies = load_exchange_rates("eurofxref.csv")
+    builtins.input = lambda prompt: "5"
+    program = parse(ARITHMETIC_PROGRAM % iterations, currencies)
+
+    print(f"{'engine':>8} {'references':>12} {'per loop':>9} {'peak':>10}")
+    for engine_name, engine in ENGINES.items():
+        with contextlib.redirect_stdout(io.StringIO()):
+            references, peak = measure(program, engine, currencies)
+        print(f"{engine_name:>8} {references:>12,} {references / iterations:>9.1f} {peak / 1024:>8.1f}kB")
@@ -0,0 +1,52 @@
+import gc
+import sys
+import time
+import tracemalloc
+from dataclasses import fields
+
+from Lexer.exchange_rate_analyser import load_exchange_rates
+from Parse_objects.objects import Node
+from Benchmarks.bench_engines import parse
+from Benchmarks.generate import generate_program
+
+
+def count_nodes(value):
+    if isinstance(value, Node):
+        return 1 + sum(count_nodes(getattr(value, node_field.name)) for node_field in fields(value))
+    if isinstance(value, (list, tuple)):
+        return sum(count_nodes(item) for item in value)
+    if isinstance(value, dict):
+        return sum(count_nodes(item) for item in value.values())
+    return 0
+
+
+def measure(text, currencies):
+    gc.collect()
+    tracemalloc.start()
+    program = parse(text, currencies)
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return program, retained
+
+
+def parse_time(text, currencies, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse(text, currencies)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+if __name__ == '__main__':
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    currencies = load_exchange_rates("eurofxref.csv")
+    text = generate_program(functions)
+    program, retained = measure(text, currencies)
+    nodes = count_nodes(program)
+    print(f"source: {len(text) / 1024:,.0f}kB, {nodes:,} nodes")
+    print(f"ast: {retained / 1024:,.0f}kB, {retained / nodes:.1f} bytes per node, "
+          f"{retained / len(text):.1f}x source size")
+    print(f"parse: {parse_time(text, currencies) * 1000:.0f}ms")
@@ -0,0 +1,68 @@
+import builtins
+import contextlib
+import io
+import sys
+
+from Lexer.exchange_rate_analyser import load_exchange_rates
+from Benchmarks.bench_engines import parse, measure
+from main import ENGINES
+
+
+FIBONACCI_PROGRAM = """
+int fib(int n) {
+    if n < 2 {
+        return n;
+    }
+    return fib(n - 1) + fib(n - 2);
+}
+
+void main() {
+    print(fib(%d));
+}
+"""
+
+COMPOUND_INTEREST_PROGRAM = """
+cur compound(cur capital, float rate, int years) {
+    if years == 0 {
+        return capital;
+    }
+    return compound(capital * (1.0 + rate), rate, years - 1);
+}
+
+void main() {
+    int i = 0;
+    while i < %d {
+        compound(1000 PLN, 0.05, %d);
+        i += 1;
+    }
+}
+"""
+
+
+def fibonacci_calls(n):
+    previous, current = 1, 1
+    for _ in range(n):
+        previous, current = current, previous + current + 1
+    return previous
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 18
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    currencies = load_exchange_rates("eurofxref.csv")
+    builtins.input = lambda prompt: "5"
+
+    loops, years = 100, 50
+    programs = {
+        f"fib({n})": (FIBONACCI_PROGRAM % n, fibonacci_calls(n)),
+        f"compound {loops}x{years} years": (COMPOUND_INTEREST_PROGRAM % (loops, years), loops * (years + 1))
+    }
+
+    print(f"{'program':>28} " + " ".join(f"{engine:>16}" for engine in ENGINES))
+    for name, (text, calls) in programs.items():
+        program = parse(text, currencies)
+        rates = {}
+        with contextlib.redirect_stdout(io.StringIO()):
+            for engine_name, engine in ENGINES.items():
+                rates[engine_name] = calls / measure(program, engine, currencies, repeat)
+        print(f"{name:>28} " + " ".join(f"{rates[engine]:>10,.0f} calls/s" for engine in ENGINES))
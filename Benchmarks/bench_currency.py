@@ -0,0 +1,34 @@
+import sys
+import timeit
+
+from Currency.currency import Currency
+from Interpreter.calculations import Calculations
+from Lexer.exchange_rate_analyser import load_exchange_rates
+
+
+class Expression:
+    position = None
+
+
+def run(calculations, left, right, count):
+    results = {}
+    for operator in ["+", "-"]:
+        results[operator] = timeit.timeit(
+            lambda: calculations.calculate_result(left, right, Expression, operator), number=count
+        )
+    for operator in ["<", "=="]:
+        results[operator] = timeit.timeit(
+            lambda: calculations.compare_values(left, right, operator, Expression), number=count
+        )
+    return results
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    currencies = load_exchange_rates("eurofxref.csv")
+    calculations = Calculations(currencies)
+    pln = Currency(100, currencies.get_curtype("PLN"))
+    usd = Currency(25, currencies.get_curtype("USD"))
+    for name, left, right in [("PLN op PLN", pln, pln), ("PLN op USD", pln, usd)]:
+        for operator, elapsed in run(calculations, left, right, count).items():
+            print(f"{name.replace('op', operator):>12}: {count / elapsed:,.0f} ops/sec")
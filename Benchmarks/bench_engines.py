@@ -0,0 +1,82 @@
+import builtins
+import contextlib
+import glob
+import io
+import sys
+import time
+
+from Lexer.lexer import Lexer
+from Lexer.exchange_rate_analyser import load_exchange_rates
+from Parser.parser import Parser
+from Source.source import SourceReader
+from main import ENGINES
+
+
+LOOP_PROGRAM = """
+int sum_to(int n) {
+    int total = 0;
+    int i = 0;
+    while i < n {
+        total += i * 2 - i;
+        i += 1;
+    }
+    return total;
+}
+
+void main() {
+    cur wallet = 0 PLN;
+    int i = 0;
+    while i < 2000 {
+        wallet = wallet + 1 EUR - 2 PLN;
+        i += 1;
+    }
+    print(sum_to(5000));
+    print(wallet);
+}
+"""
+
+
+def parse(text, currencies):
+    lexer = Lexer(SourceReader(io.StringIO(text)), currency_names=currencies, table_driven=True)
+    return Parser(lexer, currencies).parse()
+
+
+def execute(program, engine, currencies):
+    try:
+        program.accept(engine(currencies))
+    except Exception:
+        pass
+
+
+def measure(program, engine, currencies, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        execute(program, engine, currencies)
+    return (time.perf_counter() - start) / repeat
+
+
+if __name__ == '__main__':
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    currencies = load_exchange_rates("eurofxref.csv")
+    builtins.input = lambda prompt: "5"
+
+    programs = {}
+    for path in sorted(glob.glob("test_files/interpreter/*.bng")):
+        with open(path, "r") as file:
+            programs[path] = file.read()
+    programs["loop (generated)"] = LOOP_PROGRAM
+
+    print(f"{'program':>32} " + " ".join(f"{engine:>12}" for engine in ENGINES))
+    totals = dict.fromkeys(ENGINES, 0.0)
+    for name, text in programs.items():
+        try:
+            program = parse(text, currencies)
+        except Exception:
+            continue
+        times = {}
+        with contextlib.redirect_stdout(io.StringIO()):
+            for engine_name, engine in ENGINES.items():
+                times[engine_name] = measure(program, engine, currencies, repeat)
+                totals[engine_name] += times[engine_name]
+        print(f"{name:>32} " + " ".join(f"{times[engine] * 1000:10.3f}ms" for engine in ENGINES))
+    print(f"{'total':>32} " + " ".join(f"{totals[engine] * 1000:10.3f}ms" for engine in ENGINES))
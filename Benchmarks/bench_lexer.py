@@ -0,0 +1,26 @@
+import io
+import sys
+import time
+
+from Lexer.lexer import Lexer
+from Source.source import SourceReader
+from Token.token_type import TokenType
+from Benchmarks.generate import generate_program, CURRENCIES
+
+
+def measure(text, **lexer_options):
+    lexer = Lexer(SourceReader(io.StringIO(text)), currency_names=CURRENCIES, **lexer_options)
+    count = 0
+    start = time.perf_counter()
+    while lexer.get_next_token().type != TokenType.END_OF_FILE:
+        count += 1
+    elapsed = time.perf_counter() - start
+    return count, count / elapsed
+
+
+if __name__ == '__main__':
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    text = generate_program(functions)
+    for name, options in [("sequential", {}), ("table driven", {"table_driven": True})]:
+        count, rate = measure(text, **options)
+        print(f"{name:>12}: {count} tokens, {rate:,.0f} tokens/sec")
@@ -0,0 +1,48 @@
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from Lexer.lexer import Lexer
+from Source.source import open_source
+from Token.token_type import TokenType
+from Benchmarks.generate import generate_program
+
+
+def lex_file(path, backend):
+    with open_source(path, backend) as source:
+        lexer = Lexer(source, currency_names=["PLN", "EUR", "USD", "GBP", "CHF", "JPY"])
+        count = 0
+        while lexer.get_next_token().type != TokenType.END_OF_FILE:
+            count += 1
+    return count
+
+
+def measure(path, backend):
+    output = subprocess.check_output(
+        [sys.executable, "-m", "Benchmarks.bench_mmap_source", "--child", path, backend], text=True
+    )
+    return output.split()
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ["--child"]:
+        start = time.perf_counter()
+        lex_file(sys.argv[2], sys.argv[3])
+        elapsed = time.perf_counter() - start
+        print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, elapsed)
+        sys.exit()
+
+    sizes = [int(arg) for arg in sys.argv[1:]] or [500, 2000, 8000]
+    for functions in sizes:
+        with tempfile.NamedTemporaryFile("w", suffix=".bng", delete=False) as file:
+            file.write(generate_program(functions))
+        try:
+            size = os.path.getsize(file.name) / 2**20
+            for backend in ["stream", "mmap"]:
+                max_rss, elapsed = measure(file.name, backend)
+                print(f"{size:8.1f} MiB {backend:>7}: peak RSS {int(max_rss) / 1024:8.1f} MiB, {float(elapsed):.2f} s")
+        finally:
+            os.remove(file.name)
@@ -0,0 +1,87 @@
+import cProfile
+import glob
+import io
+import pstats
+import sys
+import time
+
+from Lexer.lexer import Lexer
+from Lexer.token_list_lexer import TokenListLexer
+from Parser.parser import Parser
+from Parser.parser_error import ParserError
+from Source.source import SourceReader
+from Token.token_type import TokenType
+from Benchmarks.generate import generate_program, generate_expression_program, CURRENCIES
+
+
+PRIMARY_TOKENS = {TokenType.IDENTIFIER, TokenType.INT_CONST, TokenType.FLOAT_CONST, TokenType.STR_CONST,
+                  TokenType.BOOL_VALUE_TRUE, TokenType.BOOL_VALUE_FALSE, TokenType.CURTYPE_CONST}
+
+
+# the source is lexed once up front, so only the parser is measured
+def read_tokens(text):
+    lexer = Lexer(SourceReader(io.StringIO(text)), currency_names=CURRENCIES, table_driven=True, skip_comments=True)
+    tokens = []
+    while (token := lexer.get_next_token()).type != TokenType.END_OF_FILE:
+        tokens.append(token)
+    return tokens
+
+
+def parse(tokens):
+    return Parser(TokenListLexer(tokens), CURRENCIES).parse()
+
+
+def parse_all(programs):
+    for tokens in programs:
+        parse(tokens)
+
+
+def measure(programs, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse_all(programs)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+# all calls, and the calls of the parser's own methods
+def count_calls(programs):
+    profile = cProfile.Profile()
+    profile.runcall(parse_all, programs)
+    stats = pstats.Stats(profile).stats
+    parser_calls = sum(calls for (file, _, _), (_, calls, *_) in stats.items() if file.endswith("parser.py"))
+    return pstats.Stats(profile).total_calls, parser_calls
+
+
+# test_files which parse without errors, as token lists
+def read_test_files():
+    programs = []
+    for path in sorted(glob.glob("test_files/**/*.bng", recursive=True)):
+        with open(path, "r") as file:
+            tokens = read_tokens(file.read())
+        try:
+            parse(tokens)
+        except ParserError:
+            continue
+        programs.append(tokens)
+    return programs
+
+
+def report(name, programs, repeat):
+    tokens = sum(len(tokens) for tokens in programs)
+    primaries = sum(token.type in PRIMARY_TOKENS for program in programs for token in program)
+    elapsed = measure(programs, repeat)
+    calls, parser_calls = count_calls(programs)
+    print(f"{name}: {len(programs)} programs, {tokens:,} tokens, {primaries:,} primary expressions")
+    print(f"  parse: {elapsed * 1000:.1f}ms, {tokens / elapsed:,.0f} tokens/sec")
+    print(f"  calls: {calls:,}, {calls / primaries:.1f} per primary expression")
+    print(f"  parser method calls: {parser_calls:,}, {parser_calls / primaries:.1f} per primary expression")
+
+
+if __name__ == '__main__':
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    report("generated expressions", [read_tokens(generate_expression_program(functions))], 5)
+    report("generated statements", [read_tokens(generate_program(functions))], 5)
+    report("test_files", read_test_files(), 50)
@@ -0,0 +1,35 @@
+import os
+import sys
+import tempfile
+import time
+
+from Source.source import SourceReader
+from Benchmarks.generate import generate_program
+
+
+def read_all(source):
+    count = 0
+    while source.get_char() != chr(3):
+        source.next_char()
+        count += 1
+    return count
+
+
+def measure(path, buffer_size):
+    with open(path, "r") as file:
+        start = time.perf_counter()
+        count = read_all(SourceReader(file, buffer_size=buffer_size))
+        elapsed = time.perf_counter() - start
+    return count / elapsed
+
+
+if __name__ == '__main__':
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    with tempfile.NamedTemporaryFile("w", suffix=".bng", delete=False) as file:
+        file.write(generate_program(functions))
+    try:
+        print(f"source size: {os.path.getsize(file.name)} bytes")
+        for name, buffer_size in [("read(1)", 1), ("buffered 64 KiB", 64 * 1024)]:
+            print(f"{name:>16}: {measure(file.name, buffer_size):,.0f} chars/sec")
+    finally:
+        os.remove(file.name)
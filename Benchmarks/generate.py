@@ -0,0 +1,70 @@
+import random
+
+
+CURRENCIES = ["PLN", "EUR", "USD", "GBP", "CHF", "JPY"]
+
+
+def generate_function(index, statements, rng):
+    lines = [f"# generated wallet operations {index}",
+             f"cur operations_{index}(cur wallet, int count) {{"]
+    for i in range(statements):
+        currency = rng.choice(CURRENCIES)
+        amount = rng.randint(1, 1000)
+        kind = i % 5
+        if kind == 0:
+            lines.append(f"    cur fee_{i} = {amount}.{rng.randint(10, 99)} {currency};")
+        elif kind == 1:
+            lines.append(f"    from wallet -> {amount} {currency};")
+        elif kind == 2:
+            lines.append(f"    count += {amount} * 2 - ({amount} - {rng.randint(1, 9)});")
+        elif kind == 3:
+            lines.append(f"    str label_{i} = \"operation {index}.{i}\"; # label")
+        else:
+            lines.append(f"    if count > {amount} && wallet.value >= 0.0 {{")
+            lines.append(f"        from {amount} {currency} -> wallet;")
+            lines.append("    }")
+    lines.append("    return wallet;")
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def generate_program(functions=1000, statements=20, seed=0):
+    rng = random.Random(seed)
+    parts = [generate_function(index, statements, rng) for index in range(functions)]
+    parts.append("void main() {")
+    parts.append("    cur wallet = 1000 PLN;")
+    for index in range(min(functions, 10)):
+        parts.append(f"    wallet = operations_{index}(wallet, {index});")
+    parts.append("    print(wallet);")
+    parts.append("}")
+    return "\n\n".join(parts) + "\n"
+
+
+# every operand which is not a single term is put in brackets, since "-" and "!"
+# take a single term and a relation can't be an operand of another operator
+def generate_expression(rng, depth):
+    if depth == 0:
+        return rng.choice(["a", "b", "count", str(rng.randint(0, 99)), f"{rng.randint(1, 9)}.5", "true"])
+    left = generate_operand(rng, depth - 1)
+    right = generate_operand(rng, depth - 1)
+    return rng.choice([f"{left} + {right}", f"{left} * {right} - {right}", f"{left} / {right}", f"-{left}",
+                       f"{left} < {right} && {right} >= {left}", f"!{left} == {right} || {left}"])
+
+
+def generate_operand(rng, depth):
+    expression = generate_expression(rng, depth)
+    return expression if depth == 0 else f"({expression})"
+
+
+def generate_expression_program(functions=200, statements=20, seed=0):
+    rng = random.Random(seed)
+    parts = []
+    for index in range(functions):
+        lines = [f"int expressions_{index}(int a, int b) {{", "    int count = 0;"]
+        for _ in range(statements):
+            lines.append(f"    count += {generate_expression(rng, rng.randint(1, 4))};")
+        lines.append("    return count;")
+        lines.append("}")
+        parts.append("\n".join(lines))
+    parts.append("void main() {\n    print(to_str(expressions_0(1, 2)));\n}")
+    return "\n\n".join(parts) + "\n"
@@ -0,0 +1,43 @@
+class Frame:
+    __slots__ = ("variables", "expected_return_type")
+
+    def __init__(self, size):
+        self.variables = [None] * size
+        self.expected_return_type = None
+
+
+# Call frames are reused between calls. Every frame is allocated once, when the
+# call depth first reaches it, with room for the largest function of the program,
+# and its slots are cleared when the call returns.
+class FrameStack:
+    def __init__(self, frame_size=0):
+        self._frame_size = frame_size
+        self._blank = [None] * frame_size
+        self._frames = []
+        self._depth = 0
+
+    def push(self):
+        if self._depth == len(self._frames):
+            self._frames.append(Frame(self._frame_size))
+        frame = self._frames[self._depth]
+        self._depth += 1
+        return frame
+
+    def pop(self):
+        self._depth -= 1
+        frame = self._frames[self._depth]
+        frame.variables[:] = self._blank
+        frame.expected_return_type = None
+
+    # frames are widened in place, so lists of the frames in use stay valid
+    def grow(self, frame_size):
+        if frame_size <= self._frame_size:
+            return
+        extra = [None] * (frame_size - self._frame_size)
+        for frame in self._frames:
+            frame.variables.extend(extra)
+        self._frame_size = frame_size
+        self._blank = [None] * frame_size
+
+    def __len__(self):
+        return self._depth
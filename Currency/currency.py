@@ -1,17 +1,20 @@
-from typing import Union, Dict
-from dataclasses import dataclass
+from typing import Union, Dict, Optional
+from dataclasses import dataclass, field
 from Interpreter.reference import Reference
 
 
 @dataclass
 class Curtype:
     value: str
+    id: Optional[int] = field(default=None, compare=False)
 
     def __str__(self):
         return f'{self.value}'
 
     def __eq__(self, other):
         if isinstance(other, Curtype):
+            if self.id is not None and other.id is not None:
+                return self.id == other.id
             return self.value == other.value
         return False
 
@@ -0,0 +1,64 @@
+from typing import Dict, Iterable, List, Optional, Union
+
+from Currency.currency import Curtype
+
+
+class CurrencyRegistry:
+    def __init__(self, currencies: Union[Dict[str, float], Iterable[str]] = ()):
+        self._ids: Dict[str, int] = {}
+        self._curtypes: List[Curtype] = []
+        self._rates: List[Optional[float]] = []
+        rates = currencies if isinstance(currencies, dict) else {}
+        for name in currencies:
+            self.register(name, rates.get(name))
+
+    def register(self, name: str, rate: Optional[float] = None) -> int:
+        if (currency_id := self._ids.get(name)) is not None:
+            if rate is not None:
+                self._rates[currency_id] = rate
+            return currency_id
+        currency_id = len(self._curtypes)
+        self._ids[name] = currency_id
+        self._curtypes.append(Curtype(name, currency_id))
+        self._rates.append(rate)
+        return currency_id
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._ids
+
+    def __len__(self) -> int:
+        return len(self._curtypes)
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def get_id(self, name: str) -> Optional[int]:
+        return self._ids.get(name)
+
+    # currency_id is the id the parser stored in a constant; it is only trusted
+    # while it still names the same currency, e.g. in a tree parsed with other rates
+    def get_curtype(self, name: str, currency_id: Optional[int] = None) -> Curtype:
+        if currency_id is not None and currency_id < len(self._curtypes):
+            curtype = self._curtypes[currency_id]
+            if curtype.value == name:
+                return curtype
+        currency_id = self._ids.get(name)
+        if currency_id is None:
+            raise ValueError(f"Unknown currency {name}")
+        return self._curtypes[currency_id]
+
+    def get_curtype_by_id(self, currency_id: int) -> Curtype:
+        return self._curtypes[currency_id]
+
+    def get_rate(self, currency_id: int) -> Optional[float]:
+        return self._rates[currency_id]
+
+    @property
+    def rates(self) -> List[Optional[float]]:
+        return self._rates
+
+
+def to_registry(currencies) -> CurrencyRegistry:
+    if isinstance(currencies, CurrencyRegistry):
+        return currencies
+    return CurrencyRegistry(currencies or ())
@@ -0,0 +1,21 @@
+from Interpreter.builtins import TYPES_MAP, BUILTINS_LIST, BUILTIN_RETURN_TYPES
+from Interpreter.semantic_error import SemanticError
+from Interpreter.resolver import resolve_program
+from Interpreter.type_checker import check_program
+from Parse_objects.objects import DocumentObjectModel
+
+
+# Runs once per program: the optimizer keeps the slots and static types it finds,
+# so an optimized program is not resolved and checked again by the engine.
+def analyse_program(program):
+    if program.analysed:
+        return
+    main_function = program.functions.get('main')
+    if not main_function:
+        raise SemanticError("Missing main function.", program.position)
+    if main_function.type is not DocumentObjectModel.VOID:
+        raise SemanticError("Main function has to be void type", program.position)
+
+    resolve_program(program, [*program.functions, *(name for name, _ in BUILTINS_LIST)])
+    check_program(program, TYPES_MAP, BUILTIN_RETURN_TYPES)
+    program.analysed = True
@@ -0,0 +1,67 @@
+from Currency.currency import Currency, Curtype, Dictionary
+from Parse_objects.objects import DocumentObjectModel
+
+
+TYPES_MAP = {
+    DocumentObjectModel.INT: int,
+    DocumentObjectModel.FLOAT: float,
+    DocumentObjectModel.STR: str,
+    DocumentObjectModel.CUR: Currency,
+    DocumentObjectModel.CURTYPE: Curtype,
+    DocumentObjectModel.BOOL: bool,
+    DocumentObjectModel.DICT: Dictionary,
+    DocumentObjectModel.VOID: None
+}
+
+
+def print_(text):
+    print(text)
+
+
+def input_(text):
+    value = input(text)
+    return value
+
+
+def to_int(value):
+    if type(value) not in [float, str]:
+        raise TypeError("Can convert only float or str")
+    try:
+        return int(value)
+    except Exception:
+        raise ValueError("Wrong value to convert")
+
+
+def to_float(value):
+    if type(value) not in [int, str]:
+        raise TypeError("Can convert only int or str")
+    try:
+        return float(value)
+    except Exception:
+        raise ValueError("Wrong value to convert")
+
+
+def to_str(value):
+    if type(value) not in [int, float, Currency, Curtype]:
+        raise TypeError("Can convert only int, float, cur or curtype")
+    try:
+        return str(value)
+    except Exception:
+        raise ValueError("Wrong value to convert")
+
+
+BUILTINS_LIST = [
+    ('print', print_),
+    ('input', input_),
+    ('to_int', to_int),
+    ('to_float', to_float),
+    ('to_str', to_str)
+]
+
+BUILTIN_RETURN_TYPES = {
+    'print': type(None),
+    'input': str,
+    'to_int': int,
+    'to_float': float,
+    'to_str': str
+}
@@ -0,0 +1,470 @@
+from array import array
+from dataclasses import dataclass, field
+from enum import IntEnum, auto
+from typing import Any, Dict, List, Optional, Tuple
+
+from Visitor.interpreter_visitor import TYPES_MAP
+from Currency.currency import Currency, Curtype
+from Currency.registry import to_registry
+from Source.source_position import SourcePosition
+from Parse_objects.objects import (
+    OrExpression,
+    AndExpression,
+    LessRelation,
+    LessEqualRelation,
+    GreaterRelation,
+    GreaterEqualRelation,
+    EqualRelation,
+    NotEqualRelation,
+    NegatedExpression,
+    AddExpression,
+    SubExpression,
+    MulExpression,
+    DivExpression,
+    IntConst,
+    FloatConst,
+    CurConst,
+    StrConst,
+    BoolConst,
+    CurtypeConst,
+    DictConst,
+    Block,
+    ObjectAccess,
+    Declaration,
+    Assignment,
+    AddAndAssign,
+    SubAndAssign,
+    IfStatement,
+    WhileLoopStatement,
+    ForLoopStatement,
+    ReturnStatement,
+    CurrencyTransfer,
+    IdentifierExpression,
+    FunctionCall,
+    FunctionDefinition,
+    Program
+)
+
+
+class Opcode(IntEnum):
+    LOAD_CONST = auto()         # push constants[arg]
+    LOAD_CURRENCY = auto()      # push a new Currency built from constants[arg] = (value, curtype)
+    LOAD_FAST = auto()          # push the value of the variable in slot arg
+    LOAD_FAST_REFERENCE = auto()    # push the Reference of the variable in slot arg
+    LOAD_GLOBAL = auto()        # push the function names[arg]
+    LOAD_GLOBAL_REFERENCE = auto()  # push a Reference to the function names[arg]
+    MAKE_REFERENCE = auto()     # wrap TOS in a new Reference
+    DECLARE = auto()            # clear slot arg for a declaration without a value
+    DECLARE_STORE = auto()      # pop a value, check its type and declare constants[arg] = (slot, type)
+    STORE_FAST = auto()         # pop a value and assign it to the existing variable in slot arg
+    INPLACE_ADD = auto()        # pop a value and add it to the variable in slot arg
+    INPLACE_SUBTRACT = auto()   # pop a value and subtract it from the variable in slot arg
+    INVALID_TARGET = auto()     # assignment to something that is not a variable
+    POP_TOP = auto()
+    BINARY = auto()             # pop right and left, push left ARITHMETIC_OPERATORS[arg] right
+    COMPARE = auto()            # pop right and left, push left RELATION_OPERATORS[arg] right
+    NEGATE = auto()             # pop a value, push NEGATION_OPERATORS[arg] value
+    JUMP_IF_TRUE_OR_KEEP = auto()   # jump to arg keeping TOS if it is True
+    JUMP_IF_FALSE_OR_KEEP = auto()  # jump to arg keeping TOS if it is False
+    BOOL_OR = auto()
+    BOOL_AND = auto()
+    JUMP = auto()
+    POP_JUMP_IF_FALSE = auto()
+    GET_ITERATOR = auto()
+    FOR_ITERATOR = auto()       # push the next element, or pop the iterator and jump to arg
+    STORE_LOOP_VARIABLE = auto()    # pop an element into slot arg
+    MARK_CALL = auto()          # remember the position of the call for argument errors
+    CALL = auto()               # constants[arg] = (name, argument count, arguments checked)
+    GET_ATTRIBUTE = auto()      # replace TOS with its attribute names[arg]
+    CALL_METHOD = auto()        # constants[arg] = [name, argument count, jump target if the result is truthy]
+    BUILD_DICT = auto()         # push an empty Dictionary
+    STORE_ACCOUNT = auto()      # pop a value and store it in the Dictionary on TOS as account names[arg]
+    TRANSFER = auto()           # pop arg references and transfer between them
+    RETURN_VALUE = auto()
+    RETURN_NONE = auto()
+    RETURN_END = auto()         # falling off the end of a function
+
+
+ARITHMETIC_OPERATORS = [
+    ("+", "Different types in add operation"),
+    ("-", "Different types in sub operation"),
+    ("*", "Different types in multiply operation"),
+    ("/", "Wrong types in divide operation")
+]
+
+RELATION_OPERATORS = ["<", "<=", ">", ">=", "==", "!="]
+
+NEGATION_OPERATORS = ["-", "!"]
+
+ARITHMETIC_OPERATOR_INDEXES = {
+    AddExpression: 0,
+    SubExpression: 1,
+    MulExpression: 2,
+    DivExpression: 3
+}
+
+RELATION_OPERATOR_INDEXES = {
+    LessRelation: 0,
+    LessEqualRelation: 1,
+    GreaterRelation: 2,
+    GreaterEqualRelation: 3,
+    EqualRelation: 4,
+    NotEqualRelation: 5
+}
+
+JUMP_OPCODES = {
+    Opcode.JUMP_IF_TRUE_OR_KEEP,
+    Opcode.JUMP_IF_FALSE_OR_KEEP,
+    Opcode.JUMP,
+    Opcode.POP_JUMP_IF_FALSE,
+    Opcode.FOR_ITERATOR
+}
+
+
+@dataclass
+class CodeObject:
+    name: str
+    params: List[Tuple[int, Any]]
+    return_type: Any
+    variables: List[Optional[str]] = field(default_factory=list)
+    code: array = field(default_factory=lambda: array("i"))
+    constants: List[Any] = field(default_factory=list)
+    names: List[str] = field(default_factory=list)
+    positions: List[Optional[SourcePosition]] = field(default_factory=list)
+
+
+@dataclass
+class CompiledProgram:
+    position: SourcePosition
+    functions: Dict[str, CodeObject]
+
+
+class BytecodeCompiler:
+    def __init__(self, exchange_rates=None):
+        self._currencies = to_registry(exchange_rates)
+        self._code_object = None
+        self._constant_indexes = {}
+        self._name_indexes = {}
+
+        self._expression_compilers = {
+            OrExpression: self._compile_or_expression,
+            AndExpression: self._compile_and_expression,
+            NegatedExpression: self._compile_negated_expression,
+            IntConst: self._compile_const,
+            FloatConst: self._compile_const,
+            StrConst: self._compile_const,
+            BoolConst: self._compile_const,
+            CurConst: self._compile_cur_const,
+            CurtypeConst: self._compile_curtype_const,
+            DictConst: self._compile_dict_const,
+            ObjectAccess: self._compile_object_access,
+            **dict.fromkeys(RELATION_OPERATOR_INDEXES, self._compile_relation),
+            **dict.fromkeys(ARITHMETIC_OPERATOR_INDEXES, self._compile_arithmetic)
+        }
+        self._statement_compilers = {
+            Declaration: self._compile_declaration,
+            Assignment: self._compile_assignment,
+            AddAndAssign: self._compile_operate_and_assign,
+            SubAndAssign: self._compile_operate_and_assign,
+            IfStatement: self._compile_if_statement,
+            WhileLoopStatement: self._compile_while_loop_statement,
+            ForLoopStatement: self._compile_for_loop_statement,
+            ReturnStatement: self._compile_return_statement,
+            CurrencyTransfer: self._compile_currency_transfer,
+            ObjectAccess: self._compile_expression_statement
+        }
+
+    def compile_program(self, program: Program) -> CompiledProgram:
+        functions = {name: self.compile_function(function) for name, function in program.functions.items()}
+        return CompiledProgram(program.position, functions)
+
+    def compile_function(self, function_definition: FunctionDefinition) -> CodeObject:
+        self._code_object = CodeObject(
+            function_definition.name,
+            [(parameter.slot, TYPES_MAP[parameter.type]) for parameter in function_definition.params],
+            TYPES_MAP[function_definition.type],
+            [None] * function_definition.frame_size
+        )
+        self._constant_indexes = {}
+        self._name_indexes = {}
+        for parameter in function_definition.params:
+            self._variable(parameter.slot, parameter.name)
+        self._compile_block(function_definition.block)
+        self._emit(Opcode.RETURN_END)
+        return self._code_object
+
+    # emitting
+
+    def _emit(self, opcode, argument=0, position=None):
+        self._code_object.code.extend((opcode, argument))
+        self._code_object.positions.append(position)
+        return len(self._code_object.positions) - 1
+
+    def _label(self):
+        return len(self._code_object.positions)
+
+    def _patch(self, instruction, target):
+        self._code_object.code[2 * instruction + 1] = target
+
+    def _constant(self, value):
+        key = _constant_key(value) if _is_hashable(value) else None
+        if key is not None and key in self._constant_indexes:
+            return self._constant_indexes[key]
+        self._code_object.constants.append(value)
+        index = len(self._code_object.constants) - 1
+        if key is not None:
+            self._constant_indexes[key] = index
+        return index
+
+    def _name(self, name):
+        if (index := self._name_indexes.get(name)) is None:
+            self._code_object.names.append(name)
+            index = self._name_indexes[name] = len(self._code_object.names) - 1
+        return index
+
+    def _variable(self, slot, name):
+        self._code_object.variables[slot] = name
+        return slot
+
+    # statements
+
+    def _compile_statement(self, statement):
+        self._statement_compilers[type(statement)](statement)
+
+    def _compile_block(self, block: Block):
+        for statement in block.statements:
+            self._compile_statement(statement)
+
+    def _compile_expression_statement(self, object_access):
+        self._compile_expression(object_access)
+        self._emit(Opcode.POP_TOP)
+
+    def _compile_declaration(self, declaration):
+        self._emit(Opcode.DECLARE, self._variable(declaration.slot, declaration.name), declaration.position)
+
+    def _assignment_target(self, object_access):
+        target = object_access.objects[0]
+        if len(object_access.objects) != 1 or type(target) is not IdentifierExpression:
+            return None
+        return target.slot
+
+    def _compile_assignment(self, assignment):
+        if type(assignment.object) is Declaration:
+            declaration = assignment.object
+            slot = self._variable(declaration.slot, declaration.name)
+            self._compile_expression(assignment.expression)
+            self._emit(Opcode.DECLARE_STORE, self._constant((slot, TYPES_MAP[declaration.type])),
+                       assignment.position)
+            return
+
+        if (slot := self._assignment_target(assignment.object)) is None:
+            self._emit(Opcode.INVALID_TARGET, 0, assignment.position)
+            return
+        self._compile_expression(assignment.expression)
+        self._emit(Opcode.STORE_FAST, slot, assignment.position)
+
+    def _compile_operate_and_assign(self, assignment):
+        if (slot := self._assignment_target(assignment.object)) is None:
+            self._emit(Opcode.INVALID_TARGET, 0, assignment.position)
+            return
+        self._compile_expression(assignment.expression)
+        opcode = Opcode.INPLACE_ADD if type(assignment) is AddAndAssign else Opcode.INPLACE_SUBTRACT
+        self._emit(opcode, slot, assignment.position)
+
+    def _compile_if_statement(self, if_statement):
+        end_jumps = []
+        branches = [(if_statement.condition, if_statement.block), *if_statement.elif_blocks]
+        for condition, block in branches:
+            self._compile_expression(condition)
+            skip = self._emit(Opcode.POP_JUMP_IF_FALSE)
+            self._compile_block(block)
+            end_jumps.append(self._emit(Opcode.JUMP))
+            self._patch(skip, self._label())
+        if if_statement.else_block:
+            self._compile_block(if_statement.else_block)
+        for jump in end_jumps:
+            self._patch(jump, self._label())
+
+    def _compile_while_loop_statement(self, while_statement):
+        start = self._label()
+        self._compile_expression(while_statement.condition)
+        exit_jump = self._emit(Opcode.POP_JUMP_IF_FALSE)
+        self._compile_block(while_statement.block)
+        self._emit(Opcode.JUMP, start)
+        self._patch(exit_jump, self._label())
+
+    def _compile_for_loop_statement(self, for_statement):
+        self._compile_expression(for_statement.expression)
+        self._emit(Opcode.GET_ITERATOR, 0, for_statement.position)
+        start = self._label()
+        exit_jump = self._emit(Opcode.FOR_ITERATOR)
+        self._emit(Opcode.STORE_LOOP_VARIABLE, self._variable(for_statement.slot, for_statement.loop_identifier))
+        self._compile_block(for_statement.block)
+        self._emit(Opcode.JUMP, start)
+        self._patch(exit_jump, self._label())
+
+    def _compile_return_statement(self, return_statement):
+        if not return_statement.expression:
+            self._emit(Opcode.RETURN_NONE, 0, return_statement.position)
+            return
+        self._compile_expression(return_statement.expression)
+        self._emit(Opcode.RETURN_VALUE, 0, return_statement.position)
+
+    def _compile_currency_transfer(self, currency_transfer):
+        for expression in currency_transfer.expressions:
+            self._compile_reference(expression)
+        self._emit(Opcode.TRANSFER, len(currency_transfer.expressions), currency_transfer.position)
+
+    # expressions
+
+    def _compile_expression(self, expression):
+        self._expression_compilers[type(expression)](expression)
+
+    def _compile_reference(self, expression):
+        if type(expression) is ObjectAccess and len(expression.objects) == 1 \
+                and type(expression.objects[0]) is IdentifierExpression:
+            self._compile_load(expression.objects[0], reference=True)
+            return
+        self._compile_expression(expression)
+        self._emit(Opcode.MAKE_REFERENCE)
+
+    def _compile_load(self, identifier, reference=False):
+        if identifier.slot is None:
+            opcode = Opcode.LOAD_GLOBAL_REFERENCE if reference else Opcode.LOAD_GLOBAL
+            self._emit(opcode, self._name(identifier.name), identifier.position)
+        else:
+            opcode = Opcode.LOAD_FAST_REFERENCE if reference else Opcode.LOAD_FAST
+            self._emit(opcode, identifier.slot, identifier.position)
+
+    def _compile_function_call(self, function_call):
+        self._emit(Opcode.MARK_CALL, 0, function_call.position)
+        for argument in function_call.arguments:
+            self._compile_reference(argument)
+        constant = (function_call.name, len(function_call.arguments), function_call.arguments_checked)
+        self._emit(Opcode.CALL, self._constant(constant), function_call.position)
+
+    def _compile_object_access(self, object_access):
+        first, *rest = object_access.objects
+        if type(first) is FunctionCall:
+            self._compile_function_call(first)
+        else:
+            self._compile_load(first)
+
+        method_calls = []
+        for part in rest:
+            if type(part) is FunctionCall:
+                for argument in part.arguments:
+                    self._compile_expression(argument)
+                method_call = [part.name, len(part.arguments), 0]
+                method_calls.append(method_call)
+                self._code_object.constants.append(method_call)
+                self._emit(Opcode.CALL_METHOD, len(self._code_object.constants) - 1, part.position)
+            else:
+                self._emit(Opcode.GET_ATTRIBUTE, self._name(part.name), part.position)
+        for method_call in method_calls:
+            method_call[2] = self._label()
+
+    def _compile_or_expression(self, expression):
+        self._compile_expression(expression.left)
+        jump = self._emit(Opcode.JUMP_IF_TRUE_OR_KEEP)
+        self._compile_expression(expression.right)
+        self._emit(Opcode.BOOL_OR, 0, expression.position)
+        self._patch(jump, self._label())
+
+    def _compile_and_expression(self, expression):
+        self._compile_expression(expression.left)
+        jump = self._emit(Opcode.JUMP_IF_FALSE_OR_KEEP)
+        self._compile_expression(expression.right)
+        self._emit(Opcode.BOOL_AND, 0, expression.position)
+        self._patch(jump, self._label())
+
+    def _compile_relation(self, relation):
+        self._compile_expression(relation.left)
+        self._compile_expression(relation.right)
+        self._emit(Opcode.COMPARE, RELATION_OPERATOR_INDEXES[type(relation)], relation.position)
+
+    def _compile_arithmetic(self, expression):
+        self._compile_expression(expression.left)
+        self._compile_expression(expression.right)
+        self._emit(Opcode.BINARY, ARITHMETIC_OPERATOR_INDEXES[type(expression)], expression.position)
+
+    def _compile_negated_expression(self, negation):
+        self._compile_expression(negation.right)
+        self._emit(Opcode.NEGATE, NEGATION_OPERATORS.index(negation.left), negation.position)
+
+    def _compile_const(self, const):
+        self._emit(Opcode.LOAD_CONST, self._constant(const.value))
+
+    def _compile_cur_const(self, const):
+        curtype = self._currencies.get_curtype(const.type, const.currency_id)
+        self._emit(Opcode.LOAD_CURRENCY, self._constant((const.value, curtype)))
+
+    def _compile_curtype_const(self, const):
+        self._emit(Opcode.LOAD_CONST, self._constant(self._currencies.get_curtype(const.value, const.currency_id)))
+
+    def _compile_dict_const(self, dict):
+        self._emit(Opcode.BUILD_DICT)
+        for pair in dict.pairs:
+            self._compile_expression(pair.expression)
+            self._emit(Opcode.STORE_ACCOUNT, self._name(pair.name), dict.position)
+
+
+def _is_hashable(value):
+    # Curtype and Currency are mutable dataclasses, compare them by identity
+    if isinstance(value, (Curtype, Currency)) or \
+            (isinstance(value, tuple) and any(isinstance(item, (Curtype, Currency)) for item in value)):
+        return False
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+# 0.0 == -0.0 and nan != nan, so floats are told apart by their repr
+def _constant_key(value):
+    if type(value) is float:
+        return float, repr(value)
+    if type(value) is tuple:
+        return tuple, tuple(_constant_key(item) for item in value)
+    return type(value), value
+
+
+def compile_program(program, exchange_rates=None):
+    return BytecodeCompiler(exchange_rates).compile_program(program)
+
+
+def disassemble(code_object: CodeObject) -> str:
+    lines = [f"function {code_object.name}({', '.join(code_object.variables[slot] for slot, _ in code_object.params)})"]
+    for index, position in enumerate(code_object.positions):
+        opcode = Opcode(code_object.code[2 * index])
+        argument = code_object.code[2 * index + 1]
+        if opcode in (Opcode.LOAD_CONST, Opcode.LOAD_CURRENCY, Opcode.CALL,
+                      Opcode.CALL_METHOD):
+            detail = f"({code_object.constants[argument]!r})"
+        elif opcode in (Opcode.LOAD_GLOBAL, Opcode.LOAD_GLOBAL_REFERENCE, Opcode.GET_ATTRIBUTE,
+                        Opcode.STORE_ACCOUNT):
+            detail = f"({code_object.names[argument]})"
+        elif opcode in (Opcode.LOAD_FAST, Opcode.LOAD_FAST_REFERENCE, Opcode.DECLARE, Opcode.STORE_FAST,
+                        Opcode.INPLACE_ADD, Opcode.INPLACE_SUBTRACT, Opcode.STORE_LOOP_VARIABLE):
+            detail = f"({code_object.variables[argument]})"
+        elif opcode is Opcode.DECLARE_STORE:
+            slot, variable_type = code_object.constants[argument]
+            detail = f"({code_object.variables[slot]}, {variable_type.__name__})"
+        elif opcode is Opcode.BINARY:
+            detail = f"({ARITHMETIC_OPERATORS[argument][0]})"
+        elif opcode is Opcode.COMPARE:
+            detail = f"({RELATION_OPERATORS[argument]})"
+        elif opcode is Opcode.NEGATE:
+            detail = f"({NEGATION_OPERATORS[argument]})"
+        elif opcode in JUMP_OPCODES:
+            detail = f"(to {argument})"
+        else:
+            detail = ""
+        location = f"{position.line}:{position.column}" if position else ""
+        lines.append(f"{location:>8} {index:6} {opcode.name:<24} {argument:<4} {detail}".rstrip())
+    return "\n".join(lines)
+
+
+def disassemble_program(compiled_program: CompiledProgram) -> str:
+    return "\n\n".join(disassemble(code_object) for code_object in compiled_program.functions.values())
@@ -1,225 +1,177 @@
 import sys
-from Interpreter.reference import Reference
+import operator
+from array import array
 from Currency.currency import Currency, Curtype
 from Interpreter.semantic_error import SemanticError
+from Currency.registry import to_registry
 
 
 NUMBER_TYPES = [int, float]
-STR_TYPES = [str]
-
-NUMBER_RELATION_OPERATOR_MAPPING = {
-    ">": lambda a, b: a > b,
-    ">=": lambda a, b: a >= b,
-    "<": lambda a, b: a < b,
-    "<=": lambda a, b: a <= b,
-    "==": lambda a, b: a == b,
-    "!=": lambda a, b: a != b
+
+RELATION_OPERATOR_MAPPING = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne
 }
 
-CURTYPE_RELATION_OPERATOR_MAPPING = {
-    "==": lambda a, b: a == b,
-    "!=": lambda a, b: a != b
+ARITHMETIC_OPERATOR_MAPPING = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv
 }
 
-STRING_RELATION_OPERATOR_MAPPING = {
-    "==": lambda a, b: a == b,
-    "!=": lambda a, b: a != b
+BOOL_OPERATOR_MAPPING = {
+    "&&": lambda a, b: a and b,
+    "||": lambda a, b: a or b
 }
 
-BOOL_RELATION_OPERATOR_MAPPING = {
-    "==": lambda a, b: a is b,
-    "!=": lambda a, b: a is not b
+
+def _check_number_size(value):
+    if value > sys.maxsize or value < (-1) * sys.maxsize:
+        raise ValueError("Value size exceeded")
+
+
+# Kernels are pure functions of (calculations, left, right); the only state they
+# read from Calculations is the immutable cross-rate matrix.
+
+def _number_kernel(method):
+    def kernel(calculations, left, right):
+        value = method(left, right)
+        _check_number_size(value)
+        return value
+    return kernel
+
+
+def _plain_kernel(method):
+    return lambda calculations, left, right: method(left, right)
+
+
+def _currency_kernel(method):
+    def kernel(calculations, left, right):
+        value = method(left.value, calculations.convert(right, left.type))
+        _check_number_size(value)
+        return Currency(value, left.type)
+    return kernel
+
+
+def _currency_by_number_kernel(method):
+    def kernel(calculations, left, right):
+        value = method(left.value, right)
+        _check_number_size(value)
+        return Currency(value, left.type)
+    return kernel
+
+
+def _number_by_currency_kernel(calculations, left, right):
+    value = left * right.value
+    _check_number_size(value)
+    return Currency(value, right.type)
+
+
+def _currency_relation_kernel(method):
+    return lambda calculations, left, right: method(left.value, calculations.convert(right, left.type))
+
+
+def _curtype_relation_kernel(method):
+    return lambda calculations, left, right: method(left.id, right.id)
+
+
+def _build_arithmetic_kernels():
+    kernels = {}
+    for symbol in ["+", "-"]:
+        method = ARITHMETIC_OPERATOR_MAPPING[symbol]
+        kernels[(symbol, int, int)] = _number_kernel(method)
+        kernels[(symbol, float, float)] = _number_kernel(method)
+        kernels[(symbol, Currency, Currency)] = _currency_kernel(method)
+    kernels[("+", str, str)] = _plain_kernel(operator.add)
+
+    kernels[("*", int, int)] = _number_kernel(operator.mul)
+    kernels[("*", float, float)] = _number_kernel(operator.mul)
+    kernels[("*", int, str)] = _plain_kernel(operator.mul)
+    kernels[("*", str, int)] = _plain_kernel(operator.mul)
+    kernels[("*", int, Currency)] = _number_by_currency_kernel
+    kernels[("*", float, Currency)] = _number_by_currency_kernel
+    kernels[("*", Currency, int)] = _currency_by_number_kernel(operator.mul)
+    kernels[("*", Currency, float)] = _currency_by_number_kernel(operator.mul)
+
+    kernels[("/", float, float)] = _number_kernel(operator.truediv)
+    kernels[("/", Currency, int)] = _currency_by_number_kernel(operator.truediv)
+    kernels[("/", Currency, float)] = _currency_by_number_kernel(operator.truediv)
+    return kernels
+
+
+def _build_relation_kernels():
+    kernels = {}
+    for symbol, method in RELATION_OPERATOR_MAPPING.items():
+        for left_type in NUMBER_TYPES:
+            for right_type in NUMBER_TYPES:
+                kernels[(symbol, left_type, right_type)] = _plain_kernel(method)
+        kernels[(symbol, Currency, Currency)] = _currency_relation_kernel(method)
+
+    for symbol in ["==", "!="]:
+        kernels[(symbol, str, str)] = _plain_kernel(RELATION_OPERATOR_MAPPING[symbol])
+        kernels[(symbol, Curtype, Curtype)] = _curtype_relation_kernel(RELATION_OPERATOR_MAPPING[symbol])
+    kernels[("==", bool, bool)] = _plain_kernel(operator.is_)
+    kernels[("!=", bool, bool)] = _plain_kernel(operator.is_not)
+    return kernels
+
+
+NEGATION_KERNELS = {
+    ("!", bool): lambda value: not value,
+    ("-", int): lambda value: value * -1,
+    ("-", float): lambda value: value * -1,
+    ("-", Currency): lambda value: Currency(-value.value, value.type)
 }
 
+ARITHMETIC_KERNELS = _build_arithmetic_kernels()
+RELATION_KERNELS = _build_relation_kernels()
+
 
 class Calculations:
     def __init__(self, exchange_rates):
-        self._exchange_rates = exchange_rates
-
-    def handle_bool_relations(self, left, right, expression, method):
+        self._currencies = to_registry(exchange_rates)
+        self._currency_count = len(self._currencies)
+        self._cross_rates = self._build_cross_rates(self._currencies.rates)
+
+    @staticmethod
+    def _build_cross_rates(rates):
+        # _cross_rates[left_id * n + right_id] converts an amount in the right
+        # currency into the left one; currencies without a rate convert to nan
+        cross_rates = array("d")
+        for left_rate in rates:
+            for right_rate in rates:
+                if left_rate is None or not right_rate:
+                    cross_rates.append(float("nan"))
+                else:
+                    cross_rates.append(left_rate / right_rate)
+        return cross_rates
+
+    def convert(self, currency, to_type):
+        return currency.value * self._cross_rates[to_type.id * self._currency_count + currency.type.id]
+
+    def handle_bool_relations(self, left, right, expression, operator):
         if type(left) is not bool or type(right) is not bool:
             raise SemanticError(f"Wrong type for operation, {type(left)} - {type(right)}", expression.position)
-        return Reference(value=method(left, right))
+        return BOOL_OPERATOR_MAPPING[operator](left, right)
 
     def compare_values(self, left, right, operator, relation):
-        self._left = left
-        self._right = right
-        self._operator = operator
-
-        result = self._try_compare_currency()
-        if result is None:
-            result = self._try_compare_numbers()
-        if result is None:
-            result = self._try_compare_strings()
-        if result is None:
-            result = self._try_compare_bools()
-        if result is None:
-            result = self._try_compare_curtype()
-
-        if result is None:
-            raise SemanticError(f"Wrong type for operation, {type(self._left)} - {type(self._right)}",
-                                relation.position)
-
-        return Reference(result)
+        kernel = RELATION_KERNELS.get((operator, type(left), type(right)))
+        if kernel is None:
+            raise SemanticError(f"Wrong type for operation, {type(left)} - {type(right)}", relation.position)
+        return kernel(self, left, right)
 
     def negate_value(self, operator, right, expression):
-        self._right = right
-        result = None
-        if operator == "!":
-            result = self._try_negate_bool()
-        else:
-            result = self._try_negate_number() \
-                or self._try_negate_currency(expression.position)
-
-        if result is None:
-            raise SemanticError(f"Wrong type for negation, {type(self._right)}", expression.position)
-
-        return Reference(result)
+        kernel = NEGATION_KERNELS.get((operator, type(right)))
+        if kernel is None:
+            raise SemanticError(f"Wrong type for negation, {type(right)}", expression.position)
+        return kernel(right)
 
     def calculate_result(self, left, right, expression, operation):
-        self._left = left
-        self._right = right
-        self._position = expression.position
-        if operation == "+":
-            self._method = lambda a, b: a + b
-            result = self._add_values()
-        elif operation == "-":
-            self._method = lambda a, b: a - b
-            result = self._sub_values()
-        elif operation == "*":
-            self._method = lambda a, b: a * b
-            result = self._mul_values()
-        elif operation == "/":
-            self._method = lambda a, b: a / b
-            result = self._div_values()
-
-        return Reference(result)
-
-    def _check_number_size(self, value):
-        if value > sys.maxsize or value < (-1) * sys.maxsize:
-            raise ValueError("Value size exceeded")
-
-    def _operate_on_currency(self):
-        if (self._right.type != self._left.type):
-            left_rate = self._exchange_rates.get(self._left.type.value)
-            left_value = self._left.value / left_rate
-
-            right_rate = self._exchange_rates.get(self._right.type.value)
-            right_value = self._right.value / right_rate
-
-            value = self._method(left_value, right_value)
-            value = value * left_rate
-            self._check_number_size(value)
-            return Currency(value, self._left.type)
-
-        value = self._method(self._left.value, self._right.value)
-        self._check_number_size(value)
-        return Currency(value, self._left.type)
-
-    def _add_values(self):
-        if type(self._left) in NUMBER_TYPES:
-            value = self._left + self._right
-            self._check_number_size(value)
-            return value
-        elif type(self._left) is str:
-            return self._left + self._right
-        else:
-            return self._operate_on_currency()
-
-    def _sub_values(self):
-        if type(self._left) in NUMBER_TYPES:
-            value = self._left - self._right
-            self._check_number_size(value)
-            return value
-        else:
-            return self._operate_on_currency()
-
-    def _mul_values(self):
-        if type(self._left) is Currency:
-            value = self._left.value * self._right
-            self._check_number_size(value)
-            return Currency(value, self._left.type)
-        elif type(self._right) is Currency:
-            value = self._left * self._right.value
-            self._check_number_size(value)
-            return Currency(value, self._right.type)
-        elif type(self._left) is str or type(self._right) is str:
-            return self._left * self._right
-        else:
-            value = self._left * self._right
-            self._check_number_size(value)
-            return value
-
-    def _div_values(self):
-        if type(self._left) is float:
-            value = self._left / self._right
-            self._check_number_size(value)
-            return value
-        else:
-            value = self._left.value / self._right
-            self._check_number_size(value)
-            return Currency(value, self._left.type)
-
-    def _try_compare_currency(self):
-        if not isinstance(self._left, Currency) or not isinstance(self._right, Currency):
-            return None
-        left_rate = self._exchange_rates.get(self._left.type.value)
-        left_value = self._left.value / left_rate
-
-        right_rate = self._exchange_rates.get(self._right.type.value)
-        right_value = self._right.value / right_rate
-
-        method = NUMBER_RELATION_OPERATOR_MAPPING.get(self._operator)
-        return method(left_value, right_value)
-
-    def _try_compare_numbers(self):
-        if type(self._left) not in NUMBER_TYPES or type(self._right) not in NUMBER_TYPES:
-            return None
-
-        method = NUMBER_RELATION_OPERATOR_MAPPING.get(self._operator)
-        return method(self._left, self._right)
-
-    def _try_compare_curtype(self):
-        if not isinstance(self._left, Curtype) or not isinstance(self._right, Curtype):
-            return None
-
-        method = CURTYPE_RELATION_OPERATOR_MAPPING.get(self._operator)
-        if not method:
-            return None
-
-        return method(self._left.value, self._right.value)
-
-    def _try_compare_strings(self):
-        if type(self._left) not in STR_TYPES or type(self._right) not in STR_TYPES:
-            return None
-
-        method = STRING_RELATION_OPERATOR_MAPPING.get(self._operator)
-        if not method:
-            return None
-
-        return method(self._left, self._right)
-
-    def _try_compare_bools(self):
-        if type(self._left) is not bool or type(self._right) is not bool:
-            return None
-
-        method = BOOL_RELATION_OPERATOR_MAPPING.get(self._operator)
-        if not method:
-            return None
-
-        return method(self._left, self._right)
-
-    def _try_negate_bool(self):
-        if type(self._right) is not bool:
-            return None
-        return not self._right
-
-    def _try_negate_number(self):
-        if type(self._right) not in NUMBER_TYPES:
-            return None
-        return self._right * -1
-
-    def _try_negate_currency(self, position):
-        if not isinstance(self._right, Currency):
-            return None
-        return Currency(-self._right.value, self._right.type)
+        kernel = ARITHMETIC_KERNELS.get((operation, type(left), type(right)))
+        if kernel is None:
+            raise SemanticError(f"Wrong type for operation, {type(left)} - {type(right)}", expression.position)
+        return kernel(self, left, right)
@@ -0,0 +1,582 @@
+from Visitor.interface import Visitor
+from Visitor.interpreter_visitor import TYPES_MAP, BUILTINS_LIST
+from Interpreter.reference import Reference
+from Interpreter.calculations import Calculations, ARITHMETIC_KERNELS, RELATION_KERNELS, NEGATION_KERNELS
+from Interpreter.semantic_error import (SemanticError, arguments_count_message, depth_exceeded_message,
+                                        INVALID_TARGET_MESSAGE)
+from Currency.currency import Currency, Dictionary
+from Currency.registry import to_registry
+from Interpreter.analysis import analyse_program
+from Parse_objects.objects import (
+    OrExpression,
+    AndExpression,
+    LessRelation,
+    LessEqualRelation,
+    GreaterRelation,
+    GreaterEqualRelation,
+    EqualRelation,
+    NotEqualRelation,
+    NegatedExpression,
+    AddExpression,
+    SubExpression,
+    MulExpression,
+    DivExpression,
+    IntConst,
+    FloatConst,
+    CurConst,
+    StrConst,
+    BoolConst,
+    CurtypeConst,
+    DictConst,
+    ObjectAccess,
+    Declaration,
+    Assignment,
+    AddAndAssign,
+    SubAndAssign,
+    IfStatement,
+    WhileLoopStatement,
+    ForLoopStatement,
+    ReturnStatement,
+    CurrencyTransfer,
+    IdentifierExpression,
+    FunctionCall,
+    BuiltInFunction
+)
+
+
+RELATION_SYMBOLS = {
+    LessRelation: "<",
+    LessEqualRelation: "<=",
+    GreaterRelation: ">",
+    GreaterEqualRelation: ">=",
+    EqualRelation: "==",
+    NotEqualRelation: "!="
+}
+
+ARITHMETIC_SYMBOLS = {
+    AddExpression: ("+", "Different types in add operation"),
+    SubExpression: ("-", "Different types in sub operation"),
+    MulExpression: ("*", "Different types in multiply operation"),
+    DivExpression: ("/", "Wrong types in divide operation")
+}
+
+# Every function body is compiled once into nested closures. Expression closures
+# take the frame of the running call, indexed by the slots given by the resolver,
+# and return plain values; statement closures return None, or a one element tuple
+# holding the value of an executed return.
+class ClosureInterpreter(Visitor):
+    def __init__(self, exchange_rates, max_depth=None):
+        self._max_depth = max_depth
+        self._depth = 0
+        self._currencies = to_registry(exchange_rates)
+        self._calculations = Calculations(self._currencies)
+        self._functions = {}
+        self._compiled = {}
+        self._call_position = None
+        self._expected_return_type = None
+
+        self._expression_compilers = {
+            OrExpression: self._compile_or_expression,
+            AndExpression: self._compile_and_expression,
+            NegatedExpression: self._compile_negated_expression,
+            IntConst: self._compile_const,
+            FloatConst: self._compile_const,
+            StrConst: self._compile_const,
+            BoolConst: self._compile_const,
+            CurConst: self._compile_cur_const,
+            CurtypeConst: self._compile_curtype_const,
+            DictConst: self._compile_dict_const,
+            ObjectAccess: self._compile_object_access,
+            **dict.fromkeys(RELATION_SYMBOLS, self._compile_relation),
+            **dict.fromkeys(ARITHMETIC_SYMBOLS, self._compile_arithmetic)
+        }
+        self._statement_compilers = {
+            Declaration: self._compile_declaration,
+            Assignment: self._compile_assignment,
+            AddAndAssign: self._compile_operate_and_assign,
+            SubAndAssign: self._compile_operate_and_assign,
+            IfStatement: self._compile_if_statement,
+            WhileLoopStatement: self._compile_while_loop_statement,
+            ForLoopStatement: self._compile_for_loop_statement,
+            ReturnStatement: self._compile_return_statement,
+            CurrencyTransfer: self._compile_currency_transfer,
+            ObjectAccess: self._compile_expression_statement
+        }
+
+    def visit_program(self, program):
+        self._functions = dict(program.functions)
+        for name, function in BUILTINS_LIST:
+            self._functions[name] = BuiltInFunction(position=None, name=name, function=function)
+
+        analyse_program(program)
+        self._get_function('main')([], False)
+
+    def _get_function(self, name):
+        compiled = self._compiled.get(name)
+        if compiled is None:
+            function = self._functions.get(name)
+            if function is None:
+                return None
+            if type(function) is BuiltInFunction:
+                compiled = self._compile_builtin_function(function)
+            else:
+                compiled = self._compile_function_definition(function)
+            self._compiled[name] = compiled
+        return compiled
+
+    # functions
+
+    def _compile_function_definition(self, function_definition):
+        expected_return_type = TYPES_MAP[function_definition.type]
+        parameters = [(parameter.slot, TYPES_MAP[parameter.type]) for parameter in function_definition.params]
+        frame_size = function_definition.frame_size
+        max_depth = self._max_depth
+        self._expected_return_type = expected_return_type
+        body = self._compile_block(function_definition.block)
+
+        def call(arguments, checked):
+            if not checked:
+                if len(arguments) != len(parameters):
+                    raise SemanticError(arguments_count_message(len(parameters), len(arguments)),
+                                        self._call_position)
+                for argument, (slot, parameter_type) in zip(arguments, parameters):
+                    if type(argument.value) is not parameter_type:
+                        raise SemanticError("Parameter type mismatch.", self._call_position)
+
+            frame = [None] * frame_size
+            for argument, (slot, parameter_type) in zip(arguments, parameters):
+                frame[slot] = argument
+
+            self._depth += 1
+            try:
+                if max_depth is not None and self._depth > max_depth:
+                    raise SemanticError(depth_exceeded_message(max_depth), self._call_position)
+                result = body(frame)
+            finally:
+                self._depth -= 1
+            return None if result is None else result[0]
+
+        return call
+
+    def _compile_builtin_function(self, built_in_function):
+        function = built_in_function.function
+
+        def call(arguments, checked):
+            try:
+                return function(*[argument.value for argument in arguments] if len(arguments) else " ")
+            except Exception as e:
+                raise SemanticError(e.args[0], self._call_position)
+
+        return call
+
+    # statements
+
+    def _compile_statement(self, statement):
+        return self._statement_compilers[type(statement)](statement)
+
+    def _compile_block(self, block):
+        statements = [self._compile_statement(statement) for statement in block.statements]
+
+        def run_block(frame):
+            for statement in statements:
+                if (result := statement(frame)) is not None:
+                    return result
+
+        return run_block
+
+    def _compile_expression_statement(self, object_access):
+        expression = self._compile_expression(object_access)
+
+        def run_expression(frame):
+            expression(frame)
+
+        return run_expression
+
+    def _compile_declaration(self, declaration):
+        slot = declaration.slot
+
+        def declare(frame):
+            frame[slot] = None
+
+        return declare
+
+    def _compile_assignment(self, assignment):
+        expression = self._compile_expression(assignment.expression)
+        position = assignment.position
+
+        if type(assignment.object) is Declaration:
+            slot = assignment.object.slot
+            expected_type = TYPES_MAP[assignment.object.type]
+
+            if assignment.static_type is not None:
+                def declare_and_assign_checked(frame):
+                    frame[slot] = Reference(expression(frame))
+
+                return declare_and_assign_checked
+
+            def declare_and_assign(frame):
+                value = expression(frame)
+                if type(value) is not expected_type:
+                    raise SemanticError("Type mismatch.", position)
+                frame[slot] = Reference(value)
+
+            return declare_and_assign
+
+        slot = self._get_assignment_target(assignment.object)
+        checked = assignment.static_type is not None
+
+        def assign(frame):
+            if slot is None:
+                raise SemanticError(INVALID_TARGET_MESSAGE, position)
+            value = expression(frame)
+            old_value = frame[slot]
+            if old_value is None:
+                raise SemanticError("Undefined variable.", position)
+            if not checked and type(value) is not type(old_value.value):
+                raise SemanticError(f"Type mismatch, {type(old_value.value)} - {type(value)}", position)
+            old_value.value = value
+
+        return assign
+
+    def _get_assignment_target(self, object_access):
+        target = object_access.objects[0]
+        if len(object_access.objects) != 1 or type(target) is not IdentifierExpression:
+            return None
+        return target.slot
+
+    def _compile_operate_and_assign(self, assignment):
+        expression = self._compile_expression(assignment.expression)
+        slot = self._get_assignment_target(assignment.object)
+        name = assignment.object.objects[0].name
+        position = assignment.position
+        adding = type(assignment) is AddAndAssign
+        checked = assignment.static_type is not None
+
+        def operate_and_assign(frame):
+            if slot is None:
+                raise SemanticError(INVALID_TARGET_MESSAGE, position)
+            value = expression(frame)
+            old_value = frame[slot]
+            if old_value is None:
+                raise SemanticError(f"Undefined variable {name}", position)
+            if not checked and type(value) is not type(old_value.value):
+                raise SemanticError(f"Type mismatch, {type(old_value.value)} - {type(value)}", position)
+            if adding:
+                old_value.value += value
+            else:
+                old_value.value -= value
+
+        return operate_and_assign
+
+    def _compile_if_statement(self, if_statement):
+        branches = [(self._compile_expression(if_statement.condition), self._compile_block(if_statement.block))]
+        for condition, block in if_statement.elif_blocks:
+            branches.append((self._compile_expression(condition), self._compile_block(block)))
+        else_block = self._compile_block(if_statement.else_block) if if_statement.else_block else None
+
+        def run_if(frame):
+            for condition, block in branches:
+                if condition(frame):
+                    return block(frame)
+            if else_block is not None:
+                return else_block(frame)
+
+        return run_if
+
+    def _compile_while_loop_statement(self, while_statement):
+        condition = self._compile_expression(while_statement.condition)
+        block = self._compile_block(while_statement.block)
+
+        def run_while(frame):
+            while condition(frame):
+                if (result := block(frame)) is not None:
+                    return result
+
+        return run_while
+
+    def _compile_for_loop_statement(self, for_statement):
+        slot = for_statement.slot
+        iterable = self._compile_expression(for_statement.expression)
+        block = self._compile_block(for_statement.block)
+
+        def run_for(frame):
+            for element in iterable(frame):
+                frame[slot] = element if isinstance(element, Reference) else Reference(element)
+                if (result := block(frame)) is not None:
+                    return result
+
+        return run_for
+
+    def _compile_return_statement(self, return_statement):
+        expected = self._expected_return_type
+        position = return_statement.position
+
+        if not return_statement.expression:
+            def return_nothing(frame):
+                if expected is not None:
+                    raise SemanticError(f"Expected return of a type {expected}", position)
+                return (None,)
+
+            return return_nothing
+
+        expression = self._compile_expression(return_statement.expression)
+
+        if return_statement.static_type is not None:
+            def return_checked_value(frame):
+                return (expression(frame),)
+
+            return return_checked_value
+
+        def return_value(frame):
+            value = expression(frame)
+            if type(value) is not expected:
+                raise SemanticError(f"Wrong return type, expected {expected}, got {type(value)}", position)
+            return (value,)
+
+        return return_value
+
+    def _compile_currency_transfer(self, currency_transfer):
+        expressions = [self._compile_reference(expression) for expression in currency_transfer.expressions]
+        calculations = self._calculations
+        add = ARITHMETIC_KERNELS[("+", Currency, Currency)]
+        sub = ARITHMETIC_KERNELS[("-", Currency, Currency)]
+        position = currency_transfer.position
+
+        def evaluate(frame):
+            references = [expression(frame) for expression in expressions]
+            for reference in references:
+                if type(reference.value) is not Currency:
+                    raise SemanticError("Expected a cur expressions in transfer", position)
+            return references
+
+        if len(expressions) == 3:
+            def transfer_between(frame):
+                source, amount, target = evaluate(frame)
+                source.value = sub(calculations, source.value, amount.value)
+                target.value = add(calculations, target.value, amount.value)
+
+            return transfer_between
+
+        def transfer(frame):
+            source, target = evaluate(frame)
+            new_target = add(calculations, target.value, source.value)
+            new_source = sub(calculations, source.value, target.value)
+            target.value = new_target
+            source.value = new_source
+
+        return transfer
+
+    # expressions
+
+    def _compile_expression(self, expression):
+        return self._expression_compilers[type(expression)](expression)
+
+    def _compile_reference(self, expression):
+        if type(expression) is ObjectAccess and len(expression.objects) == 1 \
+                and type(expression.objects[0]) is IdentifierExpression:
+            return self._compile_identifier(expression.objects[0], reference=True)
+
+        value = self._compile_expression(expression)
+
+        def evaluate_reference(frame):
+            return Reference(value(frame))
+
+        return evaluate_reference
+
+    def _compile_identifier(self, identifier, reference=False):
+        name = identifier.name
+        slot = identifier.slot
+        position = identifier.position
+        functions = self._functions
+
+        def load(frame):
+            if slot is not None:
+                variable = frame[slot]
+                if variable is not None:
+                    return variable if reference else variable.value
+            function = functions.get(name)
+            if function is None:
+                raise SemanticError(f"'{name}' was not declared in this scope", position)
+            return Reference(function) if reference else function
+
+        return load
+
+    def _compile_function_call(self, function_call):
+        arguments = [self._compile_reference(argument) for argument in function_call.arguments]
+        name = function_call.name
+        position = function_call.position
+        checked = function_call.arguments_checked
+        function = None
+
+        def call(frame):
+            nonlocal function
+            self._call_position = position
+            values = [argument(frame) for argument in arguments]
+            if function is None:
+                function = self._get_function(name)
+                if function is None:
+                    raise SemanticError(f"Function {name} not found", position)
+            return function(values, checked)
+
+        return call
+
+    def _compile_object_access(self, object_access):
+        first, *rest = object_access.objects
+        if type(first) is FunctionCall:
+            evaluate_first = self._compile_function_call(first)
+        else:
+            evaluate_first = self._compile_identifier(first)
+
+        if not rest:
+            return evaluate_first
+
+        parts = []
+        for part in rest:
+            if type(part) is FunctionCall:
+                parts.append((part.name, [self._compile_expression(argument) for argument in part.arguments]))
+            else:
+                parts.append((part.name, None))
+
+        def access(frame):
+            method_or_value = evaluate_first(frame)
+            for name, arguments in parts:
+                if arguments is not None:
+                    ret = getattr(method_or_value, name)(*[argument(frame) for argument in arguments])
+                    if ret:
+                        return ret
+                else:
+                    method_or_value = getattr(method_or_value, name)
+            return method_or_value
+
+        return access
+
+    def _compile_or_expression(self, expression):
+        left = self._compile_expression(expression.left)
+        right = self._compile_expression(expression.right)
+        position = expression.position
+
+        def evaluate_or(frame):
+            left_value = left(frame)
+            if left_value is True:
+                return True
+            right_value = right(frame)
+            if type(left_value) is not bool or type(right_value) is not bool:
+                raise SemanticError(f"Wrong type for operation, {type(left_value)} - {type(right_value)}", position)
+            return left_value or right_value
+
+        return evaluate_or
+
+    def _compile_and_expression(self, expression):
+        left = self._compile_expression(expression.left)
+        right = self._compile_expression(expression.right)
+        position = expression.position
+
+        def evaluate_and(frame):
+            left_value = left(frame)
+            if left_value is False:
+                return False
+            right_value = right(frame)
+            if type(left_value) is not bool or type(right_value) is not bool:
+                raise SemanticError(f"Wrong type for operation, {type(left_value)} - {type(right_value)}", position)
+            return left_value and right_value
+
+        return evaluate_and
+
+    def _compile_binary(self, expression, operator, kernels, message):
+        left = self._compile_expression(expression.left)
+        right = self._compile_expression(expression.right)
+        calculations = self._calculations
+        position = expression.position
+
+        left_type = expression.left.static_type
+        right_type = expression.right.static_type
+        if (kernel := kernels.get((operator, left_type, right_type))) is not None:
+            def evaluate_selected(frame):
+                return kernel(calculations, left(frame), right(frame))
+
+            return evaluate_selected
+
+        # monomorphic inline cache of the last seen operand types
+        cached_left_type = cached_right_type = cached_kernel = None
+
+        def evaluate(frame):
+            nonlocal cached_left_type, cached_right_type, cached_kernel
+            left_value = left(frame)
+            right_value = right(frame)
+            if type(left_value) is not cached_left_type or type(right_value) is not cached_right_type:
+                kernel = kernels.get((operator, type(left_value), type(right_value)))
+                if kernel is None:
+                    raise SemanticError(message(left_value, right_value), position)
+                cached_left_type = type(left_value)
+                cached_right_type = type(right_value)
+                cached_kernel = kernel
+            return cached_kernel(calculations, left_value, right_value)
+
+        return evaluate
+
+    def _compile_relation(self, relation):
+        return self._compile_binary(
+            relation, RELATION_SYMBOLS[type(relation)], RELATION_KERNELS,
+            lambda left, right: f"Wrong type for operation, {type(left)} - {type(right)}"
+        )
+
+    def _compile_arithmetic(self, expression):
+        operator, message = ARITHMETIC_SYMBOLS[type(expression)]
+        return self._compile_binary(expression, operator, ARITHMETIC_KERNELS, lambda left, right: message)
+
+    def _compile_negated_expression(self, negation):
+        right = self._compile_expression(negation.right)
+        operator = negation.left
+        position = negation.position
+
+        def evaluate_negation(frame):
+            value = right(frame)
+            kernel = NEGATION_KERNELS.get((operator, type(value)))
+            if kernel is None:
+                raise SemanticError(f"Wrong type for negation, {type(value)}", position)
+            return kernel(value)
+
+        return evaluate_negation
+
+    def _compile_const(self, const):
+        value = const.value
+
+        def evaluate_const(frame):
+            return value
+
+        return evaluate_const
+
+    def _compile_cur_const(self, const):
+        value = const.value
+        curtype = self._currencies.get_curtype(const.type, const.currency_id)
+
+        def evaluate_cur_const(frame):
+            return Currency(value, curtype)
+
+        return evaluate_cur_const
+
+    def _compile_curtype_const(self, const):
+        curtype = self._currencies.get_curtype(const.value, const.currency_id)
+
+        def evaluate_curtype_const(frame):
+            return curtype
+
+        return evaluate_curtype_const
+
+    def _compile_dict_const(self, dict):
+        pairs = [(pair.name, self._compile_expression(pair.expression)) for pair in dict.pairs]
+        position = dict.position
+
+        def evaluate_dict(frame):
+            dictionary = Dictionary({})
+            for name, expression in pairs:
+                value = expression(frame)
+                if type(value) is not Currency:
+                    raise SemanticError("Expected cur in dict value", position)
+                if dictionary.storage.get(name):
+                    raise SemanticError(f"Multiple account name '{name}' defined", position)
+                dictionary.storage[name] = value
+            return dictionary
+
+        return evaluate_dict
+
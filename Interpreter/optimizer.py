@@ -0,0 +1,280 @@
+from Interpreter.calculations import Calculations, ARITHMETIC_KERNELS, RELATION_KERNELS, NEGATION_KERNELS
+from Interpreter.analysis import analyse_program
+from Currency.currency import Currency, Curtype
+from Currency.registry import to_registry
+from Parse_objects.objects import (
+    OrExpression,
+    AndExpression,
+    LessRelation,
+    LessEqualRelation,
+    GreaterRelation,
+    GreaterEqualRelation,
+    EqualRelation,
+    NotEqualRelation,
+    NegatedExpression,
+    AddExpression,
+    SubExpression,
+    MulExpression,
+    DivExpression,
+    IntConst,
+    FloatConst,
+    CurConst,
+    StrConst,
+    BoolConst,
+    CurtypeConst,
+    DictConst,
+    ObjectAccess,
+    Declaration,
+    Assignment,
+    AddAndAssign,
+    SubAndAssign,
+    IfStatement,
+    WhileLoopStatement,
+    ForLoopStatement,
+    ReturnStatement,
+    CurrencyTransfer,
+    FunctionCall
+)
+
+
+RELATION_SYMBOLS = {
+    LessRelation: "<",
+    LessEqualRelation: "<=",
+    GreaterRelation: ">",
+    GreaterEqualRelation: ">=",
+    EqualRelation: "==",
+    NotEqualRelation: "!="
+}
+
+ARITHMETIC_SYMBOLS = {
+    AddExpression: "+",
+    SubExpression: "-",
+    MulExpression: "*",
+    DivExpression: "/"
+}
+
+LITERALS = (IntConst, FloatConst, StrConst, BoolConst, CurConst, CurtypeConst)
+
+# a longer repeated string is left to the engines, the code building it may never run
+MAX_FOLDED_STR_LENGTH = 4096
+
+
+# Rewrites a program after analysis. Operations on literals are evaluated with
+# the same kernels the engines use and replaced by a literal, and if branches
+# whose condition is a literal are dropped or taken unconditionally. Anything
+# that could fail at runtime is left as it is, so errors do not change.
+class Optimizer:
+    def __init__(self, exchange_rates):
+        self._currencies = to_registry(exchange_rates)
+        self._calculations = Calculations(self._currencies)
+
+        self._expression_optimizers = {
+            OrExpression: self._optimize_or_expression,
+            AndExpression: self._optimize_and_expression,
+            NegatedExpression: self._optimize_negated_expression,
+            DictConst: self._optimize_dict_const,
+            ObjectAccess: self._optimize_object_access,
+            **dict.fromkeys(LITERALS, lambda literal: literal),
+            **dict.fromkeys(RELATION_SYMBOLS, self._optimize_relation),
+            **dict.fromkeys(ARITHMETIC_SYMBOLS, self._optimize_arithmetic)
+        }
+        self._statement_optimizers = {
+            Declaration: self._optimize_declaration,
+            Assignment: self._optimize_assignment,
+            AddAndAssign: self._optimize_assignment,
+            SubAndAssign: self._optimize_assignment,
+            IfStatement: self._optimize_if_statement,
+            WhileLoopStatement: self._optimize_while_loop_statement,
+            ForLoopStatement: self._optimize_for_loop_statement,
+            ReturnStatement: self._optimize_return_statement,
+            CurrencyTransfer: self._optimize_currency_transfer,
+            ObjectAccess: self._optimize_expression_statement
+        }
+
+    def optimize(self, program):
+        for function in program.functions.values():
+            if function.block is not None:
+                function.block = self._optimize_block(function.block)
+        return program
+
+    # statements
+
+    def _optimize_block(self, block):
+        statements = []
+        for statement in block.statements:
+            statements.extend(self._statement_optimizers[type(statement)](statement))
+        block.statements = statements
+        return block
+
+    def _optimize_declaration(self, declaration):
+        return [declaration]
+
+    def _optimize_assignment(self, assignment):
+        assignment.expression = self._optimize_expression(assignment.expression)
+        return [assignment]
+
+    def _optimize_expression_statement(self, object_access):
+        return [self._optimize_object_access(object_access)]
+
+    def _optimize_if_statement(self, if_statement):
+        branches = []
+        else_block = if_statement.else_block
+        for condition, block in [(if_statement.condition, if_statement.block), *if_statement.elif_blocks]:
+            condition = self._optimize_expression(condition)
+            block = self._optimize_block(block)
+            if not isinstance(condition, LITERALS):
+                branches.append((condition, block))
+            elif self._literal_value(condition):
+                else_block = block
+                break
+        else:
+            if else_block:
+                else_block = self._optimize_block(else_block)
+
+        if branches:
+            (condition, block), *elif_blocks = branches
+            if_statement.condition = condition
+            if_statement.block = block
+            if_statement.elif_blocks = elif_blocks
+            if_statement.else_block = else_block
+            return [if_statement]
+        if else_block is None:
+            return []
+        if _declares_variables(else_block):
+            # keep the scope of the block by running it behind a condition that is always true
+            return [IfStatement(if_statement.position, BoolConst(if_statement.position, True), else_block, [])]
+        return else_block.statements
+
+    def _optimize_while_loop_statement(self, while_statement):
+        while_statement.condition = self._optimize_expression(while_statement.condition)
+        while_statement.block = self._optimize_block(while_statement.block)
+        return [while_statement]
+
+    def _optimize_for_loop_statement(self, for_statement):
+        for_statement.expression = self._optimize_expression(for_statement.expression)
+        for_statement.block = self._optimize_block(for_statement.block)
+        return [for_statement]
+
+    def _optimize_return_statement(self, return_statement):
+        if return_statement.expression:
+            return_statement.expression = self._optimize_expression(return_statement.expression)
+        return [return_statement]
+
+    def _optimize_currency_transfer(self, currency_transfer):
+        currency_transfer.expressions = [self._optimize_expression(expression)
+                                         for expression in currency_transfer.expressions]
+        return [currency_transfer]
+
+    # expressions
+
+    def _optimize_expression(self, expression):
+        return self._expression_optimizers[type(expression)](expression)
+
+    def _optimize_object_access(self, object_access):
+        for part in object_access.objects:
+            if type(part) is FunctionCall:
+                part.arguments = [self._optimize_expression(argument) for argument in part.arguments]
+        return object_access
+
+    def _optimize_dict_const(self, dict):
+        for pair in dict.pairs:
+            pair.expression = self._optimize_expression(pair.expression)
+        return dict
+
+    def _optimize_or_expression(self, expression):
+        return self._optimize_bool_expression(expression, short_circuit=True)
+
+    def _optimize_and_expression(self, expression):
+        return self._optimize_bool_expression(expression, short_circuit=False)
+
+    def _optimize_bool_expression(self, expression, short_circuit):
+        expression.left = self._optimize_expression(expression.left)
+        expression.right = self._optimize_expression(expression.right)
+        left = expression.left
+        if type(left) is not BoolConst:
+            return expression
+        if left.value is short_circuit:
+            return BoolConst(expression.position, short_circuit)
+        # the result is the right operand once it is known to be a bool
+        if type(expression.right) is BoolConst or expression.right.static_type is bool:
+            return expression.right
+        return expression
+
+    def _optimize_relation(self, relation):
+        return self._fold_binary(relation, RELATION_KERNELS, RELATION_SYMBOLS[type(relation)])
+
+    def _optimize_arithmetic(self, expression):
+        return self._fold_binary(expression, ARITHMETIC_KERNELS, ARITHMETIC_SYMBOLS[type(expression)])
+
+    def _fold_binary(self, expression, kernels, operator):
+        expression.left = self._optimize_expression(expression.left)
+        expression.right = self._optimize_expression(expression.right)
+        if not isinstance(expression.left, LITERALS) or not isinstance(expression.right, LITERALS):
+            return expression
+
+        left = self._literal_value(expression.left)
+        right = self._literal_value(expression.right)
+        kernel = kernels.get((operator, type(left), type(right)))
+        if kernel is None or _repeats_too_long(operator, left, right):
+            return expression
+        # an error is left to the engines, which report it only if the code runs
+        try:
+            value = kernel(self._calculations, left, right)
+        except Exception:
+            return expression
+        return self._literal(value, expression.position)
+
+    def _optimize_negated_expression(self, negation):
+        negation.right = self._optimize_expression(negation.right)
+        if not isinstance(negation.right, LITERALS):
+            return negation
+        value = self._literal_value(negation.right)
+        kernel = NEGATION_KERNELS.get((negation.left, type(value)))
+        if kernel is None:
+            return negation
+        try:
+            value = kernel(value)
+        except Exception:
+            return negation
+        return self._literal(value, negation.position)
+
+    # literals
+
+    def _literal_value(self, literal):
+        if type(literal) is CurConst:
+            return Currency(literal.value, self._currencies.get_curtype(literal.type, literal.currency_id))
+        if type(literal) is CurtypeConst:
+            return self._currencies.get_curtype(literal.value, literal.currency_id)
+        return literal.value
+
+    def _literal(self, value, position):
+        if type(value) is Currency:
+            return CurConst(position, value.value, value.type.value, value.type.id)
+        if type(value) is Curtype:
+            return CurtypeConst(position, value.value, value.id)
+        literal_class = {int: IntConst, float: FloatConst, str: StrConst, bool: BoolConst}[type(value)]
+        return literal_class(position, value)
+
+
+def _repeats_too_long(operator, left, right):
+    if operator != "*":
+        return False
+    if type(left) is str and type(right) is int:
+        return len(left) * right > MAX_FOLDED_STR_LENGTH
+    if type(left) is int and type(right) is str:
+        return left * len(right) > MAX_FOLDED_STR_LENGTH
+    return False
+
+
+def _declares_variables(block):
+    for statement in block.statements:
+        if type(statement) in (Declaration, ForLoopStatement):
+            return True
+        if type(statement) is Assignment and type(statement.object) is Declaration:
+            return True
+    return False
+
+
+def optimize_program(program, exchange_rates):
+    analyse_program(program)
+    return Optimizer(exchange_rates).optimize(program)
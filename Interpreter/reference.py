@@ -2,6 +2,6 @@ from dataclasses import dataclass
 from typing import Any
 
 
-@dataclass
+@dataclass(slots=True)
 class Reference:
     value: Any
@@ -0,0 +1,177 @@
+from Visitor.interface import Visitor
+from Interpreter.semantic_error import SemanticError, INVALID_TARGET_MESSAGE
+from Parse_objects.objects import Declaration, IdentifierExpression, FunctionCall
+
+
+# Gives every variable of a function a flat slot in the frame of that function.
+# Declarations, parameters and loop variables get the slot they write to and
+# every identifier read or assigned gets the slot of the declaration it refers to.
+class Resolver(Visitor):
+    def __init__(self, function_names):
+        self._function_names = set(function_names)
+        self._scopes = []
+        self._frame_size = 0
+
+    def _new_slot(self):
+        self._frame_size += 1
+        return self._frame_size - 1
+
+    def _lookup(self, name):
+        for scope in reversed(self._scopes):
+            slot = scope.get(name)
+            if slot is not None:
+                return slot
+        return None
+
+    def _check_redeclaration(self, declaration):
+        if declaration.name in self._scopes[-1]:
+            raise SemanticError(f"Redeclaration of a variable {declaration.name}", declaration.position)
+
+    def _declare(self, declaration):
+        declaration.slot = self._new_slot()
+        self._scopes[-1][declaration.name] = declaration.slot
+
+    def _resolve_target(self, object_access, message, position):
+        target = object_access.objects[0]
+        if len(object_access.objects) != 1 or type(target) is not IdentifierExpression:
+            raise SemanticError(INVALID_TARGET_MESSAGE, position)
+        target.slot = self._lookup(target.name)
+        if target.slot is None:
+            raise SemanticError(message, position)
+
+    def visit_program(self, program):
+        for function in program.functions.values():
+            if function.block is not None:
+                function.accept(self)
+
+    def visit_function_definition(self, function_definition):
+        self._scopes = [{}]
+        self._frame_size = 0
+        for parameter in function_definition.params:
+            parameter.accept(self)
+        function_definition.block.accept(self)
+        function_definition.frame_size = self._frame_size
+
+    def visit_parameter(self, parameter):
+        self._declare(parameter)
+
+    def visit_block(self, block):
+        self._scopes.append({})
+        handlers = self.handlers
+        for statement in block.statements:
+            handlers[type(statement)](self, statement)
+        self._scopes.pop()
+
+    def visit_declaration(self, declaration):
+        self._check_redeclaration(declaration)
+        self._declare(declaration)
+
+    def visit_assignment(self, assignment):
+        if type(assignment.object) is Declaration:
+            self._check_redeclaration(assignment.object)
+            assignment.expression.accept(self)
+            self._declare(assignment.object)
+            return
+        assignment.expression.accept(self)
+        self._resolve_target(assignment.object, "Undefined variable.", assignment.position)
+
+    def _resolve_operate_and_assign(self, assignment):
+        assignment.expression.accept(self)
+        target = assignment.object.objects[0]
+        self._resolve_target(assignment.object, f"Undefined variable {target.name}", assignment.position)
+
+    def visit_add_and_assign(self, assignment):
+        self._resolve_operate_and_assign(assignment)
+
+    def visit_sub_and_assign(self, assignment):
+        self._resolve_operate_and_assign(assignment)
+
+    def visit_if_statement(self, if_statement):
+        if_statement.condition.accept(self)
+        if_statement.block.accept(self)
+        for condition, block in if_statement.elif_blocks:
+            condition.accept(self)
+            block.accept(self)
+        if if_statement.else_block:
+            if_statement.else_block.accept(self)
+
+    def visit_while_loop_statement(self, while_statement):
+        while_statement.condition.accept(self)
+        while_statement.block.accept(self)
+
+    def visit_for_loop_statement(self, for_statement):
+        for_statement.expression.accept(self)
+        # the loop variable lives in the enclosing scope and replaces a variable of the same name there
+        slot = self._scopes[-1].get(for_statement.loop_identifier)
+        if slot is None:
+            slot = self._new_slot()
+            self._scopes[-1][for_statement.loop_identifier] = slot
+        for_statement.slot = slot
+        for_statement.block.accept(self)
+
+    def visit_return_statement(self, return_statement):
+        if return_statement.expression:
+            return_statement.expression.accept(self)
+
+    def visit_currency_transfer(self, currency_transfer):
+        for expression in currency_transfer.expressions:
+            expression.accept(self)
+
+    def visit_object_access(self, object_access):
+        object_access.objects[0].accept(self)
+        for part in object_access.objects[1:]:
+            if type(part) is FunctionCall:
+                for argument in part.arguments:
+                    argument.accept(self)
+
+    def visit_identifier_expression(self, identifier_expression):
+        identifier_expression.slot = self._lookup(identifier_expression.name)
+        if identifier_expression.slot is None and identifier_expression.name not in self._function_names:
+            raise SemanticError(f"'{identifier_expression.name}' was not declared in this scope",
+                                identifier_expression.position)
+
+    def visit_function_call(self, fun_call):
+        for argument in fun_call.arguments:
+            argument.accept(self)
+
+    def _visit_binary(self, expression):
+        expression.left.accept(self)
+        expression.right.accept(self)
+
+    visit_or_expression = _visit_binary
+    visit_and_expression = _visit_binary
+    visit_less_relation = _visit_binary
+    visit_less_equal_relation = _visit_binary
+    visit_greater_relation = _visit_binary
+    visit_greater_equal_relation = _visit_binary
+    visit_equal_relation = _visit_binary
+    visit_not_equal_relation = _visit_binary
+    visit_add_expression = _visit_binary
+    visit_sub_expression = _visit_binary
+    visit_mul_expression = _visit_binary
+    visit_div_expression = _visit_binary
+
+    def visit_negated_expression(self, negation):
+        negation.right.accept(self)
+
+    def _visit_literal(self, const):
+        ...
+
+    visit_int_const = _visit_literal
+    visit_float_const = _visit_literal
+    visit_cur_const = _visit_literal
+    visit_str_const = _visit_literal
+    visit_bool_const = _visit_literal
+    visit_curtype_const = _visit_literal
+
+    def visit_dict_const(self, dict):
+        for pair in dict.pairs:
+            pair.expression.accept(self)
+
+
+def resolve_program(program, function_names):
+    program.accept(Resolver(function_names))
+
+
+def resolve_function(function, function_names):
+    function.accept(Resolver(function_names))
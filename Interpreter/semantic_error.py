@@ -8,3 +8,15 @@ class SemanticError(Exception):
 
     def __str__(self) -> str:
         return f"SemanticError: {self.position} : {self.message}"
+
+
+def arguments_count_message(expected, got):
+    return f"Wrong amount of arguments, expected {expected}\
+                                , got {got}"
+
+
+INVALID_TARGET_MESSAGE = "Expected a variable on the left side of the assignment."
+
+
+def depth_exceeded_message(max_depth):
+    return f"Maximum recursion depth of {max_depth} calls exceeded"
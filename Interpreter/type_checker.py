@@ -0,0 +1,379 @@
+from Visitor.interface import Visitor
+from Interpreter.semantic_error import SemanticError, arguments_count_message
+from Currency.currency import Currency, Curtype, Dictionary
+from Parse_objects.objects import (
+    Declaration,
+    IdentifierExpression,
+    FunctionCall,
+    ReturnStatement,
+    IfStatement,
+    WhileLoopStatement,
+    ForLoopStatement,
+    DocumentObjectModel
+)
+
+
+NONE_TYPE = type(None)
+
+ARITHMETIC_RESULT_TYPES = {
+    ("+", int, int): int,
+    ("+", float, float): float,
+    ("+", str, str): str,
+    ("+", Currency, Currency): Currency,
+    ("-", int, int): int,
+    ("-", float, float): float,
+    ("-", Currency, Currency): Currency,
+    ("*", int, int): int,
+    ("*", float, float): float,
+    ("*", int, str): str,
+    ("*", str, int): str,
+    ("*", int, Currency): Currency,
+    ("*", float, Currency): Currency,
+    ("*", Currency, int): Currency,
+    ("*", Currency, float): Currency,
+    ("/", float, float): float,
+    ("/", Currency, int): Currency,
+    ("/", Currency, float): Currency
+}
+
+RELATION_TYPES = {
+    **{(symbol, left, right): bool
+       for symbol in ["<", "<=", ">", ">=", "==", "!="]
+       for left in [int, float]
+       for right in [int, float]},
+    **{(symbol, Currency, Currency): bool for symbol in ["<", "<=", ">", ">=", "==", "!="]},
+    **{(symbol, value_type, value_type): bool for symbol in ["==", "!="] for value_type in [str, Curtype, bool]}
+}
+
+NEGATION_RESULT_TYPES = {
+    ("!", bool): bool,
+    ("-", int): int,
+    ("-", float): float,
+    ("-", Currency): Currency
+}
+
+
+def always_returns(statements):
+    for statement in statements:
+        if type(statement) is ReturnStatement:
+            return True
+        if type(statement) is IfStatement and statement.else_block:
+            blocks = [statement.block, *(block for _, block in statement.elif_blocks), statement.else_block]
+            if all(always_returns(block.statements) for block in blocks):
+                return True
+    return False
+
+
+def loop_slots(statements):
+    slots = set()
+    for statement in statements:
+        if type(statement) is ForLoopStatement:
+            slots.add(statement.slot)
+            slots |= loop_slots(statement.block.statements)
+        elif type(statement) is WhileLoopStatement:
+            slots |= loop_slots(statement.block.statements)
+        elif type(statement) is IfStatement:
+            for block in [statement.block, *(block for _, block in statement.elif_blocks)]:
+                slots |= loop_slots(block.statements)
+            if statement.else_block:
+                slots |= loop_slots(statement.else_block.statements)
+    return slots
+
+
+# Runs after the Resolver. Every expression whose value type can be proven gets
+# it as static_type; statements and calls whose checks were proven get their
+# static_type or arguments_checked set, so the engines can skip the runtime checks.
+# A static_type of None means the type is only known at runtime. Errors that are
+# certain are raised with the message and position the runtime check would use.
+class TypeChecker(Visitor):
+    def __init__(self, types_map, builtin_return_types):
+        self._types_map = types_map
+        self._builtin_return_types = builtin_return_types
+        self._functions = {}
+        self._slot_types = {}
+        self._loop_slots = set()
+        self._expected_return_type = None
+        self._calls = 0
+
+    def visit_program(self, program):
+        self._functions = program.functions
+        for function in program.functions.values():
+            if function.block is not None:
+                function.accept(self)
+
+    def _return_type(self, name):
+        if name in self._builtin_return_types:
+            return self._builtin_return_types[name]
+        function = self._functions.get(name)
+        if function.type is DocumentObjectModel.VOID:
+            return NONE_TYPE
+        # the body of a function not parsed yet is unknown, so is its return type
+        if function.block is not None and always_returns(function.block.statements):
+            return self._types_map[function.type]
+        return None
+
+    def visit_function_definition(self, function_definition):
+        self._expected_return_type = self._types_map[function_definition.type]
+        self._slot_types = {}
+        for parameter in function_definition.params:
+            parameter.accept(self)
+        self._loop_slots = loop_slots(function_definition.block.statements)
+        function_definition.block.accept(self)
+
+    def visit_parameter(self, parameter):
+        self._slot_types[parameter.slot] = self._types_map[parameter.type]
+
+    def visit_block(self, block):
+        handlers = self.handlers
+        for statement in block.statements:
+            handlers[type(statement)](self, statement)
+
+    def visit_declaration(self, declaration):
+        ...
+
+    def _variable_type(self, slot):
+        if slot is None or slot in self._loop_slots:
+            return None
+        return self._slot_types.get(slot)
+
+    def visit_assignment(self, assignment):
+        assignment.expression.accept(self)
+        value_type = assignment.expression.static_type
+
+        if type(assignment.object) is Declaration:
+            declaration = assignment.object
+            expected_type = self._types_map[declaration.type]
+            self._slot_types[declaration.slot] = expected_type
+            if value_type is not None:
+                if value_type is not expected_type:
+                    raise SemanticError("Type mismatch.", assignment.position)
+                assignment.static_type = value_type
+            return
+
+        self._check_assignment_target(assignment, value_type)
+
+    def _check_assignment_target(self, assignment, value_type):
+        target = assignment.object.objects[0]
+        if len(assignment.object.objects) != 1 or type(target) is not IdentifierExpression:
+            return
+        variable_type = self._variable_type(target.slot)
+        if value_type is None or variable_type is None:
+            return
+        if value_type is not variable_type:
+            raise SemanticError(f"Type mismatch, {variable_type} - {value_type}", assignment.position)
+        assignment.static_type = value_type
+
+    def visit_add_and_assign(self, assignment):
+        assignment.expression.accept(self)
+        self._check_assignment_target(assignment, assignment.expression.static_type)
+
+    def visit_sub_and_assign(self, assignment):
+        assignment.expression.accept(self)
+        self._check_assignment_target(assignment, assignment.expression.static_type)
+
+    def visit_if_statement(self, if_statement):
+        if_statement.condition.accept(self)
+        if_statement.block.accept(self)
+        for condition, block in if_statement.elif_blocks:
+            condition.accept(self)
+            block.accept(self)
+        if if_statement.else_block:
+            if_statement.else_block.accept(self)
+
+    def visit_while_loop_statement(self, while_statement):
+        while_statement.condition.accept(self)
+        while_statement.block.accept(self)
+
+    def visit_for_loop_statement(self, for_statement):
+        for_statement.expression.accept(self)
+        for_statement.block.accept(self)
+
+    def visit_return_statement(self, return_statement):
+        expected = self._expected_return_type
+        if not return_statement.expression:
+            if expected is not None:
+                raise SemanticError(f"Expected return of a type {expected}", return_statement.position)
+            return
+
+        return_statement.expression.accept(self)
+        value_type = return_statement.expression.static_type
+        if value_type is None:
+            return
+        if value_type is not expected:
+            raise SemanticError(f"Wrong return type, expected {expected}, got {value_type}",
+                                return_statement.position)
+        return_statement.static_type = value_type
+
+    def visit_currency_transfer(self, currency_transfer):
+        for expression in currency_transfer.expressions:
+            expression.accept(self)
+        value_types = [expression.static_type for expression in currency_transfer.expressions]
+        if None in value_types:
+            return
+        if any(value_type is not Currency for value_type in value_types):
+            raise SemanticError("Expected a cur expressions in transfer", currency_transfer.position)
+        currency_transfer.static_type = Currency
+
+    def visit_object_access(self, object_access):
+        first = object_access.objects[0]
+        first.accept(self)
+        for part in object_access.objects[1:]:
+            if type(part) is FunctionCall:
+                for argument in part.arguments:
+                    argument.accept(self)
+        if len(object_access.objects) == 1:
+            object_access.static_type = first.static_type
+
+    def visit_identifier_expression(self, identifier_expression):
+        identifier_expression.static_type = self._variable_type(identifier_expression.slot)
+
+    def visit_function_call(self, fun_call):
+        self._calls += 1
+        calls = self._calls
+        for argument in fun_call.arguments:
+            argument.accept(self)
+
+        if fun_call.name not in self._builtin_return_types and fun_call.name not in self._functions:
+            raise SemanticError(f"Function {fun_call.name} not found", fun_call.position)
+        fun_call.static_type = self._return_type(fun_call.name)
+        if fun_call.name in self._builtin_return_types:
+            return
+
+        function = self._functions[fun_call.name]
+        argument_types = [argument.static_type for argument in fun_call.arguments]
+        parameter_types = [self._types_map[parameter.type] for parameter in function.params]
+        # a call nested in the arguments moves the position the runtime reports errors at
+        nested_call = self._calls != calls
+        if len(argument_types) != len(parameter_types):
+            if not nested_call:
+                raise SemanticError(arguments_count_message(len(parameter_types), len(argument_types)),
+                                    fun_call.position)
+            return
+        for argument_type, parameter_type in zip(argument_types, parameter_types):
+            if argument_type is None:
+                return
+            if argument_type is not parameter_type:
+                if not nested_call:
+                    raise SemanticError("Parameter type mismatch.", fun_call.position)
+                return
+        fun_call.arguments_checked = True
+
+    def _check_bool_operation(self, expression):
+        expression.left.accept(self)
+        expression.right.accept(self)
+        left_type = expression.left.static_type
+        right_type = expression.right.static_type
+        if left_type is bool and right_type is bool:
+            expression.static_type = bool
+        elif left_type is not None and left_type is not bool and right_type is not None:
+            raise SemanticError(f"Wrong type for operation, {left_type} - {right_type}", expression.position)
+
+    def visit_or_expression(self, expression):
+        self._check_bool_operation(expression)
+
+    def visit_and_expression(self, expression):
+        self._check_bool_operation(expression)
+
+    def _check_relation(self, relation, operator):
+        relation.left.accept(self)
+        relation.right.accept(self)
+        left_type = relation.left.static_type
+        right_type = relation.right.static_type
+        if left_type is None or right_type is None:
+            return
+        relation.static_type = RELATION_TYPES.get((operator, left_type, right_type))
+        if relation.static_type is None:
+            raise SemanticError(f"Wrong type for operation, {left_type} - {right_type}", relation.position)
+
+    def visit_less_relation(self, relation):
+        self._check_relation(relation, "<")
+
+    def visit_less_equal_relation(self, relation):
+        self._check_relation(relation, "<=")
+
+    def visit_greater_relation(self, relation):
+        self._check_relation(relation, ">")
+
+    def visit_greater_equal_relation(self, relation):
+        self._check_relation(relation, ">=")
+
+    def visit_equal_relation(self, relation):
+        self._check_relation(relation, "==")
+
+    def visit_not_equal_relation(self, relation):
+        self._check_relation(relation, "!=")
+
+    def visit_negated_expression(self, negation):
+        negation.right.accept(self)
+        value_type = negation.right.static_type
+        if value_type is None:
+            return
+        negation.static_type = NEGATION_RESULT_TYPES.get((negation.left, value_type))
+        if negation.static_type is None:
+            raise SemanticError(f"Wrong type for negation, {value_type}", negation.position)
+
+    def _check_arithmetic(self, expression, operator, message):
+        expression.left.accept(self)
+        expression.right.accept(self)
+        left_type = expression.left.static_type
+        right_type = expression.right.static_type
+        if left_type is None or right_type is None:
+            return
+        expression.static_type = ARITHMETIC_RESULT_TYPES.get((operator, left_type, right_type))
+        if expression.static_type is None:
+            raise SemanticError(message, expression.position)
+
+    def visit_add_expression(self, expression):
+        self._check_arithmetic(expression, "+", "Different types in add operation")
+
+    def visit_sub_expression(self, expression):
+        self._check_arithmetic(expression, "-", "Different types in sub operation")
+
+    def visit_mul_expression(self, expression):
+        self._check_arithmetic(expression, "*", "Different types in multiply operation")
+
+    def visit_div_expression(self, expression):
+        self._check_arithmetic(expression, "/", "Wrong types in divide operation")
+
+    def visit_int_const(self, const):
+        const.static_type = int
+
+    def visit_float_const(self, const):
+        const.static_type = float
+
+    def visit_cur_const(self, const):
+        const.static_type = Currency
+
+    def visit_str_const(self, const):
+        const.static_type = str
+
+    def visit_bool_const(self, const):
+        const.static_type = bool
+
+    def visit_curtype_const(self, const):
+        const.static_type = Curtype
+
+    def visit_dict_const(self, dict):
+        names = set()
+        for pair in dict.pairs:
+            pair.expression.accept(self)
+        for pair in dict.pairs:
+            value_type = pair.expression.static_type
+            if value_type is None:
+                return
+            if value_type is not Currency:
+                raise SemanticError("Expected cur in dict value", dict.position)
+            if pair.name in names:
+                raise SemanticError(f"Multiple account name '{pair.name}' defined", dict.position)
+            names.add(pair.name)
+        dict.static_type = Dictionary
+
+
+def check_program(program, types_map, builtin_return_types):
+    program.accept(TypeChecker(types_map, builtin_return_types))
+
+
+def check_function(functions, function, types_map, builtin_return_types):
+    checker = TypeChecker(types_map, builtin_return_types)
+    checker._functions = functions
+    function.accept(checker)
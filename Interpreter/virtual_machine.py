@@ -0,0 +1,384 @@
+import math
+
+from Visitor.interface import Visitor
+from Visitor.interpreter_visitor import BUILTINS_LIST
+from Interpreter.reference import Reference
+from Interpreter.calculations import Calculations, ARITHMETIC_KERNELS, RELATION_KERNELS, NEGATION_KERNELS
+from Interpreter.semantic_error import (SemanticError, arguments_count_message, depth_exceeded_message,
+                                        INVALID_TARGET_MESSAGE)
+from Interpreter.bytecode import (
+    Opcode,
+    BytecodeCompiler,
+    ARITHMETIC_OPERATORS,
+    RELATION_OPERATORS,
+    NEGATION_OPERATORS
+)
+from Currency.currency import Currency, Dictionary
+from Currency.registry import to_registry
+from Interpreter.analysis import analyse_program
+
+
+LOAD_CONST = Opcode.LOAD_CONST.value
+LOAD_CURRENCY = Opcode.LOAD_CURRENCY.value
+LOAD_FAST = Opcode.LOAD_FAST.value
+LOAD_FAST_REFERENCE = Opcode.LOAD_FAST_REFERENCE.value
+LOAD_GLOBAL = Opcode.LOAD_GLOBAL.value
+LOAD_GLOBAL_REFERENCE = Opcode.LOAD_GLOBAL_REFERENCE.value
+MAKE_REFERENCE = Opcode.MAKE_REFERENCE.value
+DECLARE = Opcode.DECLARE.value
+DECLARE_STORE = Opcode.DECLARE_STORE.value
+STORE_FAST = Opcode.STORE_FAST.value
+INPLACE_ADD = Opcode.INPLACE_ADD.value
+INPLACE_SUBTRACT = Opcode.INPLACE_SUBTRACT.value
+INVALID_TARGET = Opcode.INVALID_TARGET.value
+POP_TOP = Opcode.POP_TOP.value
+BINARY = Opcode.BINARY.value
+COMPARE = Opcode.COMPARE.value
+NEGATE = Opcode.NEGATE.value
+JUMP_IF_TRUE_OR_KEEP = Opcode.JUMP_IF_TRUE_OR_KEEP.value
+JUMP_IF_FALSE_OR_KEEP = Opcode.JUMP_IF_FALSE_OR_KEEP.value
+BOOL_OR = Opcode.BOOL_OR.value
+BOOL_AND = Opcode.BOOL_AND.value
+JUMP = Opcode.JUMP.value
+POP_JUMP_IF_FALSE = Opcode.POP_JUMP_IF_FALSE.value
+GET_ITERATOR = Opcode.GET_ITERATOR.value
+FOR_ITERATOR = Opcode.FOR_ITERATOR.value
+STORE_LOOP_VARIABLE = Opcode.STORE_LOOP_VARIABLE.value
+MARK_CALL = Opcode.MARK_CALL.value
+CALL = Opcode.CALL.value
+GET_ATTRIBUTE = Opcode.GET_ATTRIBUTE.value
+CALL_METHOD = Opcode.CALL_METHOD.value
+BUILD_DICT = Opcode.BUILD_DICT.value
+STORE_ACCOUNT = Opcode.STORE_ACCOUNT.value
+TRANSFER = Opcode.TRANSFER.value
+RETURN_VALUE = Opcode.RETURN_VALUE.value
+RETURN_NONE = Opcode.RETURN_NONE.value
+RETURN_END = Opcode.RETURN_END.value
+
+
+class Frame:
+    __slots__ = ("code_object", "instruction", "stack", "variables")
+
+    def __init__(self, code_object):
+        self.code_object = code_object
+        self.instruction = 0
+        self.stack = []
+        self.variables = [None] * len(code_object.variables)
+
+
+class BuiltInCode:
+    __slots__ = ("name", "function")
+
+    def __init__(self, name, function):
+        self.name = name
+        self.function = function
+
+
+# Runs the bytecode of Interpreter.bytecode. Bingo calls push a Frame on an explicit
+# list instead of recursing, so a single dispatch loop executes the whole program
+# and the depth of Bingo recursion is bounded only by max_depth and memory.
+class VirtualMachine(Visitor):
+    def __init__(self, exchange_rates, max_depth=None):
+        self._max_depth = max_depth
+        self._currencies = to_registry(exchange_rates)
+        self._calculations = Calculations(self._currencies)
+        self._functions = {}
+        self._call_position = None
+
+    def visit_program(self, program):
+        analyse_program(program)
+        self.run(BytecodeCompiler(self._currencies).compile_program(program))
+
+    def run(self, compiled_program):
+        self._functions = dict(compiled_program.functions)
+        for name, function in BUILTINS_LIST:
+            self._functions[name] = BuiltInCode(name, function)
+
+        main_function = self._functions.get('main')
+        if not main_function:
+            raise SemanticError("Missing main function.", compiled_program.position)
+        if type(main_function) is BuiltInCode or main_function.return_type is not None:
+            raise SemanticError("Main function has to be void type", compiled_program.position)
+
+        return self._execute(main_function)
+
+    def _call_builtin(self, builtin, arguments):
+        try:
+            return builtin.function(*[argument.value for argument in arguments] if len(arguments) else " ")
+        except Exception as e:
+            raise SemanticError(e.args[0], self._call_position)
+
+    def _enter_function(self, code_object, arguments, checked):
+        if not checked:
+            if len(arguments) != len(code_object.params):
+                raise SemanticError(arguments_count_message(len(code_object.params), len(arguments)),
+                                    self._call_position)
+            for argument, (slot, parameter_type) in zip(arguments, code_object.params):
+                if type(argument.value) is not parameter_type:
+                    raise SemanticError("Parameter type mismatch.", self._call_position)
+        frame = Frame(code_object)
+        variables = frame.variables
+        for argument, (slot, parameter_type) in zip(arguments, code_object.params):
+            variables[slot] = argument
+        return frame
+
+    def _load_function(self, name, position):
+        function = self._functions.get(name)
+        if function is None:
+            raise SemanticError(f"'{name}' was not declared in this scope", position)
+        return Reference(function)
+
+    def _execute(self, main_function):
+        calculations = self._calculations
+        add_currency = ARITHMETIC_KERNELS[("+", Currency, Currency)]
+        sub_currency = ARITHMETIC_KERNELS[("-", Currency, Currency)]
+        callers = []
+        # main is the first active frame, like in the other engines
+        max_callers = math.inf if self._max_depth is None else self._max_depth - 1
+        if max_callers < 0:
+            raise SemanticError(depth_exceeded_message(self._max_depth), None)
+
+        frame = Frame(main_function)
+        code_object = frame.code_object
+        code = code_object.code
+        constants = code_object.constants
+        names = code_object.names
+        stack = frame.stack
+        variables = frame.variables
+        instruction = 0
+
+        while True:
+            opcode = code[instruction]
+            argument = code[instruction + 1]
+            instruction += 2
+
+            if opcode == LOAD_FAST:
+                variable = variables[argument]
+                if variable is None:
+                    variable = self._load_function(code_object.variables[argument],
+                                                   code_object.positions[(instruction >> 1) - 1])
+                stack.append(variable.value)
+
+            elif opcode == LOAD_CONST:
+                stack.append(constants[argument])
+
+            elif opcode == BINARY:
+                right = stack.pop()
+                left = stack[-1]
+                operator, message = ARITHMETIC_OPERATORS[argument]
+                kernel = ARITHMETIC_KERNELS.get((operator, type(left), type(right)))
+                if kernel is None:
+                    raise SemanticError(message, code_object.positions[(instruction >> 1) - 1])
+                stack[-1] = kernel(calculations, left, right)
+
+            elif opcode == COMPARE:
+                right = stack.pop()
+                left = stack[-1]
+                kernel = RELATION_KERNELS.get((RELATION_OPERATORS[argument], type(left), type(right)))
+                if kernel is None:
+                    raise SemanticError(f"Wrong type for operation, {type(left)} - {type(right)}",
+                                        code_object.positions[(instruction >> 1) - 1])
+                stack[-1] = kernel(calculations, left, right)
+
+            elif opcode == POP_JUMP_IF_FALSE:
+                if not stack.pop():
+                    instruction = 2 * argument
+
+            elif opcode == JUMP:
+                instruction = 2 * argument
+
+            elif opcode == STORE_FAST or opcode == INPLACE_ADD or opcode == INPLACE_SUBTRACT:
+                value = stack.pop()
+                old_value = variables[argument]
+                if old_value is None:
+                    message = "Undefined variable." if opcode == STORE_FAST \
+                        else f"Undefined variable {code_object.variables[argument]}"
+                    raise SemanticError(message, code_object.positions[(instruction >> 1) - 1])
+                if type(value) is not type(old_value.value):
+                    raise SemanticError(f"Type mismatch, {type(old_value.value)} - {type(value)}",
+                                        code_object.positions[(instruction >> 1) - 1])
+                if opcode == STORE_FAST:
+                    old_value.value = value
+                elif opcode == INPLACE_ADD:
+                    old_value.value += value
+                else:
+                    old_value.value -= value
+
+            elif opcode == DECLARE:
+                variables[argument] = None
+
+            elif opcode == DECLARE_STORE:
+                value = stack.pop()
+                slot, expected_type = constants[argument]
+                if type(value) is not expected_type:
+                    raise SemanticError("Type mismatch.", code_object.positions[(instruction >> 1) - 1])
+                variables[slot] = Reference(value)
+
+            elif opcode == MARK_CALL:
+                self._call_position = code_object.positions[(instruction >> 1) - 1]
+
+            elif opcode == LOAD_FAST_REFERENCE:
+                variable = variables[argument]
+                if variable is None:
+                    variable = self._load_function(code_object.variables[argument],
+                                                   code_object.positions[(instruction >> 1) - 1])
+                stack.append(variable)
+
+            elif opcode == LOAD_GLOBAL or opcode == LOAD_GLOBAL_REFERENCE:
+                variable = self._load_function(names[argument], code_object.positions[(instruction >> 1) - 1])
+                stack.append(variable.value if opcode == LOAD_GLOBAL else variable)
+
+            elif opcode == MAKE_REFERENCE:
+                stack[-1] = Reference(stack[-1])
+
+            elif opcode == CALL:
+                name, count, checked = constants[argument]
+                if count:
+                    arguments = stack[-count:]
+                    del stack[-count:]
+                else:
+                    arguments = []
+                function = self._functions.get(name)
+                if function is None:
+                    raise SemanticError(f"Function {name} not found", code_object.positions[(instruction >> 1) - 1])
+                if type(function) is BuiltInCode:
+                    stack.append(self._call_builtin(function, arguments))
+                    continue
+
+                if len(callers) >= max_callers:
+                    raise SemanticError(depth_exceeded_message(self._max_depth),
+                                        code_object.positions[(instruction >> 1) - 1])
+                frame.instruction = instruction
+                callers.append(frame)
+                frame = self._enter_function(function, arguments, checked)
+                code_object = frame.code_object
+                code = code_object.code
+                constants = code_object.constants
+                names = code_object.names
+                stack = frame.stack
+                variables = frame.variables
+                instruction = 0
+
+            elif opcode == RETURN_VALUE or opcode == RETURN_NONE or opcode == RETURN_END:
+                expected = code_object.return_type
+                if opcode == RETURN_VALUE:
+                    value = stack.pop()
+                    if type(value) is not expected:
+                        raise SemanticError(f"Wrong return type, expected {expected}, got {type(value)}",
+                                            code_object.positions[(instruction >> 1) - 1])
+                else:
+                    value = None
+                    if opcode == RETURN_NONE and expected is not None:
+                        raise SemanticError(f"Expected return of a type {expected}",
+                                            code_object.positions[(instruction >> 1) - 1])
+
+                if not callers:
+                    return value
+                frame = callers.pop()
+                code_object = frame.code_object
+                code = code_object.code
+                constants = code_object.constants
+                names = code_object.names
+                stack = frame.stack
+                variables = frame.variables
+                instruction = frame.instruction
+                stack.append(value)
+
+            elif opcode == POP_TOP:
+                stack.pop()
+
+            elif opcode == LOAD_CURRENCY:
+                value, curtype = constants[argument]
+                stack.append(Currency(value, curtype))
+
+            elif opcode == JUMP_IF_TRUE_OR_KEEP:
+                if stack[-1] is True:
+                    instruction = 2 * argument
+
+            elif opcode == JUMP_IF_FALSE_OR_KEEP:
+                if stack[-1] is False:
+                    instruction = 2 * argument
+
+            elif opcode == BOOL_OR or opcode == BOOL_AND:
+                right = stack.pop()
+                left = stack[-1]
+                if type(left) is not bool or type(right) is not bool:
+                    raise SemanticError(f"Wrong type for operation, {type(left)} - {type(right)}",
+                                        code_object.positions[(instruction >> 1) - 1])
+                stack[-1] = (left or right) if opcode == BOOL_OR else (left and right)
+
+            elif opcode == NEGATE:
+                value = stack[-1]
+                kernel = NEGATION_KERNELS.get((NEGATION_OPERATORS[argument], type(value)))
+                if kernel is None:
+                    raise SemanticError(f"Wrong type for negation, {type(value)}",
+                                        code_object.positions[(instruction >> 1) - 1])
+                stack[-1] = kernel(value)
+
+            elif opcode == GET_ITERATOR:
+                stack[-1] = iter(stack[-1])
+
+            elif opcode == FOR_ITERATOR:
+                element = next(stack[-1], stack)
+                if element is stack:
+                    stack.pop()
+                    instruction = 2 * argument
+                else:
+                    stack.append(element)
+
+            elif opcode == STORE_LOOP_VARIABLE:
+                element = stack.pop()
+                variables[argument] = element if isinstance(element, Reference) else Reference(element)
+
+            elif opcode == GET_ATTRIBUTE:
+                stack[-1] = getattr(stack[-1], names[argument])
+
+            elif opcode == CALL_METHOD:
+                name, count, target = constants[argument]
+                if count:
+                    arguments = stack[-count:]
+                    del stack[-count:]
+                else:
+                    arguments = []
+                ret = getattr(stack[-1], name)(*arguments)
+                if ret:
+                    stack[-1] = ret
+                    instruction = 2 * target
+
+            elif opcode == BUILD_DICT:
+                stack.append(Dictionary({}))
+
+            elif opcode == STORE_ACCOUNT:
+                value = stack.pop()
+                name = names[argument]
+                storage = stack[-1].storage
+                if type(value) is not Currency:
+                    raise SemanticError("Expected cur in dict value", code_object.positions[(instruction >> 1) - 1])
+                if storage.get(name):
+                    raise SemanticError(f"Multiple account name '{name}' defined",
+                                        code_object.positions[(instruction >> 1) - 1])
+                storage[name] = value
+
+            elif opcode == TRANSFER:
+                references = stack[-argument:]
+                del stack[-argument:]
+                for reference in references:
+                    if type(reference.value) is not Currency:
+                        raise SemanticError("Expected a cur expressions in transfer",
+                                            code_object.positions[(instruction >> 1) - 1])
+                if argument == 3:
+                    source, amount, target = references
+                    source.value = sub_currency(calculations, source.value, amount.value)
+                    target.value = add_currency(calculations, target.value, amount.value)
+                else:
+                    source, target = references
+                    new_target = add_currency(calculations, target.value, source.value)
+                    new_source = sub_currency(calculations, source.value, target.value)
+                    target.value = new_target
+                    source.value = new_source
+
+            elif opcode == INVALID_TARGET:
+                raise SemanticError(INVALID_TARGET_MESSAGE, code_object.positions[(instruction >> 1) - 1])
+
+            else:
+                raise RuntimeError(f"Unknown opcode {opcode}")
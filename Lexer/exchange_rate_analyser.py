@@ -1,7 +1,10 @@
+import os
+
 from Lexer.lexer import Lexer
 from Lexer.lexer_error import LexerError
 from Token.token_type import TokenType
 from Source.source import SourceReader
+from Currency.registry import CurrencyRegistry
 
 
 class ExchangeRateAnalyser:
@@ -50,17 +53,36 @@ class ExchangeRateAnalyser:
         return exchange_rate
 
 
-def get_currency_types(file_path):
-    with open(file_path, "r") as file:
+_loaded_rates = {}
+
+
+def load_exchange_rates(file_path):
+    path = os.path.realpath(file_path)
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+
+    cached = _loaded_rates.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    with open(path, "r") as file:
         source = SourceReader(file)
-        lexer = Lexer(source)
+        lexer = Lexer(source, table_driven=True)
         analyser = ExchangeRateAnalyser(lexer)
-        return analyser.get_currency_types()
+        currencies = CurrencyRegistry(analyser.get_exchange_rates())
+
+    _loaded_rates[path] = (key, currencies)
+    return currencies
+
+
+def clear_exchange_rates_cache():
+    _loaded_rates.clear()
+
+
+def get_currency_types(file_path):
+    return list(load_exchange_rates(file_path))
 
 
 def get_exchange_rates(file_path):
-    with open(file_path, "r") as file:
-        source = SourceReader(file)
-        lexer = Lexer(source)
-        analyser = ExchangeRateAnalyser(lexer)
-        return analyser.get_exchange_rates()
+    currencies = load_exchange_rates(file_path)
+    return {name: currencies.get_rate(currencies.get_id(name)) for name in currencies}
@@ -1,4 +1,6 @@
-from typing import Optional
+import string
+import sys
+from typing import Optional, Union
 
 from Lexer.interface import Lexer
 from Source.source import SourceReader
@@ -6,15 +8,19 @@ from Source.source_position import SourcePosition
 from Token.token import Token
 from Token.token_type import TokenType
 from Lexer.lexer_error import LexerError
+from Currency.registry import CurrencyRegistry, to_registry
 
 
 class Lexer(Lexer):
-    def __init__(self, source: SourceReader, currency_names: list = None, identifier_max_len=80,
-                 str_max_len=120, int_max_len=15, float_max_len=30):
+    def __init__(self, source: SourceReader, currency_names: Union[list, CurrencyRegistry] = None,
+                 identifier_max_len=80, str_max_len=120, int_max_len=15, float_max_len=30, table_driven=False,
+                 skip_comments=False):
         self._source = source
-        if currency_names is None:
-            currency_names = []
-        self._currencies = currency_names
+        self._table_driven = table_driven
+        # comments are skipped like whitespace instead of being returned as COMMENT tokens
+        self._skip_comments = skip_comments
+        self._slicing = hasattr(source, "get_slice")
+        self._currencies = to_registry(currency_names)
         self._identifier_max_len = identifier_max_len
         self._str_max_len = str_max_len
         self._int_max_len = int_max_len
@@ -90,6 +96,10 @@ class Lexer(Lexer):
     def get_next_token(self):
         self._skip_whitespace()
 
+        if self._table_driven:
+            if (handler := self.first_char_handlers.get(self._get_char())) is not None:
+                return handler(self)
+
         token = self._try_build_eof() \
             or self._try_build_comment() \
             or self._try_build_number() \
@@ -105,7 +115,16 @@ class Lexer(Lexer):
     def _skip_whitespace(self):
         char = self._get_char()
 
-        while char.isspace():
+        while char.isspace() or char == "#" and self._skip_comments:
+            if char == "#":
+                self._skip_comment()
+            else:
+                self._next_char()
+            char = self._get_char()
+
+    def _skip_comment(self):
+        char = self._get_char()
+        while char != "\n" and char != chr(3):
             self._next_char()
             char = self._get_char()
 
@@ -133,32 +152,38 @@ class Lexer(Lexer):
 
     def _try_build_one_or_more_char_token(self) -> Optional[Token]:
         char = self._get_char()
-        position = self._get_position()
 
         if token_type := self.single_char_tokens.get(char):
+            position = self._get_position()
             self._next_char()
             return Token(token_type, "", position)
 
         elif token_type := self.possible_double_char_tokens.get(char):
+            position = self._get_position()
             self._next_char()
             second_char = self._get_char()
 
-            token = Token(self.double_char_tokens.get(char + second_char, token_type), "", position)
-
-            if token.type in self.double_char_tokens.values():
+            if double_char_type := self.double_char_tokens.get(char + second_char):
                 self._next_char()
+                return Token(double_char_type, "", position)
 
-            return token
+            return Token(token_type, "", position)
 
         else:
             return None
 
+    def _build_single_char_token(self) -> Token:
+        position = self._get_position()
+        token_type = self.single_char_tokens[self._get_char()]
+        self._next_char()
+        return Token(token_type, "", position)
+
     def _try_build_double_char_token(self) -> Optional[Token]:
         char = self._get_char()
-        position = self._get_position()
 
         for operator in self.double_char_tokens_only:
             if char == operator[0]:
+                position = self._get_position()
                 self._next_char()
                 second_char = self._get_char()
                 if second_char == operator[1]:
@@ -175,23 +200,36 @@ class Lexer(Lexer):
         if not char.isalpha():
             return None
 
-        result_list = []
         position = self._get_position()
+        result = self._read_identifier(char, position)
 
+        if result in self.keywords:
+            return Token(self.keywords[result], "", position)
+        elif result.upper() in self._currencies:
+            return Token(TokenType.CURTYPE_CONST, result.upper(), position)
+        else:
+            return Token(TokenType.IDENTIFIER, sys.intern(result), position)
+
+    def _read_identifier(self, char, position):
+        if self._slicing:
+            start = self._source.get_offset()
+            length = 0
+            while char.isalpha() or char.isdecimal() or char == "_":
+                if length == self._identifier_max_len:
+                    raise LexerError("Too many characters in identifier", position)
+                length += 1
+                self._next_char()
+                char = self._get_char()
+            return self._source.get_slice(start, self._source.get_offset())
+
+        result_list = []
         while char.isalpha() or char.isdecimal() or char == "_":
             if len(result_list) == self._identifier_max_len:
                 raise LexerError("Too many characters in identifier", position)
             result_list.append(char)
             self._next_char()
             char = self._get_char()
-
-        result = "".join(result_list)
-        if result in self.keywords:
-            return Token(self.keywords[result], "", position)
-        elif result.upper() in self._currencies:
-            return Token(TokenType.CURTYPE_CONST, result.upper(), position)
-        else:
-            return Token(TokenType.IDENTIFIER, result, position)
+        return "".join(result_list)
 
     def _try_build_string(self) -> Optional[Token]:
         char = self._get_char()
@@ -199,27 +237,37 @@ class Lexer(Lexer):
         if char != '"':
             return None
 
-        result = []
         position = self._get_position()
 
         self._next_char()
         char = self._get_char()
 
+        # slicing sources return the literal without copying it char by char,
+        # unless an escape sequence forces building the value
+        start = self._source.get_offset() if self._slicing else None
+        result = None if self._slicing else []
+        length = 0
+
         while char != '"':
             if char == chr(3):
                 raise LexerError("Can't match a token, unterminated string", position)
             if char == "\n":
                 raise LexerError("Can't match a token, multiline string", position)
+            if char == "\\" and result is None:
+                result = list(self._source.get_slice(start, self._source.get_offset()))
             char_to_append = self._handle_escape(char)
-            if len(result) == self._str_max_len:
+            if length == self._str_max_len:
                 raise LexerError("Max string length exceeded", position)
 
-            result.append(char_to_append)
+            length += 1
+            if result is not None:
+                result.append(char_to_append)
             self._next_char()
             char = self._get_char()
 
+        value = "".join(result) if result is not None else self._source.get_slice(start, self._source.get_offset())
         self._next_char()
-        return Token(TokenType.STR_CONST, "".join(result), position)
+        return Token(TokenType.STR_CONST, value, position)
 
     def _try_build_number(self) -> Optional[Token]:
         char = self._get_char()
@@ -290,6 +338,19 @@ class Lexer(Lexer):
         char = self._get_char()
         return self.escape_characters.get(char, "\\" + char)
 
+    # first character -> builder, used by the table driven scanner; characters
+    # missing here (e.g. non-ASCII letters and digits) fall back to probing
+    first_char_handlers = {
+        chr(3): _try_build_eof,
+        "#": _try_build_comment,
+        '"': _try_build_string,
+        **dict.fromkeys(string.digits, _try_build_number),
+        **dict.fromkeys(single_char_tokens, _build_single_char_token),
+        **dict.fromkeys(possible_double_char_tokens, _try_build_one_or_more_char_token),
+        **dict.fromkeys("&|", _try_build_double_char_token),
+        **dict.fromkeys(string.ascii_letters, _try_build_identifier_or_keyword_or_curtype_const)
+    }
+
 
 def generate_token(lexer: Lexer):
     while (new_token := lexer.get_next_token()).type != TokenType.END_OF_FILE:
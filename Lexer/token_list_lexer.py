@@ -0,0 +1,13 @@
+from Lexer.interface import Lexer
+from Token.token import Token
+from Token.token_type import TokenType
+
+
+# Replays tokens read earlier, followed by END_OF_FILE at the position of the last one.
+class TokenListLexer(Lexer):
+    def __init__(self, tokens):
+        self._tokens = iter(tokens)
+        self._end = Token(TokenType.END_OF_FILE, "", tokens[-1].position if tokens else None)
+
+    def get_next_token(self):
+        return next(self._tokens, self._end)
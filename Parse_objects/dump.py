@@ -0,0 +1,43 @@
+from dataclasses import fields
+from enum import Enum
+
+from Parse_objects.objects import Node
+
+
+def _is_node_list(value):
+    return isinstance(value, (list, tuple)) and any(isinstance(item, (Node, list, tuple)) for item in value)
+
+
+def _dump(value, indent, lines, label=""):
+    prefix = "  " * indent + (f"{label}: " if label else "")
+    if isinstance(value, (list, tuple)):
+        lines.append(f"{prefix}[{len(value)}]")
+        for item in value:
+            _dump(item, indent + 1, lines)
+        return
+
+    attributes = []
+    children = []
+    for node_field in fields(value):
+        # position and the analysis annotations are not part of the tree shape
+        if node_field.name == "position" or not node_field.compare:
+            continue
+        field_value = getattr(value, node_field.name)
+        if isinstance(field_value, Node) or _is_node_list(field_value):
+            children.append((node_field.name, field_value))
+        elif isinstance(field_value, Enum):
+            attributes.append(f"{node_field.name}={field_value.name}")
+        elif isinstance(field_value, dict):
+            children.extend((name, item) for name, item in field_value.items())
+        elif field_value is not None and not callable(field_value):
+            attributes.append(f"{node_field.name}={field_value!r}")
+
+    lines.append(f"{prefix}{type(value).__name__} {' '.join(attributes)}".rstrip())
+    for name, child in children:
+        _dump(child, indent + 1, lines, name)
+
+
+def dump_tree(node: Node) -> str:
+    lines = []
+    _dump(node, 0, lines)
+    return "\n".join(lines)
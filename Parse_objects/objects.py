@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Dict, Optional, Union, Tuple, Callable
 from typing_extensions import Self
 from enum import Enum, auto
@@ -18,243 +18,278 @@ class DocumentObjectModel(Enum):
     VOID = auto()
 
 
-@dataclass
+@dataclass(slots=True)
 class Node:
     position: SourcePosition
+    static_type: Optional[type] = field(default=None, compare=False, kw_only=True)
 
+    # A pickled node holds the raw slot values, so its position stays packed.
+    def __getstate__(self):
+        return tuple([slot.__get__(self) for slot in _node_slots(type(self))])
 
-@dataclass
+    def __setstate__(self, state):
+        for slot, value in zip(_node_slots(type(self)), state):
+            slot.__set__(self, value)
+
+
+# The position slot holds the packed int of SourcePosition.pack(); reading
+# node.position unpacks it, so nodes do not keep a position object each.
+def _packed_position(slot):
+    return property(lambda node: SourcePosition.unpack(slot.__get__(node)),
+                    lambda node, position: slot.__set__(node, position and position.pack()))
+
+
+_position_slot = Node.position
+Node.position = _packed_position(_position_slot)
+_slot_descriptors = {}
+
+
+def _node_slots(node_class):
+    slots = _slot_descriptors.get(node_class)
+    if slots is None:
+        slots = [vars(base)[name] for base in reversed(node_class.__mro__) for name in vars(base).get("__slots__", ())]
+        slots = [_position_slot if slot is Node.position else slot for slot in slots]
+        _slot_descriptors[node_class] = slots
+    return slots
+
+
+@dataclass(slots=True)
 class Expression(Node):
     left: Self
     right: Self
 
     def accept(self, visitor):
-        visitor.visit_expression(self)
+        return visitor.visit_expression(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class OrExpression(Expression):
     def accept(self, visitor):
-        visitor.visit_or_expression(self)
+        return visitor.visit_or_expression(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class AndExpression(Expression):
     def accept(self, visitor):
-        visitor.visit_and_expression(self)
+        return visitor.visit_and_expression(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class LessRelation(Expression):
     def accept(self, visitor):
-        visitor.visit_less_relation(self)
+        return visitor.visit_less_relation(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class LessEqualRelation(Expression):
     def accept(self, visitor):
-        visitor.visit_less_equal_relation(self)
+        return visitor.visit_less_equal_relation(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class GreaterRelation(Expression):
     def accept(self, visitor):
-        visitor.visit_greater_relation(self)
+        return visitor.visit_greater_relation(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class GreaterEqualRelation(Expression):
     def accept(self, visitor):
-        visitor.visit_greater_equal_relation(self)
+        return visitor.visit_greater_equal_relation(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class EqualRelation(Expression):
     def accept(self, visitor):
-        visitor.visit_equal_relation(self)
+        return visitor.visit_equal_relation(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class NotEqualRelation(Expression):
     def accept(self, visitor):
-        visitor.visit_not_equal_relation(self)
+        return visitor.visit_not_equal_relation(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class NegatedExpression(Expression):
     def accept(self, visitor):
-        visitor.visit_negated_expression(self)
+        return visitor.visit_negated_expression(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class AddExpression(Expression):
     def accept(self, visitor):
-        visitor.visit_add_expression(self)
+        return visitor.visit_add_expression(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class SubExpression(Expression):
     def accept(self, visitor):
-        visitor.visit_sub_expression(self)
+        return visitor.visit_sub_expression(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class MulExpression(Expression):
     def accept(self, visitor):
-        visitor.visit_mul_expression(self)
+        return visitor.visit_mul_expression(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class DivExpression(Expression):
     def accept(self, visitor):
-        visitor.visit_div_expression(self)
+        return visitor.visit_div_expression(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class Literal(Node):
     ...
 
 
-@dataclass
+@dataclass(slots=True)
 class IntConst(Literal):
     value: int
 
     def accept(self, visitor):
-        visitor.visit_int_const(self)
+        return visitor.visit_int_const(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class FloatConst(Literal):
     value: float
 
     def accept(self, visitor):
-        visitor.visit_float_const(self)
+        return visitor.visit_float_const(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class CurConst(Literal):
     value: Union[int, float]
     type: str
+    currency_id: Optional[int] = field(default=None, compare=False)
 
     def accept(self, visitor):
-        visitor.visit_cur_const(self)
+        return visitor.visit_cur_const(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class StrConst(Literal):
     value: str
 
     def accept(self, visitor):
-        visitor.visit_str_const(self)
+        return visitor.visit_str_const(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class BoolConst(Literal):
     value: bool
 
     def accept(self, visitor):
-        visitor.visit_bool_const(self)
+        return visitor.visit_bool_const(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class CurtypeConst(Literal):
     value: str
+    currency_id: Optional[int] = field(default=None, compare=False)
 
     def accept(self, visitor):
-        visitor.visit_curtype_const(self)
+        return visitor.visit_curtype_const(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class Pair(Node):
     name: str
     expression: Expression
 
     def accept(self, visitor):
-        visitor.visit_pair(self)
+        return visitor.visit_pair(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class DictConst(Literal):
     pairs: List[Pair]
 
     def accept(self, visitor):
-        visitor.visit_dict_const(self)
+        return visitor.visit_dict_const(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class IdentifierExpression(Node):
     name: str
+    slot: Optional[int] = field(default=None, compare=False, kw_only=True)
 
     def accept(self, visitor):
-        visitor.visit_identifier_expression(self)
+        return visitor.visit_identifier_expression(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class FunctionCall(IdentifierExpression):
     arguments: List[Expression]
+    arguments_checked: bool = field(default=False, compare=False, kw_only=True)
 
     def accept(self, visitor):
-        visitor.visit_function_call(self)
+        return visitor.visit_function_call(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class Statement(Node):
     ...
 
 
-@dataclass
+@dataclass(slots=True)
 class Block(Node):
     statements: List[Statement]
 
     def accept(self, visitor):
-        visitor.visit_block(self)
+        return visitor.visit_block(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class ObjectAccess(Statement):
     objects: List[Union[IdentifierExpression, FunctionCall]]
 
     def accept(self, visitor):
-        visitor.visit_object_access(self)
+        return visitor.visit_object_access(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class Declaration(Statement):
     type: DocumentObjectModel
     name: str
+    slot: Optional[int] = field(default=None, compare=False)
 
     def accept(self, visitor):
-        visitor.visit_declaration(self)
+        return visitor.visit_declaration(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class Assignment(Statement):
     object: Union[ObjectAccess, Declaration]
     expression: Expression
 
     def accept(self, visitor):
-        visitor.visit_assignment(self)
+        return visitor.visit_assignment(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class AddAndAssign(Statement):
     object: ObjectAccess
     expression: Expression
 
     def accept(self, visitor):
-        visitor.visit_add_and_assign(self)
+        return visitor.visit_add_and_assign(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class SubAndAssign(Statement):
     object: ObjectAccess
     expression: Expression
 
     def accept(self, visitor):
-        visitor.visit_sub_and_assign(self)
+        return visitor.visit_sub_and_assign(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class IfStatement(Statement):
     condition: Expression
     block: Block
@@ -262,79 +297,85 @@ class IfStatement(Statement):
     else_block: Optional[Block] = None
 
     def accept(self, visitor):
-        visitor.visit_if_statement(self)
+        return visitor.visit_if_statement(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class WhileLoopStatement(Statement):
     condition: Expression
     block: Block
 
     def accept(self, visitor):
-        visitor.visit_while_loop_statement(self)
+        return visitor.visit_while_loop_statement(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class ForLoopStatement(Statement):
     loop_identifier: str
     expression: Expression
     block: Block
+    slot: Optional[int] = field(default=None, compare=False)
 
     def accept(self, visitor):
-        visitor.visit_for_loop_statement(self)
+        return visitor.visit_for_loop_statement(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class ReturnStatement(Statement):
     expression: Expression
 
     def accept(self, visitor):
-        visitor.visit_return_statement(self)
+        return visitor.visit_return_statement(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class CurrencyTransfer(Statement):
     expressions: List[Expression]
 
     def accept(self, visitor):
-        visitor.visit_currency_transfer(self)
+        return visitor.visit_currency_transfer(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class BuiltInFunction(Node):
     name: str
     function: Callable
 
     def accept(self, visitor):
-        visitor.visit_external_function(self)
+        return visitor.visit_external_function(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class Parameter(Node):
     name: str
     type: DocumentObjectModel
+    slot: Optional[int] = field(default=None, compare=False)
 
     def accept(self, visitor):
-        visitor.visit_parameter(self)
+        return visitor.visit_parameter(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class FunctionDefinition(Node):
     name: str
     type: DocumentObjectModel
     params: List[Parameter]
-    block: Block
+    block: Optional[Block]
+    frame_size: int = field(default=0, compare=False)
+    body_tokens: Optional[list] = field(default=None, compare=False, repr=False, kw_only=True)
 
     def accept(self, visitor):
-        visitor.visit_function_definition(self)
+        return visitor.visit_function_definition(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class Program(Node):
     functions: Dict[str, FunctionDefinition]
+    # set by analyse_program(), which the optimizer and every engine call
+    analysed: bool = field(default=False, compare=False, repr=False, kw_only=True)
 
     def accept(self, visitor):
-        visitor.visit_program(self)
+        return visitor.visit_program(self)
 
 
 TYPES_MAPPING = {
@@ -0,0 +1,58 @@
+import hashlib
+import os
+import pickle
+import sys
+
+from Parse_objects.objects import Program
+
+
+# Bumped whenever the node classes or the trees built by the parser and the
+# optimizer change, so programs cached by an older interpreter are not reused.
+VERSION = 2
+
+CACHE_DIRECTORY = "__bngcache__"
+
+
+def cache_key(source: bytes, currencies, optimized: bool) -> str:
+    digest = hashlib.sha256(source)
+    # currency ids in the tree follow the order of the registry and folded
+    # currency constants depend on the rates, so both are part of the key
+    rates = [(name, currencies.get_rate(currencies.get_id(name))) for name in currencies]
+    digest.update(repr((rates, optimized, VERSION, sys.version_info[:2])).encode())
+    return digest.hexdigest()
+
+
+# Like __pycache__, the tree of dir/script.bng is stored in
+# dir/__bngcache__/script.bng.pickle as the key followed by the pickled Program.
+class AstCache:
+    def __init__(self, path, currencies, optimized=True):
+        directory, name = os.path.split(os.path.abspath(path))
+        suffix = ".opt.pickle" if optimized else ".pickle"
+        self.path = os.path.join(directory, CACHE_DIRECTORY, name + suffix)
+        with open(path, "rb") as file:
+            self.key = cache_key(file.read(), currencies, optimized)
+
+    def load(self):
+        try:
+            with open(self.path, "rb") as file:
+                if pickle.load(file) != self.key:
+                    return None
+                program = pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, TypeError, ValueError):
+            return None
+        return program if type(program) is Program else None
+
+    def store(self, program):
+        # written to a temporary file first, so concurrent runs never read half a file
+        temporary_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(temporary_path, "wb") as file:
+                pickle.dump(self.key, file, pickle.HIGHEST_PROTOCOL)
+                pickle.dump(program, file, pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_path, self.path)
+        except (OSError, RecursionError, pickle.PicklingError):
+            try:
+                os.remove(temporary_path)
+            except OSError:
+                pass
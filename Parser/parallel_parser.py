@@ -0,0 +1,86 @@
+import io
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from Lexer.lexer import Lexer
+from Parser.parser import Parser
+from Parser.parser_error import ParserError
+from Source.source import SourceReader
+from Source.source_position import SourcePosition
+from Parse_objects.objects import Program
+from Token.token_type import TokenType
+
+
+# Strings, comments and braces, matched like the lexer reads them: an escape
+# takes the next char, even a newline, and a string or a comment ends a line.
+_BRACES_STRINGS_AND_COMMENTS = re.compile(r'"(?:\\[\s\S]|[^"\\\n])*"?|#[^\n]*|[{}]')
+
+
+def function_ends(text):
+    ends = []
+    depth = 0
+    for match in _BRACES_STRINGS_AND_COMMENTS.finditer(text):
+        brace = match.group()
+        if brace == "{":
+            depth += 1
+        elif brace == "}":
+            depth -= 1
+            if depth == 0:
+                ends.append(match.end())
+    return ends
+
+
+def split_chunks(text, chunks):
+    target = len(text) // chunks + 1
+    offsets = [0]
+    for end in function_ends(text):
+        if end - offsets[-1] >= target:
+            offsets.append(end)
+    if offsets[-1] != len(text):
+        offsets.append(len(text))
+
+    line, previous = 1, 0
+    for start, end in zip(offsets, offsets[1:]):
+        line += text.count("\n", previous, start)
+        previous = start
+        column = start - text.rfind("\n", 0, start)
+        yield text[start:end], line, column
+
+
+def _parse_chunk(arguments):
+    text, line, column, currencies, table_driven = arguments
+    definitions = []
+    try:
+        lexer = Lexer(SourceReader(io.StringIO(text), line=line, column=column),
+                      currency_names=currencies, table_driven=table_driven, skip_comments=True)
+        parser = Parser(lexer, currencies)
+        while fun_def := parser._parse_fun_def():
+            definitions.append(fun_def)
+    except Exception as error:
+        return definitions, error, False
+    return definitions, None, parser.token.type == TokenType.END_OF_FILE
+
+
+# Every chunk starts where a serial parse would be between two functions, so a
+# serial parse reads the chunks in order as long as each one ends at its end of
+# file: the first error, redefinition or chunk stopped by a token which does not
+# start a function ends the program where the serial parse would.
+def parse_parallel(text, currencies, jobs, table_driven=True):
+    chunks = [(chunk, line, column, currencies, table_driven)
+              for chunk, line, column in split_chunks(text, jobs * 4)]
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        results = executor.map(_parse_chunk, chunks)
+
+        functions = {}
+        for definitions, error, complete in results:
+            for fun_def in definitions:
+                if old_fun := functions.get(fun_def.name):
+                    raise ParserError(f"Redefinition of a function from line {old_fun.position.line}",
+                                      fun_def.position)
+                functions[fun_def.name] = fun_def
+            if error is not None:
+                raise error
+            if not complete:
+                break
+
+    return Program(SourcePosition(1, 1), functions)
@@ -2,6 +2,8 @@ from Parser.interface import Parser
 from Parser.parser_error import ParserError
 from Token.token_type import TokenType, BOOL_VALUE_MAPPING
 from Source.source_position import SourcePosition
+from Currency.registry import to_registry
+from Lexer.token_list_lexer import TokenListLexer
 from Parse_objects.objects import (
     OrExpression,
     AndExpression,
@@ -37,21 +39,63 @@ from Parse_objects.objects import (
 )
 
 
+OR_LEVEL, AND_LEVEL, NEGATION_LEVEL, RELATION_LEVEL, ADDITIVE_LEVEL, MULTIPLICATIVE_LEVEL, PRIMARY_LEVEL = range(1, 8)
+
+# operator token -> (level, node, name used in errors)
+BINARY_OPERATORS = {
+    TokenType.OR: (OR_LEVEL, OrExpression, "||"),
+    TokenType.AND: (AND_LEVEL, AndExpression, "&&"),
+    **{type: (RELATION_LEVEL, init, type.name) for type, init in RELATION_OPERATOR_MAPPING.items()},
+    **{type: (ADDITIVE_LEVEL, init, type.name) for type, init in ADDITIVE_OPERATOR_MAPPING.items()},
+    **{type: (MULTIPLICATIVE_LEVEL, init, type.name) for type, init in MULTIPLICATIVE_OPERATOR_MAPPING.items()}
+}
+
+
 class Parser(Parser):
     types = TYPES_MAPPING
     function_types = FUNCTION_TYPES_MAPPING
+    max_lookahead = 4
 
-    def __init__(self, lexer) -> None:
+    # A lazy parser keeps only the tokens of every function body; the block is
+    # parsed by parse_function_body() when the function is first called.
+    def __init__(self, lexer, currencies=None, lazy=False) -> None:
         self.lexer = lexer
+        self._currencies = to_registry(currencies)
+        self._lazy = lazy
+        # ring buffer of the tokens read by peek() after self.token
+        self._lookahead = [None] * self.max_lookahead
+        self._lookahead_start = 0
+        self._lookahead_count = 0
         self.consume_token()
 
     def parse(self):
         return self._parse_program()
 
     def consume_token(self):
-        self.token = self.lexer.get_next_token()
-        if self.token.type == TokenType.COMMENT:
-            self.consume_token()
+        if self._lookahead_count:
+            self.token = self._lookahead[self._lookahead_start]
+            self._lookahead_start = (self._lookahead_start + 1) % self.max_lookahead
+            self._lookahead_count -= 1
+        else:
+            self.token = self._read_token()
+
+    # the k-th token after self.token, without consuming anything
+    def peek(self, k=1):
+        if k == 0:
+            return self.token
+        if not 0 < k <= self.max_lookahead:
+            raise ValueError(f"Can't look more than {self.max_lookahead} tokens ahead")
+        while self._lookahead_count < k:
+            index = (self._lookahead_start + self._lookahead_count) % self.max_lookahead
+            self._lookahead[index] = self._read_token()
+            self._lookahead_count += 1
+        return self._lookahead[(self._lookahead_start + k - 1) % self.max_lookahead]
+
+    def _read_token(self):
+        token = self.lexer.get_next_token()
+        while token.type == TokenType.COMMENT:
+            token = self.lexer.get_next_token()
+        return token
 
     def _must_be(self, type: TokenType, additional_message=""):
         if self.token.type != type:
@@ -82,12 +126,33 @@ class Parser(Parser):
         self._must_be(TokenType.LEFT_BRACKET)
         params = self._parse_parameters()
         self._must_be(TokenType.RIGHT_BRACKET)
+        if self._lazy:
+            if (body_tokens := self._skip_block()) is None:
+                raise ParserError("Missing block of a defined function.", self.token.position)
+            return FunctionDefinition(position, name, type, params, None, body_tokens=body_tokens)
         block = self._parse_block()
         if not block:
             raise ParserError("Missing block of a defined function.", block.position)
 
         return FunctionDefinition(position, name, type, params, block)
 
+    def _skip_block(self):
+        if self.token.type != TokenType.LEFT_CURLY_BRACKET:
+            return None
+        tokens = []
+        depth = 0
+        while True:
+            if self.token.type == TokenType.LEFT_CURLY_BRACKET:
+                depth += 1
+            elif self.token.type == TokenType.RIGHT_CURLY_BRACKET:
+                depth -= 1
+            elif self.token.type == TokenType.END_OF_FILE:
+                raise ParserError("Expected RIGHT_CURLY_BRACKET, got END_OF_FILE", self.token.position)
+            tokens.append(self.token)
+            self.consume_token()
+            if depth == 0:
+                return tokens
+
     # parameters = [ parameter , { "," , parameter } ];
     def _parse_parameters(self):
         parameters = []
@@ -134,14 +199,9 @@ class Parser(Parser):
     #           | return_statement
     #           | currency_transfer;
     def _parse_statement(self):
-        statement = self._parse_declaration() \
-            or self._parse_assignment_or_function_call() \
-            or self._parse_conditional() \
-            or self._parse_loop() \
-            or self._parse_return_statement() \
-            or self._parse_currency_transfer()
-
-        return statement
+        if (parse := self.statement_parsers.get(self.token.type)) is None:
+            return None
+        return parse(self)
 
     # declaration = type , identifier , [ "=" , expression ] , ";";
     def _parse_declaration(self):
@@ -333,97 +393,59 @@ class Parser(Parser):
 
     # expression = conjunction , { "||" , conjunction };
     def _parse_expression(self):
-        if (left_factor := self._parse_conjunction()) is None:
-            return None
-
-        while self.token.type == TokenType.OR:
-            position = self.token.position
-            self.consume_token()
-            right_factor = self._parse_conjunction()
-            if right_factor is None:
-                raise ParserError("Missing expression after ||.", position)
-            left_factor = OrExpression(position, left_factor, right_factor)
-
-        return left_factor
+        return self._parse_binary(OR_LEVEL)
 
     # conjunction = negation , { "&&" , negation };
     def _parse_conjunction(self):
-        if (left_factor := self._parse_negation()) is None:
-            return None
-
-        while self.token.type == TokenType.AND:
-            position = self.token.position
-            self.consume_token()
-            right_factor = self._parse_negation()
-            if right_factor is None:
-                raise ParserError("Missing expression after &&.", position)
-            left_factor = AndExpression(position, left_factor, right_factor)
-
-        return left_factor
+        return self._parse_binary(AND_LEVEL)
 
     # negation = [ "!" ] , relation_term;
     def _parse_negation(self):
-        negated = False
-        if self.token.type == TokenType.NOT:
-            position = self.token.position
-            negated = True
-            self.consume_token()
-
-        relation = self._parse_relation_term()
-        if negated and not relation:
-            raise ParserError("Expected expression after \"!\"", position)
-
-        if not negated and not relation:
-            return None
-
-        return NegatedExpression(position, "!", relation) if negated else relation
+        return self._parse_binary(NEGATION_LEVEL)
 
     # relation_term = additive_term , [ relation_operator , additive_term ];
     def _parse_relation_term(self):
-        if (left := self._parse_additive_term()) is None:
-            return None
-
-        position = self.token.position
-        expression_init = RELATION_OPERATOR_MAPPING.get(self.token.type)
-        if not expression_init:
-            return left
-        relation_type = self.token.type.name
-        self.consume_token()
-        right = self._parse_additive_term()
-        if right is None:
-            raise ParserError(f"Missing expression after {relation_type}.", position)
-
-        return expression_init(position, left, right)
+        return self._parse_binary(RELATION_LEVEL)
 
     # additive_term = multiplicative_term , { ( "+" | "-" ) , multiplicative_term };
     def _parse_additive_term(self):
-        if (left := self._parse_multiplicative_term()) is None:
-            return None
-
-        while expression_init := ADDITIVE_OPERATOR_MAPPING.get(self.token.type):
-            position = self.token.position
-            operation_type = self.token.type.name
-            self.consume_token()
-            right = self._parse_multiplicative_term()
-            if right is None:
-                raise ParserError(f"Missing expression after {operation_type}.", position)
-            left = expression_init(position, left, right)
-
-        return left
+        return self._parse_binary(ADDITIVE_LEVEL)
 
     # multiplicative_term = unary_application , { ( "*" | "/" ) , unary_application };
     def _parse_multiplicative_term(self):
-        if (left := self._parse_unary_application()) is None:
+        return self._parse_binary(MULTIPLICATIVE_LEVEL)
+
+    # Precedence climbing over the rules above: parses the longest expression of
+    # the rule at min_level in one loop instead of a call per rule. An operator
+    # may follow a left operand built at its own level or a higher one (the
+    # grammar's loops), except a relation, which takes additive terms only.
+    def _parse_binary(self, min_level):
+        if self.token.type == TokenType.NOT and min_level <= NEGATION_LEVEL:
+            position = self.token.position
+            self.consume_token()
+            if (relation := self._parse_binary(RELATION_LEVEL)) is None:
+                raise ParserError("Expected expression after \"!\"", position)
+            left = NegatedExpression(position, "!", relation)
+            left_level = NEGATION_LEVEL
+        elif (left := self._parse_unary_application()) is None:
             return None
+        else:
+            left_level = PRIMARY_LEVEL
 
-        while expression_init := MULTIPLICATIVE_OPERATOR_MAPPING.get(self.token.type):
+        while (operator := BINARY_OPERATORS.get(self.token.type)) is not None:
+            level, expression_init, symbol = operator
+            if level < min_level or level > left_level or level == left_level == RELATION_LEVEL:
+                break
             position = self.token.position
-            operation_type = self.token.type.name
             self.consume_token()
-            right = self._parse_unary_application()
+            if level == MULTIPLICATIVE_LEVEL:
+                right = self._parse_unary_application()
+            else:
+                right = self._parse_binary(level + 1)
             if right is None:
-                raise ParserError(f"Missing expression after {operation_type}.", position)
+                raise ParserError(f"Missing expression after {symbol}.", position)
             left = expression_init(position, left, right)
+            left_level = level
 
         return left
 
@@ -446,21 +468,14 @@ class Parser(Parser):
 
     # term = literal | object_access | "(" , expression , ")";
     def _parse_term(self):
-        term = self._parse_literal() \
-            or self._parse_object_access() \
-            or self._parse_bracket_expression()
-
-        return term
+        if (parse := self.term_parsers.get(self.token.type)) is None:
+            return None
+        return parse(self)
 
     def _parse_literal(self):
-        literal = self._parse_int_or_cur() \
-            or self._parse_float_or_cur() \
-            or self._parse_str() \
-            or self._parse_bool() \
-            or self._parse_curtype() \
-            or self._parse_dict()
-
-        return literal
+        if (parse := self.literal_parsers.get(self.token.type)) is None:
+            return None
+        return parse(self)
 
     def _parse_int_or_cur(self):
         if self.token.type != TokenType.INT_CONST:
@@ -492,7 +507,7 @@ class Parser(Parser):
         if self.token.type != TokenType.CURTYPE_CONST:
             return None
 
-        currency = CurConst(position, number, self.token.value)
+        currency = CurConst(position, number, self.token.value, self._currencies.get_id(self.token.value))
         self.consume_token()
 
         return currency
@@ -519,7 +534,7 @@ class Parser(Parser):
         if self.token.type != TokenType.CURTYPE_CONST:
             return None
 
-        curtype = CurtypeConst(self.token.position, self.token.value)
+        curtype = CurtypeConst(self.token.position, self.token.value, self._currencies.get_id(self.token.value))
         self.consume_token()
 
         return curtype
@@ -629,3 +644,34 @@ class Parser(Parser):
             arguments.append(expression)
 
         return arguments
+
+    # first token -> parser of the statement, literal or term starting with it
+    statement_parsers = {
+        **dict.fromkeys(TYPES_MAPPING, _parse_declaration),
+        TokenType.IDENTIFIER: _parse_assignment_or_function_call,
+        TokenType.IF: _parse_conditional,
+        TokenType.WHILE: _parse_while_loop,
+        TokenType.FOR: _parse_for_loop,
+        TokenType.RETURN: _parse_return_statement,
+        TokenType.FROM: _parse_currency_transfer
+    }
+    literal_parsers = {
+        TokenType.INT_CONST: _parse_int_or_cur,
+        TokenType.FLOAT_CONST: _parse_float_or_cur,
+        TokenType.STR_CONST: _parse_str,
+        TokenType.BOOL_VALUE_TRUE: _parse_bool,
+        TokenType.BOOL_VALUE_FALSE: _parse_bool,
+        TokenType.CURTYPE_CONST: _parse_curtype,
+        TokenType.LEFT_CURLY_BRACKET: _parse_dict
+    }
+    term_parsers = {
+        **literal_parsers,
+        TokenType.IDENTIFIER: _parse_object_access,
+        TokenType.LEFT_BRACKET: _parse_bracket_expression
+    }
+
+
+def parse_function_body(function_definition, currencies=None):
+    parser = Parser(TokenListLexer(function_definition.body_tokens), currencies)
+    function_definition.block = parser._parse_block()
+    function_definition.body_tokens = None
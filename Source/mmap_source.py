@@ -0,0 +1,70 @@
+import mmap
+import os
+
+from .source_position import SourcePosition
+
+
+class MmapSourceReader:
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self._view = memoryview(self._data)
+        self._size = size
+        self._offset = 0
+        self._next_offset = 0
+
+        self._char_offset = 0
+        self._line_starts = [0]
+        self.current_char = ""
+        self.next_char()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._view.release()
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+    def next_char(self):
+        if self.current_char:
+            self._char_offset += 1
+            if self.current_char == "\n":
+                self._line_starts.append(self._char_offset)
+
+        offset = self._offset = self._next_offset
+        if offset >= self._size:
+            self.current_char = chr(3)
+            return
+
+        byte = self._data[offset]
+        if byte < 0x80:
+            self._next_offset = offset + 1
+            if byte == 13:
+                if self._next_offset < self._size and self._data[self._next_offset] == 10:
+                    self._next_offset += 1
+                self.current_char = "\n"
+            else:
+                self.current_char = chr(byte)
+            return
+
+        length = 2 if byte < 0xE0 else 3 if byte < 0xF0 else 4
+        self._next_offset = offset + length
+        self.current_char = str(self._view[offset:self._next_offset], "utf-8")
+
+    def get_char(self):
+        return self.current_char
+
+    def get_position(self):
+        return SourcePosition.from_offset(self._char_offset, self._line_starts)
+
+    def get_offset(self):
+        return self._offset
+
+    def get_slice(self, start, end):
+        return str(self._view[start:end], "utf-8")
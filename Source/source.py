@@ -1,29 +1,55 @@
+from contextlib import contextmanager
+
 from .source_position import SourcePosition
+from .mmap_source import MmapSourceReader
 
 
 class SourceReader:
-    def __init__(self, source):
+    # line and column place the first char of a fragment cut out of a bigger file,
+    # so positions match the ones of the whole file: the line starts get one entry
+    # per line before the first one, moved left by the column
+    def __init__(self, source, buffer_size=64 * 1024, line=1, column=1):
         self.source = source
+        self._buffer_size = buffer_size
+        self._buffer = ""
+        self._index = 0
 
-        self.current_position = SourcePosition(1, 1)
+        self._char_offset = 0
+        self._line_starts = [1 - column] * line
         self.current_char = ""
         self.next_char()
 
+    def _fill_buffer(self):
+        self._buffer = self.source.read(self._buffer_size)
+        self._index = 0
+
     def next_char(self):
-        if self.current_char == "\n":
-            self.current_position = self.current_position.next_line()
-        elif self.current_char:
-            self.current_position = self.current_position.advance()
+        if self.current_char:
+            self._char_offset += 1
+            if self.current_char == "\n":
+                self._line_starts.append(self._char_offset)
 
-        char = self.source.read(1)
+        if self._index >= len(self._buffer):
+            self._fill_buffer()
 
-        if not char:
+        if not self._buffer:
             self.current_char = chr(3)
         else:
-            self.current_char = char
+            self.current_char = self._buffer[self._index]
+            self._index += 1
 
     def get_char(self):
         return self.current_char
 
     def get_position(self):
-        return self.current_position
+        return SourcePosition.from_offset(self._char_offset, self._line_starts)
+
+
+@contextmanager
+def open_source(path, backend="stream"):
+    if backend == "mmap":
+        with MmapSourceReader(path) as source:
+            yield source
+    else:
+        with open(path, "r") as file:
+            yield SourceReader(file)
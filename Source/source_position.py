@@ -1,7 +1,57 @@
+from bisect import bisect_right
+
+
+COLUMN_BITS = 20
+
+
 class SourcePosition:
+    __slots__ = ("_line", "_column", "_offset", "_line_starts")
+
     def __init__(self, line: int, column: int):
-        self.line = line
-        self.column = column
+        self._line = line
+        self._column = column
+        self._offset = None
+        self._line_starts = None
+
+    @classmethod
+    def from_offset(cls, offset: int, line_starts: list):
+        position = cls.__new__(cls)
+        position._line = None
+        position._column = None
+        position._offset = offset
+        position._line_starts = line_starts
+        return position
+
+    # A position fits in a single int with the line above COLUMN_BITS bits of the
+    # column; a column too wide to pack keeps the position object itself.
+    def pack(self):
+        if self.column >> COLUMN_BITS:
+            return self
+        return self._line << COLUMN_BITS | self._column
+
+    @classmethod
+    def unpack(cls, packed):
+        if type(packed) is not int:
+            return packed
+        return cls(packed >> COLUMN_BITS, packed & ((1 << COLUMN_BITS) - 1))
+
+    def _resolve(self):
+        line = bisect_right(self._line_starts, self._offset)
+        self._line = line
+        self._column = self._offset - self._line_starts[line - 1] + 1
+        self._line_starts = None
+
+    @property
+    def line(self) -> int:
+        if self._line is None:
+            self._resolve()
+        return self._line
+
+    @property
+    def column(self) -> int:
+        if self._column is None:
+            self._resolve()
+        return self._column
 
     def __str__(self) -> str:
         return f"Ln {self.line} Col {self.column}"
@@ -12,8 +62,3 @@ class SourcePosition:
     def __eq__(self, other: object) -> bool:
         return self.line == other.line and self.column == other.column
 
-    def advance(self):
-        return SourcePosition(self.line, self.column + 1)
-
-    def next_line(self):
-        return SourcePosition(self.line + 1, 1)
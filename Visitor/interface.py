@@ -1,5 +1,37 @@
 from abc import ABCMeta
 
+from Parse_objects.objects import Node
 
+
+class _HandlerName:
+    def __getattr__(self, name):
+        return lambda node: name
+
+
+def _node_classes(node_class=Node):
+    for subclass in node_class.__subclasses__():
+        yield subclass
+        yield from _node_classes(subclass)
+
+
+def handler_names():
+    # accept() of a node only forwards to visitor.visit_*, so calling it with a
+    # recording visitor gives the name of the method without changing node classes
+    recorder = _HandlerName()
+    return {node_class: node_class.accept(None, recorder)
+            for node_class in _node_classes() if "accept" in vars(node_class)}
+
+
+# Every visitor class gets handlers, a table from node class to its visit_*
+# function, built once when the class is created. handlers[type(node)](self, node)
+# dispatches with one dict lookup and one call instead of node.accept(self).
 class Visitor(metaclass=ABCMeta):
-    ...
+    handlers = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.handlers = {node_class: getattr(cls, name)
+                        for node_class, name in handler_names().items() if hasattr(cls, name)}
+
+    def visit(self, node):
+        return self.handlers[type(node)](self, node)
@@ -1,201 +1,216 @@
+from dataclasses import dataclass
+from typing import Any
+
 from Visitor.interface import Visitor
 from Context.context import Context
-from Parse_objects.objects import BuiltInFunction, FunctionCall
+from Context.frame_stack import FrameStack
+from Parse_objects.objects import BuiltInFunction, FunctionCall, Declaration, IdentifierExpression, ObjectAccess
 from Interpreter.reference import Reference
 from Interpreter.calculations import Calculations
-from Currency.currency import Currency, Curtype, Dictionary
-from Interpreter.semantic_error import SemanticError
-
-from collections import deque
-
-from Parse_objects.objects import DocumentObjectModel
-
-TYPES_MAP = {
-    DocumentObjectModel.INT: int,
-    DocumentObjectModel.FLOAT: float,
-    DocumentObjectModel.STR: str,
-    DocumentObjectModel.CUR: Currency,
-    DocumentObjectModel.CURTYPE: Curtype,
-    DocumentObjectModel.BOOL: bool,
-    DocumentObjectModel.DICT: Dictionary,
-    DocumentObjectModel.VOID: None
-}
-
-
+from Currency.currency import Currency, Dictionary
+from Interpreter.semantic_error import (SemanticError, arguments_count_message, depth_exceeded_message,
+                                        INVALID_TARGET_MESSAGE)
+from Currency.registry import to_registry
+from Interpreter.resolver import resolve_function
+from Interpreter.type_checker import check_function
+from Interpreter.builtins import TYPES_MAP, BUILTINS_LIST, BUILTIN_RETURN_TYPES
+from Interpreter.analysis import analyse_program
+from Parser.parser import parse_function_body
+
+
+# Result of a block once a return statement was executed. A separate class, since
+# a call used as a statement returns whatever value the call produced.
+@dataclass(slots=True)
+class Returned:
+    value: Any
+
+
+# Expressions return plain values; a value is boxed in a Reference only when it is
+# bound to a variable or passed as an argument. A statement returns a Returned holding
+# the returned value once a return statement was executed; any other result of
+# a statement, like the value of a call used as a statement, is dropped.
+# Calls, conditions, returns and blocks still dispatch through accept(): the call
+# to visit_* inside every accept() has a single target, which CPython specializes,
+# and there the shared handlers call site measured slower in recursive code.
 class InterpreterVisitor(Visitor):
-    def __init__(self, exchange_rates):
-        self._last_result = None
+    def __init__(self, exchange_rates, max_depth=None):
+        self._max_depth = max_depth
         self._global_context = Context()
-        self._call_context = Context(global_context=self._global_context)
-        self._last_contexts = deque()
-        self._calculations_handler = Calculations(exchange_rates)
-        self._call_position = None
-        self._returning = False
-        self._declaring = False
-        self._resolving = True
-
-    def _consume_last_result(self):
-        value = self._last_result
-        self._last_result = None
-        return value
+        self._functions = {}
+        self._frames = FrameStack()
+        self._call_frame = None
+        self._currencies = to_registry(exchange_rates)
+        self._calculations_handler = Calculations(self._currencies)
+        self._call = None
+        self._call_arguments = []
+        self._call_checked = False
+        self._frame = []
+
+    @property
+    def _call_position(self):
+        return self._call and self._call.position
 
     def _insert_builtin_functions(self):
         for function in BUILTINS_LIST:
             function_obj = BuiltInFunction(position=None, name=function[0], function=function[1])
             self._global_context.insert_symbol_function(function[0], function_obj)
 
-    def _get_left_right_expressions(self, expression):
-        expression.left.accept(self)
-        left = self._consume_last_result()
-        expression.right.accept(self)
-        right = self._consume_last_result()
-        return left, right
-
     def _call_function(self, function):
-        self._last_contexts.append(self._call_context)
-        self._call_context = Context(global_context=self._global_context)
-        function.accept(self)
-        self._call_context = self._last_contexts.pop()
+        caller_frame = self._call_frame
+        self._call_frame = self._frames.push()
+        result = function.accept(self)
+        self._frames.pop()
+        self._call_frame = caller_frame
+        self._frame = caller_frame.variables if caller_frame else []
+        return result
 
     def visit_program(self, program):
+        self._functions = program.functions
         for function_name in program.functions:
             function = program.functions[function_name]
             self._global_context.insert_symbol_function(function_name, function)
 
         self._insert_builtin_functions()
+        analyse_program(program)
         main_function = self._global_context.get_value_function('main')
-        if not main_function:
-            raise SemanticError("Missing main function.", program.position)
-        if main_function.type is not DocumentObjectModel.VOID:
-            raise SemanticError("Main function has to be void type", program.position)
-
+        self._frames = FrameStack(max(function.frame_size for function in program.functions.values()))
+        self._call_arguments = []
         self._call_function(main_function)
 
+    def _parse_body(self, function_definition):
+        parse_function_body(function_definition, self._currencies)
+        resolve_function(function_definition, [*self._functions, *(name for name, _ in BUILTINS_LIST)])
+        check_function(self._functions, function_definition, TYPES_MAP, BUILTIN_RETURN_TYPES)
+        self._frames.grow(function_definition.frame_size)
+
     def visit_function_definition(self, function_definition):
-        self._call_context.set_expected_return_type(TYPES_MAP[function_definition.type])
-        arguments = self._consume_last_result() or []
-        if len(arguments) != len(function_definition.params):
-            raise SemanticError(f"Wrong amount of arguments, expected {len(function_definition.params)}\
-                                , got {len(arguments)}", self._call_position)
+        if function_definition.block is None:
+            self._parse_body(function_definition)
+        self._call_frame.expected_return_type = TYPES_MAP[function_definition.type]
+        arguments = self._call_arguments
+        self._frame = self._call_frame.variables
+        if self._max_depth is not None and len(self._frames) > self._max_depth:
+            raise SemanticError(depth_exceeded_message(self._max_depth), self._call_position)
+        if not self._call_checked:
+            if len(arguments) != len(function_definition.params):
+                raise SemanticError(arguments_count_message(len(function_definition.params), len(arguments)),
+                                    self._call_position)
+            for argument, parameter in zip(arguments, function_definition.params):
+                if type(argument.value) is not TYPES_MAP[parameter.type]:
+                    raise SemanticError("Parameter type mismatch.", self._call_position)
 
         for argument, parameter in zip(arguments, function_definition.params):
-            if type(argument.value) is not TYPES_MAP[parameter.type]:
-                raise SemanticError("Parameter type mismatch.", self._call_position)
-            self._call_context.insert_symbol_variable(parameter.name, argument)
-
-        function_definition.block.accept(self)
+            self._frame[parameter.slot] = argument
 
-        self._returning = False
+        result = function_definition.block.accept(self)
+        return None if result is None else result.value
 
     def visit_block(self, block):
-        self._call_context.enter_scope()
+        handlers = self.handlers
         for statement in block.statements:
-            statement.accept(self)
-            if self._returning:
-                break
-            self._declaring = False
-            self._last_result = None
-        self._call_context.leave_scope()
+            if type(result := handlers[type(statement)](self, statement)) is Returned:
+                return result
+
+    def _evaluate_reference(self, expression):
+        if type(expression) is ObjectAccess and len(expression.objects) == 1 \
+                and type(expression.objects[0]) is IdentifierExpression:
+            return self._load_variable(expression.objects[0])
+        return Reference(self.handlers[type(expression)](self, expression))
 
     def visit_function_call(self, fun_call):
-        arguments = []
-        self._call_position = fun_call.position
-        for argument in fun_call.arguments:
-            argument.accept(self)
-            value = self._consume_last_result()
-            arguments.append(value if isinstance(value, Reference) else Reference(value))
-        self._last_result = arguments
+        self._call = fun_call
+        arguments = [self._evaluate_reference(argument) for argument in fun_call.arguments]
         function = self._global_context.get_value_function(fun_call.name)
         if function is None:
             raise SemanticError(f"Function {fun_call.name} not found", fun_call.position)
-        self._call_function(function)
+        self._call_arguments = arguments
+        self._call_checked = fun_call.arguments_checked
+        return self._call_function(function)
 
     def visit_external_function(self, built_in_function):
-        arguments = self._consume_last_result() or []
+        arguments = self._call_arguments
         try:
-            self._last_result = built_in_function.function(*[argument.value for argument in arguments]
-                                                           if len(arguments) else " ")
+            return built_in_function.function(*[argument.value for argument in arguments]
+                                              if len(arguments) else " ")
         except Exception as e:
             raise SemanticError(e.args[0], self._call_position)
 
     def visit_object_access(self, object_access):
-        object_access.objects[0].accept(self)
+        result = object_access.objects[0].accept(self)
         if len(object_access.objects) == 1:
-            return
+            return result
 
-        method_or_value = self._consume_last_result().value
+        method_or_value = result
         for part in object_access.objects[1:]:
             if type(part) is FunctionCall:
-                args = part.arguments
-                args_values = []
-                for arg in args:
-                    arg.accept(self)
-                    args_values.append(self._consume_last_result().value)
+                args_values = [self.handlers[type(arg)](self, arg) for arg in part.arguments]
                 method = getattr(method_or_value, part.name)
                 ret = method(*args_values)
                 if ret:
-                    self._last_result = Reference(ret)
-                    break
+                    return ret
             else:
                 method_or_value_name = part.name
                 method_or_value = getattr(method_or_value, method_or_value_name)
+        return method_or_value
+
+    def _load_variable(self, identifier_expression):
+        if identifier_expression.slot is not None:
+            variable = self._frame[identifier_expression.slot]
+            if variable is not None:
+                return variable
+        return Reference(self._load_function(identifier_expression))
 
-            self._last_result = Reference(method_or_value)
+    def _load_function(self, identifier_expression):
+        function = self._global_context.get_value_function(identifier_expression.name)
+        if function is None:
+            raise SemanticError(f"'{identifier_expression.name}' was not declared in this scope",
+                                identifier_expression.position)
+        return function
 
     def visit_identifier_expression(self, identifier_expression):
-        if self._resolving:
-            value_obj = self._call_context.get_value_variable(identifier_expression.name) or \
-                self._call_context.get_value_function(identifier_expression.name)
-            if value_obj is None:
-                raise SemanticError(f"'{identifier_expression.name}' was not declared in this scope",
-                                    identifier_expression.position)
-            self._last_result = value_obj
-        else:
-            self._last_result = identifier_expression.name
+        if identifier_expression.slot is not None:
+            variable = self._frame[identifier_expression.slot]
+            if variable is not None:
+                return variable.value
+        return self._load_function(identifier_expression)
 
     def visit_declaration(self, declaration):
-        self._declaring = True
-        if (self._call_context.get_current_scope_value_variable(declaration.name)) is not None:
-            raise SemanticError(f"Redeclaration of a variable {declaration.name}", declaration.position)
-        self._last_result = declaration
+        self._frame[declaration.slot] = None
+
+    def _assignment_target(self, assignment):
+        target = assignment.object.objects[0]
+        if len(assignment.object.objects) != 1 or type(target) is not IdentifierExpression:
+            raise SemanticError(INVALID_TARGET_MESSAGE, assignment.position)
+        return target
 
     def visit_assignment(self, assignment):
-        self._resolving = False
-        assignment.object.accept(self)
-        object = self._consume_last_result()
-        self._resolving = True
-        assignment.expression.accept(self)
-        value = self._consume_last_result()
-        value = value.value if isinstance(value, Reference) else value
-
-        if self._declaring:
-            if type(value) is not TYPES_MAP[object.type]:
+        object = assignment.object
+        if type(object) is not Declaration:
+            target = self._assignment_target(assignment)
+        expression = assignment.expression
+        value = self.handlers[type(expression)](self, expression)
+
+        if type(object) is Declaration:
+            if assignment.static_type is None and type(value) is not TYPES_MAP[object.type]:
                 raise SemanticError("Type mismatch.", assignment.position)
-            self._call_context.insert_symbol_variable(
-                object.name, value if isinstance(value, Reference) else Reference(value)
-            )
+            self._frame[object.slot] = Reference(value)
         else:
-            old_value = self._call_context.get_value_variable(object)
+            old_value = self._frame[target.slot]
             if old_value is None:
                 raise SemanticError("Undefined variable.", assignment.position)
-            if type(value) is not type(old_value.value):
+            if assignment.static_type is None and type(value) is not type(old_value.value):
                 raise SemanticError(f"Type mismatch, {type(old_value.value)} - {type(value)}", assignment.position)
             old_value.value = value
 
     def _operate_and_assign(self, assignment, method):
-        self._resolving = False
-        assignment.object.accept(self)
-        object = self._consume_last_result()
-        self._resolving = True
+        target = self._assignment_target(assignment)
+        expression = assignment.expression
+        value = self.handlers[type(expression)](self, expression)
 
-        assignment.expression.accept(self)
-        value = self._consume_last_result()
-        value = value.value if isinstance(value, Reference) else value
-
-        old_value = self._call_context.get_value_variable(object)
+        old_value = self._frame[target.slot]
         if old_value is None:
-            raise SemanticError(f"Undefined variable {object}", assignment.position)
-        if type(value) is not type(old_value.value):
+            raise SemanticError(f"Undefined variable {target.name}", assignment.position)
+        if assignment.static_type is None and type(value) is not type(old_value.value):
             raise SemanticError(f"Type mismatch, {type(old_value.value)} - {type(value)}", assignment.position)
 
         if method == "+":
@@ -210,60 +225,40 @@ class InterpreterVisitor(Visitor):
         self._operate_and_assign(assignment, "-")
 
     def visit_if_statement(self, if_statement):
-        if_statement.condition.accept(self)
-        if self._consume_last_result().value:
-            if_statement.block.accept(self)
-        else:
-            elif_completed = False
-            for elif_block in if_statement.elif_blocks:
-                elif_block[0].accept(self)
-                if self._consume_last_result().value:
-                    elif_block[1].accept(self)
-                    elif_completed = True
-                    break
-            if if_statement.else_block and not elif_completed:
-                if_statement.else_block.accept(self)
+        if if_statement.condition.accept(self):
+            return if_statement.block.accept(self)
+        for condition, block in if_statement.elif_blocks:
+            if condition.accept(self):
+                return block.accept(self)
+        if if_statement.else_block:
+            return if_statement.else_block.accept(self)
 
     def visit_while_loop_statement(self, while_statement):
-        while_statement.condition.accept(self)
-        execute = self._consume_last_result()
-        while execute.value:
-            while_statement.block.accept(self)
-            if self._returning:
-                break
-            while_statement.condition.accept(self)
-            execute = self._consume_last_result()
+        while while_statement.condition.accept(self):
+            if type(result := while_statement.block.accept(self)) is Returned:
+                return result
 
     def visit_for_loop_statement(self, for_statement):
-        for_statement.expression.accept(self)
-        iterable = self._consume_last_result()
-        for element in iterable.value:
-            self._call_context.insert_symbol_variable(for_statement.loop_identifier, element)
-            for_statement.block.accept(self)
-            if self._returning:
-                break
+        for element in self.handlers[type(for_statement.expression)](self, for_statement.expression):
+            self._frame[for_statement.slot] = element if isinstance(element, Reference) else Reference(element)
+            if type(result := for_statement.block.accept(self)) is Returned:
+                return result
 
     def visit_return_statement(self, return_statement):
-        if return_statement.expression:
-            return_statement.expression.accept(self)
-            return_value = self._consume_last_result()
-            expected = self._call_context.get_expected_return_type()
-            if type(return_value.value) is not expected:
-                raise SemanticError(f"Wrong return type, expected {expected}, got {type(return_value.value)}",
-                                    return_statement.position)
-            return_statement.expression.accept(self)
-        else:
-            expected = self._call_context.get_expected_return_type()
+        expected = self._call_frame.expected_return_type
+        if not return_statement.expression:
             if expected is not None:
                 raise SemanticError(f"Expected return of a type {expected}", return_statement.position)
-        self._returning = True
+            return Returned(None)
+
+        return_value = return_statement.expression.accept(self)
+        if return_statement.static_type is None and type(return_value) is not expected:
+            raise SemanticError(f"Wrong return type, expected {expected}, got {type(return_value)}",
+                                return_statement.position)
+        return Returned(return_value)
 
     def visit_currency_transfer(self, currency_transfer):
-        expressions = []
-        for expression in currency_transfer.expressions:
-            expression.accept(self)
-            currency = self._consume_last_result()
-            expressions.append(currency)
+        expressions = [self._evaluate_reference(expression) for expression in currency_transfer.expressions]
 
         for expression in expressions:
             if type(expression.value) is not Currency:
@@ -274,13 +269,13 @@ class InterpreterVisitor(Visitor):
                 expressions[0].value,
                 expressions[1].value,
                 currency_transfer, "-")
-            expressions[0].value = new_currency_from.value
+            expressions[0].value = new_currency_from
 
             new_currency_to = self._calculations_handler.calculate_result(
                 expressions[2].value,
                 expressions[1].value,
                 currency_transfer, "+")
-            expressions[2].value = new_currency_to.value
+            expressions[2].value = new_currency_to
 
         else:
             new_currency_to = self._calculations_handler.calculate_result(
@@ -292,186 +287,108 @@ class InterpreterVisitor(Visitor):
                 expressions[0].value,
                 expressions[1].value,
                 currency_transfer, "-")
-            expressions[1].value = new_currency_to.value
-            expressions[0].value = new_currency_from.value
+            expressions[1].value = new_currency_to
+            expressions[0].value = new_currency_from
 
     def visit_expression(self, expression):
         ...
 
     def visit_or_expression(self, or_expression):
-        or_expression.left.accept(self)
-        left = self._consume_last_result()
-        if left.value is True:
-            self._last_result = Reference(True)
-            return
-        or_expression.right.accept(self)
-        right = self._consume_last_result()
-        self._last_result = self._calculations_handler.handle_bool_relations(
-            left.value, right.value, or_expression, lambda a, b: a or b
-        )
+        left = self.handlers[type(or_expression.left)](self, or_expression.left)
+        if left is True:
+            return True
+        right = self.handlers[type(or_expression.right)](self, or_expression.right)
+        return self._calculations_handler.handle_bool_relations(left, right, or_expression, "||")
 
     def visit_and_expression(self, and_expression):
-        and_expression.left.accept(self)
-        left = self._consume_last_result()
-        if left.value is False:
-            self._last_result = Reference(False)
-            return
-        and_expression.right.accept(self)
-        right = self._consume_last_result()
-        self._last_result = self._calculations_handler.handle_bool_relations(
-            left.value, right.value, and_expression, lambda a, b: a and b
-        )
+        left = self.handlers[type(and_expression.left)](self, and_expression.left)
+        if left is False:
+            return False
+        right = self.handlers[type(and_expression.right)](self, and_expression.right)
+        return self._calculations_handler.handle_bool_relations(left, right, and_expression, "&&")
+
+    def _compare(self, relation, operator):
+        left = self.handlers[type(relation.left)](self, relation.left)
+        right = self.handlers[type(relation.right)](self, relation.right)
+        return self._calculations_handler.compare_values(left, right, operator, relation)
 
     def visit_less_relation(self, relation):
-        left, right = self._get_left_right_expressions(relation)
-        self._last_result = self._calculations_handler.compare_values(left.value, right.value, "<", relation)
+        return self._compare(relation, "<")
 
     def visit_less_equal_relation(self, relation):
-        left, right = self._get_left_right_expressions(relation)
-        self._last_result = self._calculations_handler.compare_values(left.value, right.value, "<=", relation)
+        return self._compare(relation, "<=")
 
     def visit_greater_relation(self, relation):
-        left, right = self._get_left_right_expressions(relation)
-        self._last_result = self._calculations_handler.compare_values(left.value, right.value, ">", relation)
+        return self._compare(relation, ">")
 
     def visit_greater_equal_relation(self, relation):
-        left, right = self._get_left_right_expressions(relation)
-        self._last_result = self._calculations_handler.compare_values(left.value, right.value, ">=", relation)
+        return self._compare(relation, ">=")
 
     def visit_equal_relation(self, relation):
-        left, right = self._get_left_right_expressions(relation)
-        self._last_result = self._calculations_handler.compare_values(left.value, right.value, "==", relation)
+        return self._compare(relation, "==")
 
     def visit_not_equal_relation(self, relation):
-        left, right = self._get_left_right_expressions(relation)
-        self._last_result = self._calculations_handler.compare_values(left.value, right.value, "!=", relation)
+        return self._compare(relation, "!=")
 
     def visit_negated_expression(self, negation):
-        negation.right.accept(self)
-        right = self._consume_last_result()
-        self._last_result = self._calculations_handler.negate_value(negation.left, right.value, negation)
+        right = self.handlers[type(negation.right)](self, negation.right)
+        return self._calculations_handler.negate_value(negation.left, right, negation)
 
-    def visit_add_expression(self, expression):
-        left, right = self._get_left_right_expressions(expression)
+    def _calculate(self, expression, operator, acceptable_types, message):
+        left = self.handlers[type(expression.left)](self, expression.left)
+        right = self.handlers[type(expression.right)](self, expression.right)
 
-        acceptable_right_type = ADD_TYPES.get(type(left.value), None)
-        if acceptable_right_type is None or type(right.value) not in acceptable_right_type:
-            raise SemanticError("Different types in add operation", expression.position)
+        if expression.static_type is None:
+            acceptable_right_type = acceptable_types.get(type(left), None)
+            if acceptable_right_type is None or type(right) not in acceptable_right_type:
+                raise SemanticError(message, expression.position)
 
-        self._last_result = self._calculations_handler.calculate_result(
-            left.value, right.value, expression, "+"
-        )
+        return self._calculations_handler.calculate_result(left, right, expression, operator)
 
-    def visit_sub_expression(self, expression):
-        left, right = self._get_left_right_expressions(expression)
-
-        acceptable_right_type = SUB_TYPES.get(type(left.value), None)
-        if acceptable_right_type is None or type(right.value) not in acceptable_right_type:
-            raise SemanticError("Different types in sub operation", expression.position)
+    def visit_add_expression(self, expression):
+        return self._calculate(expression, "+", ADD_TYPES, "Different types in add operation")
 
-        self._last_result = self._calculations_handler.calculate_result(
-            left.value, right.value, expression, "-"
-        )
+    def visit_sub_expression(self, expression):
+        return self._calculate(expression, "-", SUB_TYPES, "Different types in sub operation")
 
     def visit_mul_expression(self, expression):
-        left, right = self._get_left_right_expressions(expression)
-
-        acceptable_right_type = MUL_TYPES.get(type(left.value), None)
-        if acceptable_right_type is None or type(right.value) not in acceptable_right_type:
-            raise SemanticError("Different types in multiply operation", expression.position)
-
-        self._last_result = self._calculations_handler.calculate_result(
-            left.value, right.value, expression, "*"
-        )
+        return self._calculate(expression, "*", MUL_TYPES, "Different types in multiply operation")
 
     def visit_div_expression(self, expression):
-        left, right = self._get_left_right_expressions(expression)
-
-        acceptable_right_type = DIV_TYPES.get(type(left.value), None)
-        if acceptable_right_type is None or type(right.value) not in acceptable_right_type:
-            raise SemanticError("Wrong types in divide operation", expression.position)
-
-        self._last_result = self._calculations_handler.calculate_result(
-            left.value, right.value, expression, "/"
-        )
+        return self._calculate(expression, "/", DIV_TYPES, "Wrong types in divide operation")
 
     def visit_int_const(self, const):
-        self._last_result = Reference(const.value)
+        return const.value
 
     def visit_float_const(self, const):
-        self._last_result = Reference(const.value)
+        return const.value
 
     def visit_cur_const(self, const):
-        type = Curtype(const.type)
-        self._last_result = Reference(Currency(const.value, type))
+        type = self._currencies.get_curtype(const.type, const.currency_id)
+        return Currency(const.value, type)
 
     def visit_str_const(self, const):
-        self._last_result = Reference(const.value)
+        return const.value
 
     def visit_bool_const(self, const):
-        self._last_result = Reference(const.value)
+        return const.value
 
     def visit_curtype_const(self, const):
-        self._last_result = Reference(Curtype(const.value))
+        return self._currencies.get_curtype(const.value, const.currency_id)
 
     def visit_dict_const(self, dict):
         dictionary = Dictionary({})
         for pair in dict.pairs:
             name = pair.name
-            pair.expression.accept(self)
-            expression = self._consume_last_result()
-            if type(expression.value) is not Currency:
+            value = self.handlers[type(pair.expression)](self, pair.expression)
+            if type(value) is not Currency:
                 raise SemanticError("Expected cur in dict value", dict.position)
 
             if dictionary.storage.get(name):
                 raise SemanticError(f"Multiple account name '{name}' defined", dict.position)
-            dictionary.storage[name] = expression.value
-        self._last_result = Reference(dictionary)
-
-
-def print_(text):
-    print(text)
-
-
-def input_(text):
-    value = input(text)
-    return value
-
-
-def to_int(value):
-    if type(value) not in [float, str]:
-        raise TypeError("Can convert only float or str")
-    try:
-        return Reference(int(value))
-    except Exception:
-        raise ValueError("Wrong value to convert")
-
-
-def to_float(value):
-    if type(value) not in [int, str]:
-        raise TypeError("Can convert only int or str")
-    try:
-        return Reference(float(value))
-    except Exception:
-        raise ValueError("Wrong value to convert")
-
-
-def to_str(value):
-    if type(value) not in [int, float, Currency, Curtype]:
-        raise TypeError("Can convert only int, float, cur or curtype")
-    try:
-        return Reference(str(value))
-    except Exception:
-        raise ValueError("Wrong value to convert")
-
+            dictionary.storage[name] = value
+        return dictionary
 
-BUILTINS_LIST = [
-    ('print', print_),
-    ('input', input_),
-    ('to_int', to_int),
-    ('to_float', to_float),
-    ('to_str', to_str)
-]
 
 ADD_TYPES = {
     int: [int],
@@ -1,33 +1,129 @@
 import sys
+import time
+import argparse
 
 from Lexer.lexer import Lexer
-from Source.source import SourceReader
-from Lexer.exchange_rate_analyser import get_currency_types, get_exchange_rates
+from Source.source import open_source
+from Lexer.exchange_rate_analyser import load_exchange_rates
 from Parser.parser import Parser
+from Parser.ast_cache import AstCache
+from Parser.parallel_parser import parse_parallel
 from Visitor.interpreter_visitor import InterpreterVisitor
+from Interpreter.closure_compiler import ClosureInterpreter
+from Interpreter.virtual_machine import VirtualMachine
+from Interpreter.bytecode import compile_program, disassemble_program
+from Interpreter.analysis import analyse_program
+from Interpreter.optimizer import optimize_program
+from Parse_objects.dump import dump_tree
 
 
-if __name__ == '__main__':
-    if len(sys.argv) < 2 or len(sys.argv) > 3:
-        print('Expected one or two arguments: path_to_file [path_to_exchange_rate_file]')
-        sys.exit()
+ENGINES = {
+    "tree": InterpreterVisitor,
+    "closure": ClosureInterpreter,
+    "vm": VirtualMachine
+}
+
+
+def positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive number, got {value}")
+    return value
+
+
+def parse_arguments():
+    arg_parser = argparse.ArgumentParser(description="Bingo interpreter")
+    arg_parser.add_argument("path_to_file")
+    arg_parser.add_argument("path_to_exchange_rate_file", nargs="?", default="eurofxref.csv")
+    arg_parser.add_argument("--source", choices=["stream", "mmap"], default="stream",
+                            help="source backend used by the lexer")
+    arg_parser.add_argument("--scanner", choices=["sequential", "table"], default="table",
+                            help="lexer scanning engine")
+    arg_parser.add_argument("--engine", choices=list(ENGINES), default="tree",
+                            help="execution engine")
+    arg_parser.add_argument("--disassemble", action="store_true",
+                            help="print the compiled bytecode instead of running the program")
+    arg_parser.add_argument("--no-optimize", dest="optimize", action="store_false",
+                            help="run the program without constant folding and dead branch elimination")
+    arg_parser.add_argument("--dump-ast", action="store_true",
+                            help="print the (optimized) syntax tree instead of running the program")
+    arg_parser.add_argument("--max-depth", type=positive_int, default=None,
+                            help="maximum depth of nested function calls")
+    arg_parser.add_argument("--no-cache", dest="cache", action="store_false",
+                            help="always parse the source instead of loading the syntax tree from __bngcache__")
+    arg_parser.add_argument("--stats", action="store_true",
+                            help="print syntax tree cache hit or miss and the load time to stderr")
+    arg_parser.add_argument("--lazy", action="store_true",
+                            help="parse the body of a function when it is first called (tree engine only)")
+    arg_parser.add_argument("--jobs", type=int, default=1,
+                            help="parse chunks of function definitions in this many processes")
+    arg_parser.add_argument("--check", action="store_true",
+                            help="parse and check the whole program, including unused functions, without running it")
+    args = arg_parser.parse_args()
+    # chunks are parsed from text in other processes, and a lazy parse is serial
+    if args.jobs > 1 and args.source == "mmap":
+        arg_parser.error("--jobs can't be used with --source mmap")
+    if args.jobs > 1 and args.lazy:
+        arg_parser.error("--jobs can't be used with --lazy")
+    # the other engines and modes need every body up front
+    if args.lazy and args.engine != "tree":
+        arg_parser.error(f"--lazy can only be used with --engine tree, not {args.engine}")
+    for option in ["dump_ast", "disassemble", "check"]:
+        if args.lazy and getattr(args, option):
+            arg_parser.error(f"--lazy can't be used with --{option.replace('_', '-')}")
+    return args
+
+
+def parse_program(args, currencies):
+    if args.jobs > 1:
+        with open(args.path_to_file, "r") as file:
+            program = parse_parallel(file.read(), currencies, args.jobs, table_driven=args.scanner == "table")
+    else:
+        with open_source(args.path_to_file, args.source) as source:
+            lexer = Lexer(source, currency_names=currencies, table_driven=args.scanner == "table",
+                          skip_comments=True)
+            program = Parser(lexer, currencies, lazy=args.lazy).parse()
+    if args.optimize:
+        program = optimize_program(program, currencies)
+    return program
 
-    path_to_file = str(sys.argv[1])
 
-    default_exchange_config_path = "eurofxref.csv"
-    path_to_exchange_config = str(sys.argv[2]) if len(sys.argv) == 3 else default_exchange_config_path
+def load_program(args, currencies):
+    start = time.perf_counter()
+    cache = AstCache(args.path_to_file, currencies, args.optimize) if args.cache and not args.lazy else None
+    program = cache.load() if cache else None
+    hit = program is not None
+    if not hit:
+        program = parse_program(args, currencies)
+        if cache:
+            cache.store(program)
+    if args.stats:
+        status = "hit" if hit else "miss" if cache else "disabled"
+        print(f"ast cache: {status}, loaded in {(time.perf_counter() - start) * 1000:.1f}ms", file=sys.stderr)
+    return program
 
-    currencies = get_currency_types(path_to_exchange_config)
-    exchange_rates = get_exchange_rates(path_to_exchange_config)
 
-    with open(path_to_file, "r") as file:
-        try:
-            source = SourceReader(file)
-            lexer = Lexer(source, currency_names=currencies)
-            parser = Parser(lexer)
-            program = parser.parse()
-            interpreter = InterpreterVisitor(exchange_rates)
-            program.accept(interpreter)
-        except Exception as e:
-            print(e)
+if __name__ == '__main__':
+    args = parse_arguments()
+
+    path_to_exchange_config = args.path_to_exchange_rate_file
+
+    currencies = load_exchange_rates(path_to_exchange_config)
+
+    try:
+        program = load_program(args, currencies)
+        if args.check:
+            analyse_program(program)
             sys.exit()
+        if args.dump_ast:
+            print(dump_tree(program))
+            sys.exit()
+        if args.disassemble:
+            analyse_program(program)
+            print(disassemble_program(compile_program(program, currencies)))
+            sys.exit()
+        interpreter = ENGINES[args.engine](currencies, max_depth=args.max_depth)
+        program.accept(interpreter)
+    except Exception as e:
+        print(e)
+        sys.exit()
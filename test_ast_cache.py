@@ -0,0 +1,69 @@
+import io
+import pickle
+
+from Currency.registry import CurrencyRegistry
+from Lexer.lexer import Lexer
+from Parser.parser import Parser
+from Parser.ast_cache import AstCache
+from Source.source import SourceReader
+from Source.source_position import SourcePosition
+
+
+SOURCE = """
+int add(int a, int b) {
+    return a + b;
+}
+
+void main() {
+    cur wallet = 10 PLN;
+    print(add(1, 2));
+}
+"""
+
+
+def parse(text, currencies):
+    lexer = Lexer(SourceReader(io.StringIO(text)), currency_names=currencies)
+    return Parser(lexer, currencies).parse()
+
+
+def write_script(tmp_path, text=SOURCE):
+    path = tmp_path / "script.bng"
+    path.write_text(text)
+    return path
+
+
+def test_cache_miss_then_hit(tmp_path):
+    currencies = CurrencyRegistry({"EUR": 1.0, "PLN": 4.0})
+    path = write_script(tmp_path)
+    cache = AstCache(path, currencies)
+    assert cache.load() is None
+
+    program = parse(SOURCE, currencies)
+    cache.store(program)
+    assert (tmp_path / "__bngcache__" / "script.bng.opt.pickle").exists()
+    loaded = AstCache(path, currencies).load()
+    assert loaded == program
+    assert loaded.functions["add"].block.position == SourcePosition(2, 23)
+
+
+def test_cache_is_invalidated_by_source_currencies_and_optimization(tmp_path):
+    currencies = CurrencyRegistry({"EUR": 1.0, "PLN": 4.0})
+    path = write_script(tmp_path)
+    AstCache(path, currencies).store(parse(SOURCE, currencies))
+
+    assert AstCache(path, CurrencyRegistry({"PLN": 4.0, "EUR": 1.0})).load() is None
+    assert AstCache(path, CurrencyRegistry({"EUR": 1.0, "PLN": 4.5})).load() is None
+    assert AstCache(path, currencies, optimized=False).load() is None
+    write_script(tmp_path, SOURCE.replace("10 PLN", "11 PLN"))
+    assert AstCache(path, currencies).load() is None
+
+
+def test_corrupted_cache_is_a_miss(tmp_path):
+    currencies = CurrencyRegistry({"EUR": 1.0, "PLN": 4.0})
+    path = write_script(tmp_path)
+    cache = AstCache(path, currencies)
+    cache.store(parse(SOURCE, currencies))
+    with open(cache.path, "r+b") as file:
+        file.seek(len(pickle.dumps(cache.key, pickle.HIGHEST_PROTOCOL)) + 10)
+        file.truncate()
+    assert AstCache(path, currencies).load() is None
@@ -0,0 +1,95 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from Currency.currency import Currency
+from Currency.registry import CurrencyRegistry
+from Interpreter.calculations import Calculations
+from Interpreter.semantic_error import SemanticError
+
+
+class Expression:
+    position = None
+
+
+@pytest.fixture
+def registry():
+    return CurrencyRegistry({"EUR": 1.0, "PLN": 4.0})
+
+
+@pytest.fixture
+def calculations(registry):
+    return Calculations(registry)
+
+
+@pytest.mark.parametrize('left, right, operation, expected', [
+    (2, 3, "+", 5),
+    (2.5, 0.5, "-", 2.0),
+    ("ab", 2, "*", "abab"),
+    (2, "ab", "*", "abab"),
+    ("a", "b", "+", "ab"),
+    (3.0, 2.0, "/", 1.5),
+])
+def test_calculate_result(calculations, left, right, operation, expected):
+    assert calculations.calculate_result(left, right, Expression, operation) == expected
+
+
+def test_calculate_result_on_currency(calculations, registry):
+    pln = registry.get_curtype("PLN")
+    assert calculations.calculate_result(Currency(2, pln), 3, Expression, "*") == Currency(6, pln)
+    assert calculations.calculate_result(3, Currency(2, pln), Expression, "*") == Currency(6, pln)
+    assert calculations.calculate_result(Currency(3, pln), 2.0, Expression, "/") == Currency(1.5, pln)
+
+
+@pytest.mark.parametrize('left, right, operator, expected', [
+    (1, 2.0, "<", True),
+    ("a", "a", "==", True),
+    (True, False, "!=", True),
+    (1, 1, ">=", True),
+])
+def test_compare_values(calculations, left, right, operator, expected):
+    assert calculations.compare_values(left, right, operator, Expression) is expected
+
+
+def test_compare_curtypes(calculations, registry):
+    assert calculations.compare_values(registry.get_curtype("PLN"), registry.get_curtype("EUR"), "!=",
+                                       Expression) is True
+
+
+@pytest.mark.parametrize('left, right, operator', [
+    ("a", "b", "<"),
+    (True, 1, "=="),
+    (1, "1", "=="),
+])
+def test_compare_values_wrong_types(calculations, left, right, operator):
+    with pytest.raises(SemanticError) as error:
+        calculations.compare_values(left, right, operator, Expression)
+    assert error.value.message == f"Wrong type for operation, {type(left)} - {type(right)}"
+
+
+@pytest.mark.parametrize('operator, value, expected', [
+    ("-", 0, 0),
+    ("-", 2.5, -2.5),
+    ("!", True, False),
+])
+def test_negate_value(calculations, operator, value, expected):
+    assert calculations.negate_value(operator, value, Expression) == expected
+
+
+def test_negate_value_wrong_type(calculations):
+    with pytest.raises(SemanticError):
+        calculations.negate_value("!", 1, Expression)
+
+
+def test_calculations_shared_between_threads(calculations, registry):
+    pln = registry.get_curtype("PLN")
+    eur = registry.get_curtype("EUR")
+
+    def work(index):
+        left = Currency(index, pln)
+        right = Currency(1, eur)
+        return calculations.calculate_result(left, right, Expression, "+").value
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(work, range(1000)))
+    assert results == [index + 4.0 for index in range(1000)]
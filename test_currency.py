@@ -0,0 +1,102 @@
+import pytest
+import io
+
+from Currency.currency import Currency
+from Currency.registry import CurrencyRegistry
+from Interpreter.calculations import Calculations
+from Lexer.exchange_rate_analyser import load_exchange_rates, get_currency_types, get_exchange_rates
+from Lexer.lexer import Lexer
+from Parser.parser import Parser
+from Source.source import SourceReader
+from Token.token_type import TokenType
+
+
+def test_registry_assigns_dense_ids():
+    registry = CurrencyRegistry({"EUR": 1.0, "USD": 1.25, "PLN": 4.5})
+    assert [registry.get_id(name) for name in ["EUR", "USD", "PLN"]] == [0, 1, 2]
+    assert registry.get_id("JPY") is None
+    assert "PLN" in registry and "JPY" not in registry
+    assert registry.get_rate(registry.get_id("PLN")) == 4.5
+    assert registry.register("USD") == 1
+    assert len(registry) == 3
+
+
+def test_registry_shares_curtype_instances():
+    registry = CurrencyRegistry(["EUR", "PLN"])
+    assert registry.get_curtype("PLN") is registry.get_curtype_by_id(1)
+    assert registry.get_curtype("PLN") == registry.get_curtype("PLN")
+    assert registry.get_curtype("PLN") != registry.get_curtype("EUR")
+
+
+def test_registry_checks_stored_currency_id_against_name():
+    registry = CurrencyRegistry(["EUR", "PLN"])
+    assert registry.get_curtype("PLN", 1) is registry.get_curtype_by_id(1)
+    assert registry.get_curtype("PLN", 0) is registry.get_curtype_by_id(1)
+    assert registry.get_curtype("EUR", 7) is registry.get_curtype_by_id(0)
+    with pytest.raises(ValueError):
+        registry.get_curtype("JPY", 0)
+
+
+def test_lexer_and_parser_resolve_currency_ids():
+    registry = CurrencyRegistry(["EUR", "PLN"])
+    lexer = Lexer(SourceReader(io.StringIO("void main() { cur a = 10 pln; curtype b = EUR; }")),
+                  currency_names=registry)
+    program = Parser(lexer, registry).parse()
+    cur_const, curtype_const = [statement.expression for statement in program.functions["main"].block.statements]
+    assert (cur_const.type, cur_const.currency_id) == ("PLN", 1)
+    assert (curtype_const.value, curtype_const.currency_id) == ("EUR", 0)
+
+
+def test_lexer_accepts_registry():
+    registry = CurrencyRegistry(["USD"])
+    token = Lexer(SourceReader(io.StringIO("usd")), currency_names=registry).get_next_token()
+    assert token.type == TokenType.CURTYPE_CONST
+    assert token.value == "USD"
+
+
+class Position:
+    position = None
+
+
+def test_calculations_convert_by_currency_id():
+    registry = CurrencyRegistry({"EUR": 1.0, "PLN": 4.0})
+    calculations = Calculations(registry)
+    eur = Currency(1, registry.get_curtype("EUR"))
+    pln = Currency(4, registry.get_curtype("PLN"))
+    assert calculations.calculate_result(pln, eur, Position, "+") == Currency(8, registry.get_curtype("PLN"))
+    assert calculations.compare_values(eur, pln, "==", Position) is True
+
+
+def test_load_exchange_rates_parses_names_and_rates(tmp_path):
+    path = tmp_path / "rates.csv"
+    path.write_text("EUR, USD, PLN,\n1.0, 1.25, 4.5,\n")
+    currencies = load_exchange_rates(path)
+    assert list(currencies) == ["EUR", "USD", "PLN"]
+    assert get_currency_types(path) == ["EUR", "USD", "PLN"]
+    assert get_exchange_rates(path) == {"EUR": 1.0, "USD": 1.25, "PLN": 4.5}
+
+
+def test_load_exchange_rates_is_cached_until_file_changes(tmp_path):
+    path = tmp_path / "rates.csv"
+    path.write_text("EUR, USD,\n1.0, 1.25,\n")
+    currencies = load_exchange_rates(path)
+    assert load_exchange_rates(str(path)) is currencies
+
+    path.write_text("EUR, USD, PLN,\n1.0, 1.25, 4.5,\n")
+    reloaded = load_exchange_rates(path)
+    assert reloaded is not currencies
+    assert "PLN" in reloaded
+
+
+def test_calculations_cross_rates_match_conversion_through_base_currency():
+    rates = {"EUR": 1.0, "USD": 1.0653, "PLN": 4.33}
+    registry = CurrencyRegistry(rates)
+    calculations = Calculations(registry)
+    pln = Currency(100, registry.get_curtype("PLN"))
+    usd = Currency(20, registry.get_curtype("USD"))
+    expected = (100 / 4.33 + 20 / 1.0653) * 4.33
+    result = calculations.calculate_result(pln, usd, Position, "+")
+    assert result.type == registry.get_curtype("PLN")
+    assert abs(result.value - expected) < 1e-9
+    assert calculations.compare_values(pln, usd, ">", Position) is True
+    assert calculations.compare_values(usd, pln, "<", Position) is True
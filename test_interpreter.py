@@ -0,0 +1,274 @@
+import io
+import glob
+
+import pytest
+
+from Lexer.lexer import Lexer
+from Lexer.exchange_rate_analyser import load_exchange_rates
+from Parser.parser import Parser
+from Source.source import SourceReader
+from Visitor.interpreter_visitor import InterpreterVisitor
+from Interpreter.closure_compiler import ClosureInterpreter
+from Interpreter.virtual_machine import VirtualMachine
+from Interpreter.analysis import analyse_program
+from Interpreter.bytecode import Opcode, compile_program, disassemble_program
+from Context.frame_stack import FrameStack
+from Interpreter.reference import Reference
+from Interpreter.semantic_error import SemanticError
+from Interpreter.type_checker import TypeChecker
+from Parse_objects.objects import AddExpression, BuiltInFunction, Block
+
+
+ENGINES = [ClosureInterpreter, VirtualMachine]
+
+
+def run(text, engine, capsys, monkeypatch):
+    monkeypatch.setattr("builtins.input", lambda prompt: print(prompt, end="") or "5")
+    currencies = load_exchange_rates("eurofxref.csv")
+    try:
+        lexer = Lexer(SourceReader(io.StringIO(text)), currency_names=currencies)
+        program = Parser(lexer, currencies).parse()
+        program.accept(engine(currencies))
+    except Exception as e:
+        print(e)
+    return capsys.readouterr().out
+
+
+def read(path):
+    with open(path, "r") as file:
+        return file.read()
+
+
+PROGRAMS = {
+    "recursion": """
+        int fib(int n) {
+            if n < 2 { return n; }
+            return fib(n - 1) + fib(n - 2);
+        }
+        void main() { print(fib(8)); }
+    """,
+    "scopes": """
+        void main() {
+            int a = 1;
+            if true { int a = 2; a += 3; print(a); }
+            print(a);
+            int i = 0;
+            while i < 3 { i += 1; if i == 2 { print("two"); } elif i == 3 { print("three"); } else { print(i); } }
+        }
+    """,
+    "references": """
+        void change(int a, str b, cur c) { a += 1; b = "changed"; c = c + 10 USD; }
+        void main() {
+            int a = 1; str b = "b"; cur c = 10 USD;
+            change(a, b, c);
+            print(a); print(b); print(c);
+            change(a + 1, "x", 1 EUR);
+            print(a);
+        }
+    """,
+    "wallet": """
+        void main() {
+            dict wallet = {"a": 10 PLN, "b": 2 EUR, "c": 5 USD};
+            for account in wallet.get(EUR) { print(account.name); account.value.set_value(7); }
+            for account in wallet { print(account.value); }
+            cur x = 100 PLN;
+            cur y = 10 EUR;
+            from x -> 10 PLN -> y;
+            from x -> 1 EUR;
+            from 2 EUR -> y;
+            print(x); print(y);
+            print(x > y); print(-x); print(!(x == x)); print(x.type == PLN); print(USD != EUR);
+            print(to_str(2 * 3 PLN / 2));
+        }
+    """,
+    "errors_undeclared": "void main() { print(b); }",
+    "errors_types": "void main() { int a = 1; a = \"x\"; }",
+    "errors_add": "void main() { int a = 1 + 1.0; }",
+    "errors_redeclaration": "void main() { int a = 1; str a = \"x\"; }",
+    "errors_arguments": "int f(int a) { return a; } void main() { f(1, 2); }",
+    "errors_parameter": "int f(int a) { return a; } void main() { f(\"1\"); }",
+    "errors_return": "int f() { return \"a\"; } void main() { f(); }",
+    "errors_builtin": "void main() { int a = to_int(\"x\"); }",
+    "errors_missing_function": "void main() { g(); }",
+    "errors_main": "int main() { return 1; }",
+    "errors_dict": "void main() { dict d = {\"a\": 1 PLN, \"a\": 2 PLN}; }",
+    "errors_transfer": "void main() { cur a = 1 PLN; from a -> 1; }",
+    "errors_negation": "void main() { bool a = !1; }",
+}
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+@pytest.mark.parametrize('path', sorted(glob.glob("test_files/interpreter/*.bng")))
+def test_engine_matches_tree_walker_on_test_files(path, engine, capsys, monkeypatch):
+    text = read(path)
+    assert run(text, engine, capsys, monkeypatch) == run(text, InterpreterVisitor, capsys, monkeypatch)
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+@pytest.mark.parametrize('name', list(PROGRAMS))
+def test_engine_matches_tree_walker(name, engine, capsys, monkeypatch):
+    text = PROGRAMS[name]
+    expected = run(text, InterpreterVisitor, capsys, monkeypatch)
+    assert expected
+    assert run(text, engine, capsys, monkeypatch) == expected
+
+
+def compile_text(text):
+    currencies = load_exchange_rates("eurofxref.csv")
+    lexer = Lexer(SourceReader(io.StringIO(text)), currency_names=currencies)
+    program = Parser(lexer, currencies).parse()
+    analyse_program(program)
+    return compile_program(program, currencies)
+
+
+def test_bytecode_is_linear_array():
+    compiled = compile_text(PROGRAMS["recursion"])
+    fib = compiled.functions["fib"]
+    assert fib.code.typecode == "i"
+    assert len(fib.code) == 2 * len(fib.positions)
+    assert Opcode(fib.code[-2]) is Opcode.RETURN_END
+
+
+def test_bytecode_constant_pool_is_shared():
+    compiled = compile_text("void main() { int a = 2; a = 2; a += 2; }")
+    assert compiled.functions["main"].constants.count(2) == 1
+
+
+def test_disassemble():
+    text = disassemble_program(compile_text("void main() { cur a = 1 PLN; if a > 0 EUR { print(a); } }"))
+    assert text.splitlines()[0] == "function main()"
+    assert "LOAD_CURRENCY" in text
+    assert "COMPARE" in text and "(>)" in text
+    assert "POP_JUMP_IF_FALSE" in text and "(to " in text
+    assert "CALL" in text and "('print', 1, False)" in text
+
+
+def test_frame_stack_reuses_cleared_frames():
+    frames = FrameStack(2)
+    frame = frames.push()
+    frame.variables[1] = "value"
+    frame.expected_return_type = int
+    frames.pop()
+    assert len(frames) == 0
+    reused = frames.push()
+    assert reused is frame
+    assert reused.variables == [None, None]
+    assert reused.expected_return_type is None
+    assert frames.push() is not frame
+    assert len(frames) == 2
+
+
+def test_recursive_calls_do_not_share_frames(capsys, monkeypatch):
+    text = """
+        int depth(int n) { int local = n; if n > 0 { depth(n - 1); } return local; }
+        void main() { print(to_str(depth(3))); }
+    """
+    assert run(text, InterpreterVisitor, capsys, monkeypatch) == "3\n"
+
+
+DEEP_RECURSION = """
+    int down(int n) { if n == 0 { return 0; } return down(n - 1); }
+    void main() { print(to_str(down(%d))); }
+"""
+
+
+def test_vm_recursion_is_not_limited_by_python_stack(capsys, monkeypatch):
+    assert run(DEEP_RECURSION % 20000, VirtualMachine, capsys, monkeypatch) == "0\n"
+
+
+@pytest.mark.parametrize('engine', [InterpreterVisitor, ClosureInterpreter, VirtualMachine])
+def test_max_depth(engine, capsys, monkeypatch):
+    def limited(exchange_rates):
+        return engine(exchange_rates, max_depth=4)
+
+    assert run(DEEP_RECURSION % 2, limited, capsys, monkeypatch) == "0\n"
+    assert run(DEEP_RECURSION % 3, limited, capsys, monkeypatch) == \
+        "SemanticError: Ln 2 Col 54 : Maximum recursion depth of 4 calls exceeded\n"
+
+
+def test_max_depth_below_one_fails_the_same_in_every_engine(capsys, monkeypatch):
+    outputs = [run(DEEP_RECURSION % 3, lambda exchange_rates: engine(exchange_rates, max_depth=0), capsys, monkeypatch)
+               for engine in [InterpreterVisitor, ClosureInterpreter, VirtualMachine]]
+    assert "Maximum recursion depth of 0 calls exceeded" in outputs[0]
+    assert outputs == [outputs[0]] * 3
+
+
+def test_closure_depth_is_restored_after_an_error(capsys, monkeypatch):
+    currencies = load_exchange_rates("eurofxref.csv")
+    text = DEEP_RECURSION.replace("%d", "to_int(input(\"\"))")
+    program = Parser(Lexer(SourceReader(io.StringIO(text)), currency_names=currencies), currencies).parse()
+    interpreter = ClosureInterpreter(currencies, max_depth=4)
+    monkeypatch.setattr("builtins.input", lambda prompt: "9")
+    with pytest.raises(SemanticError):
+        program.accept(interpreter)
+    monkeypatch.setattr("builtins.input", lambda prompt: "2")
+    program.accept(interpreter)
+    assert capsys.readouterr().out == "0\n"
+
+
+def test_return_expression_is_evaluated_once(capsys, monkeypatch):
+    text = """
+        int f() { print("f"); return 1; }
+        int g() { return f(); }
+        void main() { g(); }
+    """
+    for engine in [InterpreterVisitor, *ENGINES]:
+        assert run(text, engine, capsys, monkeypatch) == "f\n"
+
+
+@pytest.mark.parametrize('engine', [InterpreterVisitor, ClosureInterpreter, VirtualMachine])
+def test_method_call_statement_returning_a_tuple_does_not_return(engine, capsys, monkeypatch):
+    text = """
+        void main() { float f = 1.5; f.as_integer_ratio(); print("after"); }
+    """
+    assert run(text, engine, capsys, monkeypatch) == "after\n"
+
+
+def test_reference_is_slotted_cell():
+    reference = Reference(1)
+    assert not hasattr(reference, "__dict__")
+    with pytest.raises(AttributeError):
+        reference.other = 2
+
+
+def test_tree_walker_temporaries_are_unboxed():
+    currencies = load_exchange_rates("eurofxref.csv")
+    lexer = Lexer(SourceReader(io.StringIO("void main() { print(to_str(1 + 2 * 3)); }")), currency_names=currencies)
+    program = Parser(lexer, currencies).parse()
+    argument = program.functions["main"].block.statements[0].objects[0].arguments[0].objects[0].arguments[0]
+    assert argument.accept(InterpreterVisitor(currencies)) == 7
+
+
+def test_handlers_table_matches_accept():
+    handlers = InterpreterVisitor.handlers
+    assert handlers[AddExpression] is InterpreterVisitor.visit_add_expression
+    assert handlers[BuiltInFunction] is InterpreterVisitor.visit_external_function
+    assert TypeChecker.handlers[Block] is TypeChecker.visit_block
+    currencies = load_exchange_rates("eurofxref.csv")
+    lexer = Lexer(SourceReader(io.StringIO("void main() { print(to_str(1 + 2 * 3)); }")), currency_names=currencies)
+    program = Parser(lexer, currencies).parse()
+    argument = program.functions["main"].block.statements[0].objects[0].arguments[0].objects[0].arguments[0]
+    assert InterpreterVisitor(currencies).visit(argument) == 7
+
+
+def test_lazy_tree_walker_parses_only_called_functions(capsys, monkeypatch):
+    text = """
+int wide(int a) {
+    int b = a + 1; int c = b + 1; int d = c + 1; int e = d + 1;
+    return e;
+}
+
+int unused() {
+    return 1 + ;
+}
+
+void main() {
+    print(to_str(wide(wide(1))));
+}
+"""
+    currencies = load_exchange_rates("eurofxref.csv")
+    program = Parser(Lexer(SourceReader(io.StringIO(text)), currency_names=currencies), currencies, lazy=True).parse()
+    program.accept(InterpreterVisitor(currencies))
+    assert capsys.readouterr().out == "9\n"
+    assert program.functions["wide"].block is not None
+    assert program.functions["unused"].block is None
@@ -3,11 +3,15 @@ import io
 import pytest
 
 from Lexer.lexer import Lexer
-from Parser.parser import Parser
+from Parser.parser import Parser, ParserError, parse_function_body
+from Parser.parallel_parser import parse_parallel, split_chunks
 from Source.source import SourceReader
 from Source.source_position import SourcePosition
 from Parse_objects.objects import DocumentObjectModel
+from Token.token_type import TokenType
 from Parse_objects.objects import (
+    Expression,
+    ObjectAccess,
     Block,
     Parameter,
     FunctionDefinition,
@@ -64,3 +68,131 @@ class TestLexerParser:
         lexer = Lexer(source)
         parser = Parser(lexer)
         assert parser.parse() == expected_tree
+
+
+LAZY_SOURCE = """
+int twice(int a) {
+    dict d = {"a": 1.5};
+    if a > 0 { return a * 2; }
+    return 0;
+}
+
+void main() { print(to_str(twice(2))); }
+"""
+
+
+def test_lazy_parser_keeps_body_tokens_until_parsed():
+    eager = Parser(Lexer(SourceReader(io.StringIO(LAZY_SOURCE)))).parse()
+    lazy = Parser(Lexer(SourceReader(io.StringIO(LAZY_SOURCE))), lazy=True).parse()
+    function = lazy.functions["twice"]
+    assert function.block is None
+    assert function.params == eager.functions["twice"].params
+    parse_function_body(function)
+    assert function.block == eager.functions["twice"].block
+    assert function.body_tokens is None
+
+
+def test_lazy_parser_reports_syntax_errors_when_body_is_parsed():
+    source = "int broken() { return 1 + ; }\nvoid main() {}"
+    program = Parser(Lexer(SourceReader(io.StringIO(source))), lazy=True).parse()
+    with pytest.raises(ParserError) as error:
+        parse_function_body(program.functions["broken"])
+    assert str(error.value) == "ParserError: Ln 1 Col 25 : Missing expression after PLUS."
+    with pytest.raises(ParserError):
+        Parser(Lexer(SourceReader(io.StringIO("void main() { print(1);"))), lazy=True).parse()
+
+
+def serial_or_error(text):
+    try:
+        return Parser(Lexer(SourceReader(io.StringIO(text)))).parse()
+    except Exception as error:
+        return str(error)
+
+
+def parallel_or_error(text, jobs):
+    try:
+        return parse_parallel(text, None, jobs)
+    except Exception as error:
+        return str(error)
+
+
+FUNCTIONS = "".join(f"""
+# {{ comment with a brace
+int f{index}(int a) {{
+    str s = "}} in a string \\" {{";
+    dict d = {{"a": 1.5}};
+    if a > {index} {{ return a; }}
+    return {index};
+}}""" for index in range(12))
+
+
+@pytest.mark.parametrize('text', [
+    FUNCTIONS + "\nvoid main() {}\n",
+    FUNCTIONS + " void main() { int x = 1; } int g() { return 2; }",
+    FUNCTIONS.replace("int f7(int a)", "int f2(int a)"),
+    FUNCTIONS.replace("return 9;", "return 9 +;"),
+    FUNCTIONS.replace("return 4;", "return 4;}"),
+    FUNCTIONS.replace("return 6;", "return 6; $"),
+    FUNCTIONS.replace("int f5(int a) {", "f5(int a) {"),
+    FUNCTIONS.replace("int f3(int a) {", "int f3(int a) {{"),
+    "",
+])
+def test_parallel_parse_matches_serial_parse(text):
+    assert len(list(split_chunks(text, 8))) > 1 or len(text) < 100
+    expected = serial_or_error(text)
+    assert parallel_or_error(text, 2) == expected
+    if not isinstance(expected, str):
+        assert [function.block.position for function in expected.functions.values()] == \
+               [function.block.position for function in parse_parallel(text, None, 2).functions.values()]
+
+
+def shape(node):
+    if isinstance(node, Expression):
+        return (type(node).__name__, shape(node.left), shape(node.right))
+    if isinstance(node, ObjectAccess):
+        return node.objects[0].name
+    return getattr(node, "value", node)
+
+
+@pytest.mark.parametrize('source, expected_shape, next_token', [
+    ("1 - 2 * 3 / a + b", ("AddExpression", ("SubExpression", 1, ("DivExpression", ("MulExpression", 2, 3), "a")),
+                           "b"), TokenType.END_OF_FILE),
+    ("a || b && !c + 1 < -d || e", ("OrExpression", ("OrExpression", "a", ("AndExpression", "b", (
+        "NegatedExpression", "!", ("LessRelation", ("AddExpression", "c", 1), ("NegatedExpression", "-", "d"))))),
+        "e"), TokenType.END_OF_FILE),
+    ("(a || b) * 2 == c", ("EqualRelation", ("MulExpression", ("OrExpression", "a", "b"), 2), "c"),
+     TokenType.END_OF_FILE),
+    ("a < b < c", ("LessRelation", "a", "b"), TokenType.LESS),
+    ("!a == b && c", ("AndExpression", ("NegatedExpression", "!", ("EqualRelation", "a", "b")), "c"),
+     TokenType.END_OF_FILE),
+])
+def test_expression_precedence(source, expected_shape, next_token):
+    parser = Parser(Lexer(SourceReader(io.StringIO(source))))
+    assert shape(parser._parse_expression()) == expected_shape
+    assert parser.token.type == next_token
+
+
+@pytest.mark.parametrize('skip_comments', [False, True])
+def test_long_comment_header(skip_comments):
+    source = "# header\n" * 5000 + "void main() {\n# inside\n}\n"
+    lexer = Lexer(SourceReader(io.StringIO(source)), skip_comments=skip_comments)
+    program = Parser(lexer).parse()
+    assert program.functions["main"].position == SourcePosition(5001, 1)
+
+
+def test_peek_does_not_consume_tokens():
+    source = "a # comment\n . b ( 1 ) ;"
+    parser = Parser(Lexer(SourceReader(io.StringIO(source))))
+    assert parser.peek(0) is parser.token
+    assert [parser.peek(k).type for k in (2, 1, 4, 3)] == [
+        TokenType.IDENTIFIER, TokenType.DOT, TokenType.INT_CONST, TokenType.LEFT_BRACKET]
+    tokens = []
+    while parser.token.type != TokenType.END_OF_FILE:
+        tokens.append(parser.token.type)
+        parser.consume_token()
+        parser.peek(1)
+    assert tokens == [TokenType.IDENTIFIER, TokenType.DOT, TokenType.IDENTIFIER, TokenType.LEFT_BRACKET,
+                      TokenType.INT_CONST, TokenType.RIGHT_BRACKET, TokenType.SEMICOLON]
+    assert parser.peek(4).type == TokenType.END_OF_FILE
+    with pytest.raises(ValueError):
+        parser.peek(5)
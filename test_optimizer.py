@@ -0,0 +1,216 @@
+import io
+import glob
+
+import pytest
+
+from Lexer.lexer import Lexer
+from Lexer.exchange_rate_analyser import load_exchange_rates
+from Parser.parser import Parser
+from Source.source import SourceReader
+from Currency.currency import Currency
+from Currency.registry import to_registry
+from Interpreter.calculations import Calculations
+from Interpreter.semantic_error import SemanticError
+from Interpreter.optimizer import optimize_program
+from Interpreter import analysis
+from Interpreter.closure_compiler import ClosureInterpreter
+from Interpreter.virtual_machine import VirtualMachine
+from Visitor.interpreter_visitor import InterpreterVisitor
+from Parse_objects.dump import dump_tree
+from Parse_objects.objects import (
+    IntConst,
+    FloatConst,
+    StrConst,
+    BoolConst,
+    CurConst,
+    CurtypeConst,
+    DivExpression,
+    AddExpression,
+    MulExpression,
+    AndExpression,
+    ObjectAccess,
+    IfStatement
+)
+
+
+CURRENCIES = load_exchange_rates("eurofxref.csv")
+
+
+def parse(text):
+    lexer = Lexer(SourceReader(io.StringIO(text)), currency_names=CURRENCIES)
+    return Parser(lexer, CURRENCIES).parse()
+
+
+def optimize(text):
+    return optimize_program(parse(text), CURRENCIES)
+
+
+def main_statements(text):
+    return optimize(text).functions["main"].block.statements
+
+
+def folded(expression):
+    return main_statements(f"void main() {{ print({expression}); }}")[0].objects[0].arguments[0]
+
+
+def literal(expression):
+    return type(expression), expression.value
+
+
+@pytest.mark.parametrize('expression, expected', [
+    ("2 * 3 + 4", (IntConst, 10)),
+    ("1.5 - 0.5", (FloatConst, 1.0)),
+    ("\"ab\" + \"c\"", (StrConst, "abc")),
+    ("\"ab\" * 2", (StrConst, "abab")),
+    ("1 < 2", (BoolConst, True)),
+    ("1 == 1.0", (BoolConst, True)),
+    ("PLN != EUR", (BoolConst, True)),
+    ("-(3 - 5)", (IntConst, 2)),
+    ("!(1 > 2)", (BoolConst, True)),
+    ("false && 1 > 0", (BoolConst, False)),
+    ("true || 1 > 0", (BoolConst, True)),
+    ("true && 2 > 1", (BoolConst, True)),
+    ("2 PLN * 3", (CurConst, 6.0)),
+    ("-(2 PLN)", (CurConst, -2.0)),
+])
+def test_fold_literals(expression, expected):
+    assert literal(folded(expression)) == expected
+
+
+def test_fold_currency_conversion_uses_rates():
+    registry = to_registry(CURRENCIES)
+    eur = registry.get_curtype("EUR")
+    five_pln_in_eur = Calculations(registry).convert(Currency(5, registry.get_curtype("PLN")), eur)
+    expression = folded("10 EUR + 5 PLN")
+    assert type(expression) is CurConst
+    assert expression.type == "EUR"
+    assert expression.currency_id == eur.id
+    assert expression.value == pytest.approx(10 + five_pln_in_eur)
+
+
+def test_fold_keeps_position():
+    expression = folded("1 + 2")
+    assert expression.position.line == 1
+    assert expression.position.column == 23
+
+
+@pytest.mark.parametrize('expression, expected_type', [
+    ("1.0 / 0.0", DivExpression),
+    ("999999999999999 * 999999999999999", MulExpression),
+    ("true && to_int(\"1\")", AndExpression),
+    ("1 + to_int(\"1\")", AddExpression),
+    ("EUR", CurtypeConst),
+    ("\"abcdefgh\" * 400000000", MulExpression),
+    ("2 * (\"ab\" * 2000) * 2", MulExpression),
+])
+def test_not_folded(expression, expected_type):
+    assert type(folded(expression)) is expected_type
+
+
+def test_fold_inside_variable_expression():
+    expression = main_statements("void main() { int a = 1; print(a + (2 * 3)); }")[1].objects[0].arguments[0]
+    assert type(expression) is AddExpression
+    assert literal(expression.right) == (IntConst, 6)
+
+
+def test_dead_branches_are_dropped():
+    statements = main_statements("""
+        void main() {
+            int a = 1;
+            if 1 > 2 { print("a"); } elif a > 0 { print("b"); } elif false { print("c"); } else { print("d"); }
+        }
+    """)
+    if_statement = statements[1]
+    assert type(if_statement) is IfStatement
+    assert if_statement.elif_blocks == []
+    assert if_statement.else_block.statements[0].objects[0].arguments[0].value == "d"
+
+
+def test_true_branch_becomes_else():
+    statements = main_statements("""
+        void main() {
+            int a = 1;
+            if a > 0 { print("a"); } elif true { print("b"); } else { print("c"); }
+        }
+    """)
+    assert statements[1].else_block.statements[0].objects[0].arguments[0].value == "b"
+
+
+def test_taken_branch_is_inlined():
+    statements = main_statements("void main() { if 1 == 1 { print(\"a\"); } else { print(\"b\"); } print(\"c\"); }")
+    assert [type(statement) for statement in statements] == [ObjectAccess, ObjectAccess]
+    assert statements[0].objects[0].arguments[0].value == "a"
+
+
+def test_taken_branch_with_declarations_keeps_scope():
+    statements = main_statements("void main() { int a = 1; if true { int a = 2; print(a); } print(a); }")
+    assert type(statements[1]) is IfStatement
+    assert literal(statements[1].condition) == (BoolConst, True)
+
+
+def test_never_taken_if_is_removed():
+    assert main_statements("void main() { if false { print(\"a\"); } }") == []
+
+
+def test_errors_in_dead_code_are_reported():
+    with pytest.raises(SemanticError):
+        optimize("void main() { if false { print(b); } }")
+
+
+PROGRAMS = [
+    "void main() { int a = 1; if true { int a = 2; print(a); } print(a); }",
+    "void main() { if 2 > 1 && PLN != EUR { print(to_str(2 PLN * 3 + 1 EUR)); } else { print(\"no\"); } }",
+    "int f(int n) { if false { return 0; } return n * (2 + 3); } void main() { print(to_str(f(2))); }",
+    "void main() { print(to_str(1.0 / 0.0)); }",
+    "void main() { int a = 0; if a > 1 { str s = \"abcdefgh\" * 400000000; print(s); } print(\"done\"); }",
+    "void main() { float a = 0.0; float b = -0.0; print(to_str(a)); print(to_str(b)); }",
+]
+
+
+def run(text, engine, optimized, capsys, monkeypatch):
+    monkeypatch.setattr("builtins.input", lambda prompt: print(prompt, end="") or "5")
+    try:
+        program = optimize(text) if optimized else parse(text)
+        program.accept(engine(CURRENCIES))
+    except Exception as e:
+        print(e)
+    return capsys.readouterr().out
+
+
+@pytest.mark.parametrize('engine', [InterpreterVisitor, ClosureInterpreter, VirtualMachine])
+@pytest.mark.parametrize('text', PROGRAMS + [open(path).read()
+                                             for path in sorted(glob.glob("test_files/interpreter/*.bng"))])
+def test_optimized_program_output_matches(text, engine, capsys, monkeypatch):
+    expected = run(text, engine, False, capsys, monkeypatch)
+    assert run(text, engine, True, capsys, monkeypatch) == expected
+
+
+@pytest.mark.parametrize('engine', [ClosureInterpreter, VirtualMachine])
+def test_folded_negative_zero_is_a_separate_constant(engine, capsys, monkeypatch):
+    text = "void main() { float a = 0.0; float b = -0.0; print(to_str(a)); print(to_str(b)); }"
+    expected = run(text, InterpreterVisitor, True, capsys, monkeypatch)
+    assert expected == "0.0\n-0.0\n"
+    assert run(text, engine, True, capsys, monkeypatch) == expected
+
+
+@pytest.mark.parametrize('engine', [InterpreterVisitor, ClosureInterpreter, VirtualMachine])
+def test_optimized_program_is_analysed_once(engine, capsys, monkeypatch):
+    calls = []
+    check_program = analysis.check_program
+    monkeypatch.setattr(analysis, "check_program", lambda *args: calls.append(1) or check_program(*args))
+    optimize("void main() { int a = 2 * 3; print(to_str(a)); }").accept(engine(CURRENCIES))
+    assert capsys.readouterr().out == "6\n"
+    assert len(calls) == 1
+
+
+def test_dump_tree():
+    text = dump_tree(optimize("void main() { int a = 2 * 3; }"))
+    assert text.splitlines() == [
+        "Program",
+        "  main: FunctionDefinition name='main' type=VOID params=[]",
+        "    block: Block",
+        "      statements: [1]",
+        "        Assignment",
+        "          object: Declaration type=INT name='a'",
+        "          expression: IntConst value=6",
+    ]
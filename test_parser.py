@@ -2317,3 +2317,14 @@ class TestParser:
         else:
             result = parser._parse_arguments()
             assert result == expected_result
+
+
+def test_nodes_are_slotted_and_keep_packed_positions():
+    node = IntConst(position=SourcePosition(line=3000, column=17), value=1)
+    assert not hasattr(node, "__dict__")
+    assert type(IntConst.__slots__) is tuple and "position" not in IntConst.__slots__
+    assert node.position == SourcePosition(line=3000, column=17)
+    assert str(node.position) == "Ln 3000 Col 17"
+    wide = SourcePosition(line=1, column=1 << 21)
+    assert IntConst(position=wide, value=1).position is wide
+    assert Block(position=None, statements=[]).position is None
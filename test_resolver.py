@@ -0,0 +1,87 @@
+import io
+
+import pytest
+
+from Lexer.lexer import Lexer
+from Parser.parser import Parser
+from Source.source import SourceReader
+from Interpreter.resolver import resolve_program
+from Interpreter.semantic_error import SemanticError
+from Visitor.interpreter_visitor import InterpreterVisitor
+from Interpreter.closure_compiler import ClosureInterpreter
+from Interpreter.virtual_machine import VirtualMachine
+
+
+CURRENCIES = ["PLN", "EUR"]
+
+
+def parse(text):
+    lexer = Lexer(SourceReader(io.StringIO(text)), currency_names=CURRENCIES)
+    return Parser(lexer, CURRENCIES).parse()
+
+
+def resolve(text):
+    program = parse(text)
+    resolve_program(program, [*program.functions, "print"])
+    return program
+
+
+def test_slots_are_flat_per_function():
+    program = resolve("int f(int a, int b) { int c = a; if c > 0 { int d = b; } return c; }")
+    function = program.functions["f"]
+    assert [parameter.slot for parameter in function.params] == [0, 1]
+    declaration = function.block.statements[0].object
+    inner_declaration = function.block.statements[1].block.statements[0].object
+    assert (declaration.slot, inner_declaration.slot) == (2, 3)
+    assert function.frame_size == 4
+
+
+def test_identifiers_point_to_their_declaration():
+    program = resolve("void main() { int a = 1; if true { int a = 2; print(a); } print(a); }")
+    statements = program.functions["main"].block.statements
+    inner_print = statements[1].block.statements[1].objects[0]
+    outer_print = statements[2].objects[0]
+    assert inner_print.arguments[0].objects[0].slot == 1
+    assert outer_print.arguments[0].objects[0].slot == 0
+
+
+def test_functions_are_not_slots():
+    program = resolve("void main() { print(print); }")
+    argument = program.functions["main"].block.statements[0].objects[0].arguments[0].objects[0]
+    assert argument.slot is None
+
+
+def test_loop_variable_lives_in_enclosing_scope():
+    program = resolve("void main() { dict d = {}; for e in d { } print(e); }")
+    statements = program.functions["main"].block.statements
+    assert statements[2].objects[0].arguments[0].objects[0].slot == statements[1].slot
+
+
+@pytest.mark.parametrize('text, message', [
+    ("void main() { print(b); }", "Ln 1 Col 21 : 'b' was not declared in this scope"),
+    ("void main() { b = 1; }", "Ln 1 Col 15 : Undefined variable."),
+    ("void main() { b += 1; }", "Ln 1 Col 15 : Undefined variable b"),
+    ("void main() { int a = 1; if false { int c = 1; int c = 2; } }", "Ln 1 Col 48 : Redeclaration of a variable c"),
+    ("void main() { int a = a; }", "Ln 1 Col 23 : 'a' was not declared in this scope"),
+    ("void f() { print(x); } void main() { }", "Ln 1 Col 18 : 'x' was not declared in this scope"),
+    ("void main() { float f = 1.5; f.real = 2.0; }",
+     "Ln 1 Col 30 : Expected a variable on the left side of the assignment."),
+    ("void main() { float f = 1.5; f.real += 2.0; }",
+     "Ln 1 Col 30 : Expected a variable on the left side of the assignment."),
+])
+def test_resolve_errors(text, message):
+    with pytest.raises(SemanticError) as error:
+        resolve(text)
+    assert str(error.value) == f"SemanticError: {message}"
+
+
+@pytest.mark.parametrize('engine', [InterpreterVisitor, ClosureInterpreter, VirtualMachine])
+@pytest.mark.parametrize('text', [
+    "void main() { print(\"start\"); int a = 1; str a = \"x\"; }",
+    "void main() { print(\"start\"); float f = 1.5; f.real = 2.0; }",
+])
+def test_errors_reported_before_execution(engine, text, capsys):
+    program = parse(text)
+    with pytest.raises(SemanticError):
+        program.accept(engine(CURRENCIES))
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,99 @@
+import io
+
+import pytest
+
+from Lexer.lexer import Lexer
+from Lexer.lexer_error import LexerError
+from Source.source import SourceReader
+from Source.mmap_source import MmapSourceReader
+from Token.token_type import TokenType
+from Source.source_position import SourcePosition
+
+
+def read_all(source):
+    result = []
+    while (char := source.get_char()) != chr(3):
+        result.append((char, source.get_position()))
+        source.next_char()
+    return result, source.get_position()
+
+
+@pytest.mark.parametrize('buffer_size', [1, 2, 3, 7, 64 * 1024])
+def test_buffer_size_does_not_change_chars_and_positions(buffer_size):
+    text = "int a = 2;\n\nstr b = \"ala\";\n  # komentarz\n"
+    expected = read_all(SourceReader(io.StringIO(text), buffer_size=1))
+    assert read_all(SourceReader(io.StringIO(text), buffer_size=buffer_size)) == expected
+
+
+def test_empty_source():
+    source = SourceReader(io.StringIO(""), buffer_size=4)
+    assert source.get_char() == chr(3)
+    assert source.get_position() == SourcePosition(1, 1)
+    source.next_char()
+    assert source.get_char() == chr(3)
+
+
+def test_position_after_newline_across_buffers():
+    source = SourceReader(io.StringIO("ab\ncd"), buffer_size=2)
+    chars, end = read_all(source)
+    assert chars[3] == ("c", SourcePosition(2, 1))
+    assert end == SourcePosition(2, 3)
+
+
+def lex_all(source):
+    lexer = Lexer(source, currency_names=["PLN", "EUR"])
+    tokens = []
+    while (token := lexer.get_next_token()).type != TokenType.END_OF_FILE:
+        tokens.append(token)
+    tokens.append(token)
+    return tokens
+
+
+@pytest.mark.parametrize('text', [
+    '',
+    'void main() {\n    cur a = 10.5 pln;\n    str b = "zażółć \\"gęślą\\" jaźń";\n}\n',
+    'int x_1 = 2; # komentarz ąę\r\nstr s = "a\\tb\\n";\r\n',
+    'dict wallet = {"oszczędności": 2000 PLN};',
+])
+def test_mmap_source_matches_stream_source(tmp_path, text):
+    path = tmp_path / "program.bng"
+    path.write_bytes(text.encode("utf-8"))
+    with open(path, "r", encoding="utf-8") as file:
+        expected = lex_all(SourceReader(file))
+    with MmapSourceReader(path) as source:
+        assert lex_all(source) == expected
+
+
+def test_mmap_source_limits(tmp_path):
+    path = tmp_path / "program.bng"
+    path.write_bytes(('"' + "ą" * 5 + '"').encode("utf-8"))
+    with MmapSourceReader(path) as source:
+        with pytest.raises(LexerError):
+            Lexer(source, str_max_len=4).get_next_token()
+    path.write_bytes(("ą" * 5).encode("utf-8"))
+    with MmapSourceReader(path) as source:
+        with pytest.raises(LexerError):
+            Lexer(source, identifier_max_len=4).get_next_token()
+
+
+def test_positions_resolved_from_offsets():
+    source = SourceReader(io.StringIO("ab\n\ncd"))
+    positions = []
+    while source.get_char() != chr(3):
+        positions.append(source.get_position())
+        source.next_char()
+    assert positions == [
+        SourcePosition(1, 1), SourcePosition(1, 2), SourcePosition(1, 3),
+        SourcePosition(2, 1),
+        SourcePosition(3, 1), SourcePosition(3, 2)
+    ]
+    assert str(source.get_position()) == "Ln 3 Col 3"
+
+
+def test_lexer_error_renders_lazy_position():
+    lexer = Lexer(SourceReader(io.StringIO("int a;\n  &")))
+    for _ in range(3):
+        lexer.get_next_token()
+    with pytest.raises(LexerError) as error:
+        lexer.get_next_token()
+    assert str(error.value) == "LexerError: Ln 2 Col 3 : Missing second char in double char token"
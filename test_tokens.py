@@ -7,11 +7,11 @@ from Source.source_position import SourcePosition
 from Source.source import SourceReader
 
 
-@pytest.fixture
+@pytest.fixture(params=[False, True], ids=["sequential", "table_driven"])
 def lexer_str_setup(request):
     def _lexer_str_setup(string):
         source = SourceReader(io.StringIO(string))
-        return Lexer(source)
+        return Lexer(source, table_driven=request.param)
     return _lexer_str_setup
 
 
@@ -59,6 +59,18 @@ def test_comment2(lexer_str_setup):
     assert token.type == TokenType.INT
 
 
+@pytest.mark.parametrize('table_driven', [False, True])
+def test_skipped_comments(table_driven):
+    source = SourceReader(io.StringIO("# a\n  # b\n#\nint # c\n# d"))
+    lexer = Lexer(source, table_driven=table_driven, skip_comments=True)
+    token = lexer.get_next_token()
+    assert token.type == TokenType.INT
+    assert token.position == SourcePosition(4, 1)
+    token = lexer.get_next_token()
+    assert token.type == TokenType.END_OF_FILE
+    assert token.position == SourcePosition(5, 4)
+
+
 # single char tokens
 
 
@@ -661,3 +673,43 @@ def test_curtype_const_error2(lexer_str_setup):
     lexer = lexer_str_setup(" $PLN ")
     with pytest.raises(LexerError):
         lexer.get_next_token()
+
+
+def lex_with_errors(text, **kwargs):
+    lexer = Lexer(SourceReader(io.StringIO(text)), currency_names=["USD", "PLN"], **kwargs)
+    tokens = []
+    try:
+        while (token := lexer.get_next_token()).type != TokenType.END_OF_FILE:
+            tokens.append(token)
+    except LexerError as error:
+        return tokens, str(error)
+    return tokens, None
+
+
+@pytest.mark.parametrize('path', [
+    "test_files/init.bng",
+    "test_files/some_constructions.bng",
+    "test_files/currency.bng",
+    "test_files/interpreter/15.bng",
+])
+def test_table_driven_scanner_matches_sequential(path):
+    with open(path, "r") as file:
+        text = file.read()
+    assert lex_with_errors(text, table_driven=True) == lex_with_errors(text)
+
+
+@pytest.mark.parametrize('text, limits', [
+    ("a & b", {}),
+    ("x | y", {}),
+    ("int @", {}),
+    ("\"unterminated", {}),
+    ("abcde", {"identifier_max_len": 4}),
+    ("\"abcde\"", {"str_max_len": 4}),
+    ("12345", {"int_max_len": 4}),
+    ("1.12345", {"float_max_len": 4}),
+    ("zażółć ٣ 1.", {}),
+])
+def test_table_driven_scanner_errors_match_sequential(text, limits):
+    expected = lex_with_errors(text, **limits)
+    assert expected[1] is not None
+    assert lex_with_errors(text, table_driven=True, **limits) == expected
@@ -0,0 +1,108 @@
+import io
+
+import pytest
+
+from Lexer.lexer import Lexer
+from Parser.parser import Parser
+from Source.source import SourceReader
+from Currency.currency import Currency
+from Interpreter.resolver import resolve_program
+from Interpreter.type_checker import check_program, ARITHMETIC_RESULT_TYPES, RELATION_TYPES, NEGATION_RESULT_TYPES
+from Interpreter.calculations import ARITHMETIC_KERNELS, RELATION_KERNELS, NEGATION_KERNELS
+from Interpreter.semantic_error import SemanticError
+from Visitor.interpreter_visitor import InterpreterVisitor, TYPES_MAP, BUILTINS_LIST, BUILTIN_RETURN_TYPES
+from Interpreter.closure_compiler import ClosureInterpreter
+from Interpreter.virtual_machine import VirtualMachine
+
+
+CURRENCIES = ["PLN", "EUR"]
+
+
+def parse(text):
+    lexer = Lexer(SourceReader(io.StringIO(text)), currency_names=CURRENCIES)
+    return Parser(lexer, CURRENCIES).parse()
+
+
+def check(text):
+    program = parse(text)
+    resolve_program(program, [*program.functions, *(name for name, _ in BUILTINS_LIST)])
+    check_program(program, TYPES_MAP, BUILTIN_RETURN_TYPES)
+    return program
+
+
+def statements(program, name="main"):
+    return program.functions[name].block.statements
+
+
+def test_result_types_cover_kernels():
+    assert set(ARITHMETIC_RESULT_TYPES) == set(ARITHMETIC_KERNELS)
+    assert set(RELATION_TYPES) == set(RELATION_KERNELS)
+    assert set(NEGATION_RESULT_TYPES) == set(NEGATION_KERNELS)
+
+
+def test_expressions_are_annotated():
+    program = check("void main() { int a = 1; cur b = 2 PLN * a - 1 EUR; bool c = a < 2 && !false; }")
+    declaration_a, declaration_b, declaration_c = statements(program)
+    assert declaration_a.static_type is int
+    assert declaration_b.expression.static_type is Currency
+    assert declaration_b.expression.left.static_type is Currency
+    assert declaration_c.expression.static_type is bool
+
+
+def test_calls_are_annotated():
+    program = check("""
+        int f(int a) { if a > 0 { return 1; } else { return 2; } }
+        int g(int a) { if a > 0 { return 1; } }
+        void main() { int a = f(1); int b = g(1); str c = to_str(a); }
+    """)
+    f_call, g_call, to_str_call = (statement.expression.objects[0] for statement in statements(program)[:3])
+    assert (f_call.static_type, f_call.arguments_checked) == (int, True)
+    assert (g_call.static_type, g_call.arguments_checked) == (None, True)
+    assert to_str_call.static_type is str
+    assert statements(program)[0].static_type is int
+    assert statements(program)[1].static_type is None
+
+
+def test_loop_variables_stay_dynamic():
+    program = check("void main() { dict d = {}; int x = 1; for x in d { } x = x + 1; }")
+    assignment = statements(program)[3]
+    assert assignment.expression.static_type is None
+    assert assignment.static_type is None
+
+
+@pytest.mark.parametrize('text, message', [
+    ("void main() { int a = 1.0; }", "Ln 1 Col 15 : Type mismatch."),
+    ("void main() { int a = 1; a = \"x\"; }", "Ln 1 Col 26 : Type mismatch, <class 'int'> - <class 'str'>"),
+    ("void main() { int a = 1 + 1.0; }", "Ln 1 Col 25 : Different types in add operation"),
+    ("void main() { bool a = 1 < \"x\"; }", "Ln 1 Col 26 : Wrong type for operation, <class 'int'> - <class 'str'>"),
+    ("void main() { bool a = !1; }", "Ln 1 Col 24 : Wrong type for negation, <class 'int'>"),
+    ("void main() { bool a = 1 || true; }", "Ln 1 Col 26 : Wrong type for operation, <class 'int'> - <class 'bool'>"),
+    ("int f() { return \"a\"; } void main() { }",
+     "Ln 1 Col 11 : Wrong return type, expected <class 'int'>, got <class 'str'>"),
+    ("int f() { return; } void main() { }", "Ln 1 Col 11 : Expected return of a type <class 'int'>"),
+    ("int f(int a) { return a; } void main() { f(\"1\"); }", "Ln 1 Col 42 : Parameter type mismatch."),
+    ("void main() { g(); }", "Ln 1 Col 15 : Function g not found"),
+    ("void main() { cur a = 1 PLN; from a -> 1; }", "Ln 1 Col 30 : Expected a cur expressions in transfer"),
+    ("void main() { dict d = {\"a\": 1 PLN, \"a\": 2 PLN}; }", "Ln 1 Col 24 : Multiple account name 'a' defined"),
+])
+def test_static_errors(text, message):
+    with pytest.raises(SemanticError) as error:
+        check(text)
+    assert str(error.value) == f"SemanticError: {message}"
+
+
+@pytest.mark.parametrize('text', [
+    "void main() { bool a = true || 1; }",
+    "int f(int a) { return a; } int g() { return 1; } void main() { f(g(), 2); }",
+    "void main() { int a = to_int(\"x\"); }",
+])
+def test_dynamic_errors_are_left_to_runtime(text):
+    check(text)
+
+
+@pytest.mark.parametrize('engine', [InterpreterVisitor, ClosureInterpreter, VirtualMachine])
+def test_type_errors_reported_before_execution(engine, capsys):
+    program = parse("void main() { print(\"start\"); int a = 1 + \"x\"; }")
+    with pytest.raises(SemanticError):
+        program.accept(engine(CURRENCIES))
+    assert capsys.readouterr().out == ""